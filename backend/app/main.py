@@ -1,5 +1,6 @@
 import os
 import time
+import anyio
 import dotenv
 from fastapi import FastAPI, Depends, Request, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
@@ -10,6 +11,14 @@ from .routers import resumes_router, jobs_router, interviews_router, onboardings
 from app.config.config import get_config, reload_config
 from app.config.logging_config import get_logger
 from app.middleware.db_session import DBSessionMiddleware
+from app.middleware.idempotency import IdempotencyMiddleware
+from app.utils.metrics import ingestion_histograms
+from app.utils.signing import get_signing_secret
+from app.services.ocr import close_ocr_client, get_ocr_client
+from app.services.service_factory import uses_aliyun_ocr
+from app.services.llm_client import get_openai_client, close_openai_client
+from app.services.llm_cache import LLM_CACHE_ENABLED, get_llm_cache
+from app.utils.loop_monitor import LOOP_MONITOR_ENABLED, LoopMonitorMiddleware, loop_monitor
 
 # 获取日志记录器
 logger = get_logger()
@@ -18,6 +27,12 @@ logger = get_logger()
 config = get_config()
 env = config.ENV
 
+# 同步路由和 run_in_threadpool 共用的线程池大小，阻塞的数据库、OCR、GPT调用都在其中执行。
+# 调用GPT的同步路由在整个往返期间（最长 LLM_READ_TIMEOUT）占用一个线程，
+# 线程池需不小于高峰时同时进行的GPT请求数（请求速率 × GPT耗时P99）加上数据库和OCR调用的余量，
+# 否则排队的请求会占满线程池，连不调用GPT的接口也要等待；LLM_MAX_CONNECTIONS 按同样的并发数设置
+THREADPOOL_SIZE = int(os.getenv("THREADPOOL_SIZE", "40"))
+
 # 创建FastAPI应用
 app = FastAPI(
     title="HR招聘系统",
@@ -45,9 +60,16 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# 事件循环阻塞检测，需作为最内层中间件，与路由处理函数运行在同一个任务中
+if LOOP_MONITOR_ENABLED:
+    app.add_middleware(LoopMonitorMiddleware)
+
 # 添加数据库会话中间件
 app.add_middleware(DBSessionMiddleware)
 
+# 添加幂等请求中间件，带Idempotency-Key的重试请求直接返回首次响应
+app.add_middleware(IdempotencyMiddleware)
+
 # 包含API路由
 app.include_router(resumes_router)
 app.include_router(jobs_router)
@@ -91,6 +113,30 @@ def health_check(db: Session = Depends(get_db)):
         "timestamp": time.time()
     }
 
+# 简历入库各阶段耗时直方图
+@app.get("/api/v1/metrics/ingestion")
+def ingestion_metrics():
+    return {"histograms": ingestion_histograms.snapshot()}
+
+# OCR请求排队数、并发数和耗时统计，模拟环境和本地OCR不使用阿里云OCR客户端
+@app.get("/api/v1/metrics/ocr")
+def ocr_metrics():
+    if not uses_aliyun_ocr():
+        return {"enabled": False}
+    return get_ocr_client().metrics()
+
+# GPT回复缓存命中率，按调用方法分别统计
+@app.get("/api/v1/metrics/llm-cache")
+def llm_cache_metrics():
+    if not LLM_CACHE_ENABLED:
+        return {"enabled": False}
+    return get_llm_cache().stats()
+
+# 事件循环阻塞统计，需开启 LOOP_MONITOR_ENABLED
+@app.get("/api/v1/debug/loop-blocks")
+def loop_block_report():
+    return loop_monitor.snapshot()
+
 # 启动事件
 @app.on_event("startup")
 async def startup_event():
@@ -106,6 +152,20 @@ async def startup_event():
     
     logger.info(f"应用启动 (环境: {env})")
     
+    # 检查签名密钥，未配置时启动失败，避免各工作进程使用不同的随机密钥
+    get_signing_secret()
+    
+    # 设置线程池大小
+    anyio.to_thread.current_default_thread_limiter().total_tokens = THREADPOOL_SIZE
+    
+    # 开启事件循环阻塞检测
+    if LOOP_MONITOR_ENABLED:
+        await loop_monitor.start()
+    
+    # 创建共享的OpenAI客户端，各请求复用其连接池
+    if get_openai_client() is not None:
+        logger.info("OpenAI客户端已创建")
+    
     # 初始化数据库
     db_initialized = init_db()
     if db_initialized:
@@ -116,4 +176,7 @@ async def startup_event():
 # 关闭事件
 @app.on_event("shutdown")
 async def shutdown_event():
+    await loop_monitor.stop()
+    close_openai_client()
+    close_ocr_client()
     logger.info("应用关闭")
@@ -0,0 +1,128 @@
+"""
+幂等请求中间件
+带 Idempotency-Key 请求头的创建类请求只执行一次，重试时返回首次的响应；
+相同的键用于方法、路径或请求体不同的请求时返回422；
+文件上传（multipart）请求不缓存请求体，按请求头判断是否为同一请求
+"""
+import os
+import re
+import time
+import asyncio
+import hashlib
+import logging
+from typing import Optional
+from fastapi import Request
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import JSONResponse, Response
+from starlette.middleware.base import BaseHTTPMiddleware
+from app.services.idempotency import STATUS_COMPLETED, claim_request, complete_request, release_request
+
+# 获取日志记录器
+logger = logging.getLogger("hr_recruitment")
+
+# 幂等键请求头
+IDEMPOTENCY_HEADER = "Idempotency-Key"
+
+# 支持幂等键的接口
+IDEMPOTENT_ENDPOINTS = {
+    ("POST", "/api/v1/resumes/upload"),
+    ("POST", "/api/v1/resumes/import"),
+    ("POST", "/api/v1/resumes/direct-uploads/complete"),
+    ("POST", "/api/v1/jobs"),
+    ("POST", "/api/v1/interviews"),
+    ("POST", "/api/v1/onboardings"),
+}
+
+# 等待并发的首次请求完成的最长时间（秒）
+IDEMPOTENCY_WAIT_TIMEOUT = float(os.getenv("IDEMPOTENCY_WAIT_TIMEOUT", "60"))
+
+# 等待期间查询首次请求状态的间隔（秒）
+IDEMPOTENCY_POLL_INTERVAL = float(os.getenv("IDEMPOTENCY_POLL_INTERVAL", "0.2"))
+
+# multipart请求体中的分隔符参数，每次请求随机生成，计算指纹时忽略
+BOUNDARY_PATTERN = re.compile(r'boundary="?([^";]+)"?')
+
+
+def request_fingerprint(method: str, path: str, content_type: Optional[str], body: bytes) -> str:
+    """计算请求指纹：方法、路径和请求体的SHA-256，multipart请求体忽略随机分隔符"""
+    match = BOUNDARY_PATTERN.search(content_type or "")
+    if match:
+        body = body.replace(match.group(1).encode("latin-1"), b"")
+    digest = hashlib.sha256(f"{method}\n{path}\n".encode("utf-8"))
+    digest.update(body)
+    return digest.hexdigest()
+
+
+async def compute_request_hash(request: Request, method: str, path: str) -> str:
+    """
+    计算请求指纹
+
+    上传的文件由路由流式写入存储，multipart请求只使用 Content-Type 和 Content-Length，
+    避免在中间件中把整个请求体读入内存；其他请求体很小，直接计算内容的哈希。
+    """
+    content_type = request.headers.get("content-type") or ""
+    if content_type.startswith("multipart/"):
+        headers = f"{BOUNDARY_PATTERN.sub('', content_type)}\n{request.headers.get('content-length') or ''}"
+        return request_fingerprint(method, path, None, headers.encode("latin-1"))
+    return request_fingerprint(method, path, content_type, await request.body())
+
+
+class IdempotencyMiddleware(BaseHTTPMiddleware):
+    """幂等请求中间件"""
+    
+    async def dispatch(self, request: Request, call_next):
+        """处理请求"""
+        key = request.headers.get(IDEMPOTENCY_HEADER)
+        method = request.method
+        path = request.url.path.rstrip("/")
+        if not key or (method, path) not in IDEMPOTENT_ENDPOINTS:
+            return await call_next(request)
+        
+        if len(key) > 255:
+            return JSONResponse(status_code=400, content={"message": f"{IDEMPOTENCY_HEADER}长度不能超过255个字符"})
+        
+        request_hash = await compute_request_hash(request, method, path)
+        
+        # 占用幂等键；首次请求仍在处理时等待其完成
+        deadline = time.monotonic() + IDEMPOTENCY_WAIT_TIMEOUT
+        while True:
+            record = await run_in_threadpool(claim_request, key, method, path, request_hash)
+            if record is None:
+                break
+            if record.get("request_hash") and record["request_hash"] != request_hash:
+                logger.warning(f"幂等键用于不同的请求: {method} {path} {key}")
+                return JSONResponse(status_code=422, content={"message": f"{IDEMPOTENCY_HEADER}已用于不同的请求内容"})
+            if record["status"] == STATUS_COMPLETED:
+                logger.info(f"幂等键重复请求，返回首次响应: {method} {path} {key}")
+                return Response(
+                    content=record["response_body"],
+                    status_code=record["response_status"],
+                    media_type=record["content_type"],
+                    headers={"Idempotent-Replayed": "true"}
+                )
+            if time.monotonic() >= deadline:
+                return JSONResponse(status_code=409, content={"message": "相同幂等键的请求正在处理中，请稍后重试"})
+            await asyncio.sleep(IDEMPOTENCY_POLL_INTERVAL)
+        
+        try:
+            response = await call_next(request)
+            body = b"".join([chunk async for chunk in response.body_iterator])
+        except Exception:
+            await run_in_threadpool(release_request, key, method, path)
+            raise
+        
+        if response.status_code < 500:
+            await run_in_threadpool(
+                complete_request, key, method, path,
+                response.status_code, body, response.headers.get("content-type")
+            )
+        else:
+            # 服务端错误不保存，客户端可使用相同的键重试
+            await run_in_threadpool(release_request, key, method, path)
+        
+        return Response(
+            content=body,
+            status_code=response.status_code,
+            headers=dict(response.headers),
+            background=response.background
+        )
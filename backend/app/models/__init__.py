@@ -11,5 +11,7 @@ from .interview import Interview
 from .user import User
 from .tag import Tag
 from .onboarding import Onboarding, OnboardingTask
+from .reenrichment import ReenrichmentCheckpoint
+from .idempotency import IdempotencyRecord
 
-__all__ = ['Base', 'JobRequirement', 'Resume', 'Interview', 'User', 'Tag', 'Onboarding', 'OnboardingTask']
+__all__ = ['Base', 'JobRequirement', 'Resume', 'Interview', 'User', 'Tag', 'Onboarding', 'OnboardingTask', 'ReenrichmentCheckpoint', 'IdempotencyRecord']
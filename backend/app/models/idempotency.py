@@ -0,0 +1,24 @@
+"""幂等请求记录模型"""
+from sqlalchemy import Column, Integer, String, LargeBinary, DateTime, UniqueConstraint
+from datetime import datetime
+from . import Base
+
+class IdempotencyRecord(Base):
+    __tablename__ = "idempotency_records"
+    __table_args__ = (
+        UniqueConstraint("idempotency_key", "method", "path", name="uq_idempotency_key_scope"),
+    )
+    
+    id = Column(Integer, primary_key=True, index=True)
+    idempotency_key = Column(String(255), nullable=False)
+    method = Column(String(10), nullable=False)
+    path = Column(String(255), nullable=False)
+    # 请求方法、路径和请求体的SHA-256，相同的键不能用于不同的请求
+    request_hash = Column(String(64), nullable=True)
+    # 处理状态: processing(处理中), completed(已完成)
+    status = Column(String(20), nullable=False, default="processing")
+    response_status = Column(Integer, nullable=True)
+    response_body = Column(LargeBinary, nullable=True)
+    content_type = Column(String(100), nullable=True)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    completed_at = Column(DateTime, nullable=True)
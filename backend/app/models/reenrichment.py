@@ -0,0 +1,29 @@
+"""简历批量重新解析任务模型"""
+from sqlalchemy import Column, Integer, String, DateTime
+from datetime import datetime
+from . import Base
+
+class ReenrichmentCheckpoint(Base):
+    __tablename__ = "reenrichment_checkpoints"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    job_name = Column(String(100), nullable=False, unique=True)
+    # 已处理完成的最大简历ID，任务中断后从该ID之后继续
+    last_resume_id = Column(Integer, nullable=False, default=0)
+    processed_count = Column(Integer, nullable=False, default=0)
+    skipped_count = Column(Integer, nullable=False, default=0)
+    failed_count = Column(Integer, nullable=False, default=0)
+    started_at = Column(DateTime, default=datetime.utcnow)
+    completed_at = Column(DateTime, nullable=True)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    
+    def to_dict(self):
+        return {
+            "job_name": self.job_name,
+            "last_resume_id": self.last_resume_id,
+            "processed": self.processed_count,
+            "skipped": self.skipped_count,
+            "failed": self.failed_count,
+            "started_at": self.started_at.isoformat() if self.started_at else None,
+            "completed_at": self.completed_at.isoformat() if self.completed_at else None
+        }
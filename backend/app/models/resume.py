@@ -1,3 +1,4 @@
+import json
 from sqlalchemy import Column, Integer, String, Text, ForeignKey, DateTime
 from sqlalchemy.orm import relationship
 from datetime import datetime
@@ -11,9 +12,26 @@ class Resume(Base):
     candidate_name = Column(String(50), nullable=False)
     file_url = Column(String(255), nullable=False)
     file_type = Column(String(20), nullable=False)
+    # 文件大小（字节）
+    file_size = Column(Integer, nullable=True)
+    # 文件内容的SHA-256，仅首次上传的简历保存，用于识别重复上传
+    content_hash = Column(String(64), unique=True, index=True, nullable=True)
+    # 内容相同的原始简历ID
+    duplicate_of_id = Column(Integer, ForeignKey("resumes.id"), nullable=True, index=True)
     ocr_content = Column(Text)
     parsed_content = Column(Text)
     talent_portrait = Column(Text)
+    # 解析流水线状态: pending(排队中), running(处理中), completed(已完成), failed(失败)
+    processing_status = Column(String(20), nullable=False, default="pending")
+    ocr_status = Column(String(20), nullable=False, default="pending")
+    parse_status = Column(String(20), nullable=False, default="pending")
+    portrait_status = Column(String(20), nullable=False, default="pending")
+    tag_status = Column(String(20), nullable=False, default="pending")
+    processing_error = Column(Text)
+    # 最近一次成功解析时的输入指纹（OCR文本 + 解析版本），用于批量重新解析时跳过未变化的简历
+    enrichment_hash = Column(String(64), nullable=True)
+    # 最近一次解析各阶段的耗时（毫秒，JSON）
+    stage_timings = Column(Text)
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
@@ -26,9 +44,37 @@ class Resume(Base):
             "candidate_name": self.candidate_name,
             "file_url": self.file_url,
             "file_type": self.file_type,
+            "file_size": self.file_size,
             "ocr_content": self.ocr_content,
             "parsed_content": self.parsed_content,
             "talent_portrait": self.talent_portrait,
+            "processing_status": self.processing_status,
+            "duplicate_of_id": self.duplicate_of_id,
             "created_at": self.created_at.isoformat() if self.created_at else None,
             "updated_at": self.updated_at.isoformat() if self.updated_at else None
         }
+    
+    def get_stage_timings(self):
+        """返回最近一次解析各阶段的耗时"""
+        if not self.stage_timings:
+            return {}
+        try:
+            return json.loads(self.stage_timings)
+        except ValueError:
+            return {}
+    
+    def to_status_dict(self):
+        """返回解析流水线各阶段的状态"""
+        return {
+            "resume_id": self.id,
+            "processing_status": self.processing_status,
+            "stages": {
+                "ocr": self.ocr_status,
+                "parse": self.parse_status,
+                "portrait": self.portrait_status,
+                "tag": self.tag_status
+            },
+            "error": self.processing_error,
+            "timings": self.get_stage_timings(),
+            "updated_at": self.updated_at.isoformat() if self.updated_at else None
+        }
@@ -1,5 +1,6 @@
 """面试管理路由"""
 import os
+import json
 import logging
 from fastapi import APIRouter, Depends, HTTPException, Body, Request
 from sqlalchemy.orm import Session
@@ -12,6 +13,7 @@ from app.models.resume import Resume
 from app.models.job_requirement import JobRequirement
 from app.models.user import User
 from app.services.gpt import GPTService
+from app.services.service_factory import get_gpt_service
 from app.utils.db_utils import safe_commit
 
 # 获取日志记录器
@@ -19,8 +21,11 @@ logger = logging.getLogger("hr_recruitment")
 
 router = APIRouter(prefix="/api/v1/interviews", tags=["interviews"])
 
+# 面试问题提示词模板版本，修改模板后递增，使旧的缓存失效
+QUESTIONS_PROMPT_VERSION = "1"
+
 @router.post("", status_code=201)
-async def schedule_interview(
+def schedule_interview(
     request: Request,
     interview_data: Dict[str, Any] = Body(...),
     db: Session = Depends(get_db)
@@ -110,7 +115,7 @@ async def schedule_interview(
         )
 
 @router.get("")
-async def list_interviews(
+def list_interviews(
     db: Session = Depends(get_db)
 ):
     """获取面试列表"""
@@ -125,7 +130,7 @@ async def list_interviews(
         )
 
 @router.get("/{interview_id}")
-async def get_interview(
+def get_interview(
     interview_id: int,
     db: Session = Depends(get_db)
 ):
@@ -146,11 +151,13 @@ async def get_interview(
         )
 
 @router.post("/{interview_id}/questions")
-async def generate_interview_questions(
+def generate_interview_questions(
     interview_id: int,
-    db: Session = Depends(get_db)
+    use_cache: bool = True,
+    db: Session = Depends(get_db),
+    gpt_service: GPTService = Depends(get_gpt_service)
 ):
-    """生成面试问题"""
+    """生成面试问题，use_cache 为false时重新生成"""
     try:
         # 获取面试记录
         interview = db.query(Interview).filter(Interview.id == interview_id).first()
@@ -164,11 +171,8 @@ async def generate_interview_questions(
         if not resume or not job:
             raise HTTPException(status_code=404, detail="简历或职位信息不存在")
             
-        # 初始化GPT服务
-        gpt_service = GPTService()
-        
         # 生成面试问题
-        questions = generate_questions(gpt_service, resume, job)
+        questions = generate_questions(gpt_service, resume, job, use_cache)
         
         return {"questions": questions}
         
@@ -181,7 +185,7 @@ async def generate_interview_questions(
         )
 
 @router.post("/{interview_id}/feedback")
-async def submit_interview_feedback(
+def submit_interview_feedback(
     interview_id: int,
     feedback_data: Dict[str, Any] = Body(...),
     db: Session = Depends(get_db)
@@ -227,8 +231,9 @@ def interview_to_dict(interview: Interview) -> Dict[str, Any]:
         "updated_at": interview.updated_at.isoformat() if interview.updated_at else None
     }
 
-def generate_questions(gpt_service: GPTService, resume: Resume, job: JobRequirement) -> List[Dict[str, str]]:
-    """生成面试问题"""
+def generate_questions(gpt_service: GPTService, resume: Resume, job: JobRequirement,
+                       use_cache: bool = True) -> List[Dict[str, str]]:
+    """生成面试问题，相同的职位和简历从缓存读取"""
     try:
         # 测试环境使用模拟数据
         if os.getenv("ENV") == "test":
@@ -258,24 +263,21 @@ def generate_questions(gpt_service: GPTService, resume: Resume, job: JobRequirem
         {resume.ocr_content}
         """
         
-        # 调用GPT-4 API
-        response = gpt_service.openai.chat.completions.create(
-            model=gpt_service.model,
+        # 调用GPT-4 API，解析JSON响应
+        return gpt_service.complete(
+            "generate_questions",
+            QUESTIONS_PROMPT_VERSION,
+            f"{job.position_name}\n{job.responsibilities}\n{job.requirements}\n{resume.ocr_content}",
             messages=[
                 {"role": "system", "content": "你是一位专业的技术面试官，擅长根据职位要求和候选人背景生成有针对性的面试问题。"},
                 {"role": "user", "content": prompt}
             ],
             temperature=0.7,
             max_tokens=1000,
+            parse=lambda content: json.loads(content).get("questions", []),
+            use_cache=use_cache,
             response_format={"type": "json_object"}
         )
-        
-        # 解析JSON响应
-        import json
-        content = response.choices[0].message.content
-        result = json.loads(content)
-        
-        return result.get("questions", [])
             
     except Exception as e:
         # 出错时返回默认问题
@@ -1,6 +1,8 @@
 """招聘需求管理路由"""
 import os
+import json
 import logging
+from concurrent.futures import ThreadPoolExecutor
 from fastapi import APIRouter, Depends, HTTPException, Body, Request
 from sqlalchemy.orm import Session
 from sqlalchemy.exc import SQLAlchemyError
@@ -10,6 +12,7 @@ from app.models.job_requirement import JobRequirement
 from app.models.resume import Resume
 from app.models.tag import Tag
 from app.services.gpt import GPTService
+from app.services.service_factory import get_gpt_service
 from app.utils.db_utils import safe_commit
 
 # 获取日志记录器
@@ -17,11 +20,18 @@ logger = logging.getLogger("hr_recruitment")
 
 router = APIRouter(prefix="/api/v1/jobs", tags=["jobs"])
 
+# 简历匹配时同时调用GPT服务的数量上限
+MATCH_CONCURRENCY = int(os.getenv("MATCH_CONCURRENCY", "4"))
+
+# 匹配度提示词模板版本，修改模板后递增，使旧的缓存失效
+MATCH_PROMPT_VERSION = "1"
+
 @router.post("", status_code=201)
-async def create_job_requirement(
+def create_job_requirement(
     request: Request,
     job_data: Dict[str, Any] = Body(...),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_db),
+    gpt_service: GPTService = Depends(get_gpt_service)
 ):
     """创建招聘需求"""
     try:
@@ -34,9 +44,6 @@ async def create_job_requirement(
             if not job_data.get(field):
                 raise HTTPException(status_code=400, detail=f"缺少必填字段: {field}")
         
-        # 初始化GPT服务
-        gpt_service = GPTService()
-        
         # 提取职位标签
         job_description = f"{job_data.get('position_name', '')}\n{job_data.get('responsibilities', '')}\n{job_data.get('requirements', '')}"
         tags = gpt_service.extract_job_tags(job_description)
@@ -94,7 +101,7 @@ async def create_job_requirement(
         )
 
 @router.get("")
-async def list_job_requirements(
+def list_job_requirements(
     db: Session = Depends(get_db)
 ):
     """获取招聘需求列表"""
@@ -109,7 +116,7 @@ async def list_job_requirements(
         )
 
 @router.get("/{job_id}")
-async def get_job_requirement(
+def get_job_requirement(
     job_id: int,
     db: Session = Depends(get_db)
 ):
@@ -130,11 +137,13 @@ async def get_job_requirement(
         )
 
 @router.get("/{job_id}/matches")
-async def match_resumes(
+def match_resumes(
     job_id: int,
-    db: Session = Depends(get_db)
+    use_cache: bool = True,
+    db: Session = Depends(get_db),
+    gpt_service: GPTService = Depends(get_gpt_service)
 ):
-    """匹配简历"""
+    """匹配简历，use_cache 为false时重新计算全部匹配度"""
     try:
         # 获取招聘需求
         job = db.query(JobRequirement).filter(JobRequirement.id == job_id).first()
@@ -144,14 +153,7 @@ async def match_resumes(
         # 获取所有简历
         resumes = db.query(Resume).all()
         
-        # 初始化GPT服务
-        gpt_service = GPTService()
-        
-        # 匹配结果
-        matches = []
-        
-        # 对每个简历计算匹配度
-        for resume in resumes:
+        def score_resume(resume: Resume) -> Dict[str, Any]:
             # 构建匹配提示词
             match_prompt = f"""
             职位要求：
@@ -166,14 +168,18 @@ async def match_resumes(
             """
             
             # 调用GPT服务计算匹配度
-            match_result = calculate_match_score(gpt_service, match_prompt, job, resume)
+            match_result = calculate_match_score(gpt_service, match_prompt, job, resume, use_cache)
             
-            matches.append({
+            return {
                 "resume_id": resume.id,
                 "candidate_name": resume.candidate_name,
                 "match_score": match_result["score"],
                 "match_explanation": match_result["explanation"]
-            })
+            }
+        
+        # 并发计算每份简历的匹配度
+        with ThreadPoolExecutor(max_workers=MATCH_CONCURRENCY) as executor:
+            matches = list(executor.map(score_resume, resumes))
         
         # 按匹配度排序
         matches.sort(key=lambda x: x["match_score"], reverse=True)
@@ -203,8 +209,9 @@ def job_to_dict(job: JobRequirement) -> Dict[str, Any]:
         "updated_at": job.updated_at.isoformat() if job.updated_at else None
     }
 
-def calculate_match_score(gpt_service: GPTService, match_prompt: str, job: JobRequirement, resume: Resume) -> Dict[str, Any]:
-    """计算匹配分数"""
+def calculate_match_score(gpt_service: GPTService, match_prompt: str, job: JobRequirement, resume: Resume,
+                          use_cache: bool = True) -> Dict[str, Any]:
+    """计算匹配分数，相同的职位和简历从缓存读取"""
     try:
         # 测试环境使用模拟数据
         if os.getenv("ENV") == "test":
@@ -224,27 +231,29 @@ def calculate_match_score(gpt_service: GPTService, match_prompt: str, job: JobRe
         {match_prompt}
         """
         
+        def parse(content: str) -> Dict[str, Any]:
+            # 解析JSON响应
+            result = json.loads(content)
+            return {
+                "score": result.get("score", 0),
+                "explanation": result.get("explanation", "无匹配理由")
+            }
+        
         # 调用GPT-4 API
-        response = gpt_service.openai.chat.completions.create(
-            model=gpt_service.model,
+        return gpt_service.complete(
+            "calculate_match_score",
+            MATCH_PROMPT_VERSION,
+            match_prompt,
             messages=[
                 {"role": "system", "content": "你是一位专业的HR招聘助手，擅长评估候选人与职位的匹配度。"},
                 {"role": "user", "content": prompt}
             ],
             temperature=0.3,
             max_tokens=200,
+            parse=parse,
+            use_cache=use_cache,
             response_format={"type": "json_object"}
         )
-        
-        # 解析JSON响应
-        import json
-        content = response.choices[0].message.content
-        result = json.loads(content)
-        
-        return {
-            "score": result.get("score", 0),
-            "explanation": result.get("explanation", "无匹配理由")
-        }
             
     except Exception as e:
         # 出错时返回默认值
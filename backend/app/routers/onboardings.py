@@ -11,6 +11,7 @@ from app.models.onboarding import Onboarding, OnboardingTask
 from app.models.resume import Resume
 from app.models.job_requirement import JobRequirement
 from app.services.gpt import GPTService
+from app.services.service_factory import get_gpt_service
 from app.utils.db_utils import safe_commit
 
 # 获取日志记录器
@@ -19,10 +20,11 @@ logger = logging.getLogger("hr_recruitment")
 router = APIRouter(prefix="/api/v1/onboardings", tags=["onboardings"])
 
 @router.post("", status_code=201)
-async def create_onboarding(
+def create_onboarding(
     request: Request,
     onboarding_data: Dict[str, Any] = Body(...),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_db),
+    gpt_service: GPTService = Depends(get_gpt_service)
 ):
     """创建入职记录"""
     try:
@@ -78,7 +80,7 @@ async def create_onboarding(
         
         # 生成入职任务
         if onboarding_data.get("generate_tasks", True):
-            generate_onboarding_tasks(db, onboarding)
+            generate_onboarding_tasks(db, onboarding, gpt_service)
         
         # 记录成功创建
         logger.info(f"成功创建入职记录: ID={onboarding.id}, 简历ID={resume_id}, 职位ID={job_id}")
@@ -101,7 +103,7 @@ async def create_onboarding(
         )
 
 @router.get("")
-async def list_onboardings(
+def list_onboardings(
     db: Session = Depends(get_db)
 ):
     """获取入职记录列表"""
@@ -116,7 +118,7 @@ async def list_onboardings(
         )
 
 @router.get("/{onboarding_id}")
-async def get_onboarding(
+def get_onboarding(
     onboarding_id: int,
     db: Session = Depends(get_db)
 ):
@@ -143,7 +145,7 @@ async def get_onboarding(
         )
 
 @router.put("/{onboarding_id}")
-async def update_onboarding(
+def update_onboarding(
     onboarding_id: int,
     onboarding_data: Dict[str, Any] = Body(...),
     db: Session = Depends(get_db)
@@ -197,7 +199,7 @@ async def update_onboarding(
         )
 
 @router.post("/{onboarding_id}/tasks")
-async def create_onboarding_task(
+def create_onboarding_task(
     onboarding_id: int,
     task_data: Dict[str, Any] = Body(...),
     db: Session = Depends(get_db)
@@ -242,7 +244,7 @@ async def create_onboarding_task(
         )
 
 @router.put("/tasks/{task_id}")
-async def update_onboarding_task(
+def update_onboarding_task(
     task_id: int,
     task_data: Dict[str, Any] = Body(...),
     db: Session = Depends(get_db)
@@ -289,15 +291,12 @@ async def update_onboarding_task(
             detail=f"更新入职任务失败: {str(e)}"
         )
 
-def generate_onboarding_tasks(db: Session, onboarding: Onboarding):
+def generate_onboarding_tasks(db: Session, onboarding: Onboarding, gpt_service: GPTService):
     """生成入职任务"""
     try:
         # 获取职位信息
         job = db.query(JobRequirement).filter(JobRequirement.id == onboarding.job_requirement_id).first()
         
-        # 初始化GPT服务
-        gpt_service = GPTService()
-        
         # 测试环境使用默认任务
         if os.getenv("ENV") == "test":
             default_tasks = [
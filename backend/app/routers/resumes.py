@@ -1,100 +1,242 @@
-from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Form, status, Request
+from fastapi import APIRouter, BackgroundTasks, Body, Depends, HTTPException, UploadFile, File, Form, status, Request
 from sqlalchemy.orm import Session
 from sqlalchemy.exc import SQLAlchemyError
-from typing import List, Dict, Any, Optional
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import RedirectResponse, Response, StreamingResponse
+from typing import List, Dict, Any, Optional, Tuple
+import anyio
+import asyncio
+import json
 import logging
+import mimetypes
+import os
+import uuid
 
-from ..database import get_db
+from ..database import SessionLocal, get_db
 from ..models.resume import Resume
 from ..models.tag import Tag
-from ..services.service_factory import get_ocr_service, get_storage_service, get_gpt_service
-from ..services.tag import create_or_get_tags
+from ..services.service_factory import get_storage_service
+from ..services.storage import (
+    FileTooLargeError, HashingReader, LocalStorageService, compute_content_hash, stage_upload, remove_staged_file
+)
+from ..services.spreadsheet_import import SPREADSHEET_TYPES, import_spreadsheet, process_imported_resumes
+from ..services.resume_dedup import (
+    claim_content_hash, find_resume_by_hash, link_duplicate, release_resume, release_uploaded_file
+)
+from ..services.resume_pipeline import (
+    process_resume, extract_staged_text, STATUS_PENDING, STATUS_COMPLETED, STATUS_FAILED
+)
 from ..utils.db_utils import safe_commit
+from ..utils.metrics import StageTimer, format_server_timing
+from ..utils.signing import sign_payload, verify_payload
+from ..utils.file_response import content_disposition, encoded_stream_response, file_download_response
 
 router = APIRouter(prefix="/api/v1/resumes", tags=["resumes"])
 
 logger = logging.getLogger("hr_recruitment")
 
-@router.post("/upload", status_code=status.HTTP_201_CREATED)
+# 支持的简历文件类型
+ALLOWED_EXTENSIONS = ["pdf", "doc", "docx", "jpg", "jpeg", "png"]
+
+# 批量上传时同时执行解析流水线的简历数量上限
+BATCH_CONCURRENCY = int(os.getenv("RESUME_BATCH_CONCURRENCY", "4"))
+
+# 是否在写入存储的同时从上传内容提取文本
+PREFETCH_OCR = os.getenv("RESUME_PREFETCH_OCR", "True").lower() == "true"
+
+# 进行中的文本提取任务，保持引用直到完成
+_extraction_tasks = set()
+
+# 进行中的批量解析任务，保持引用直到完成，客户端断开连接后继续执行
+_pipeline_tasks = set()
+
+# 直传上传URL和上传凭证的有效期（秒）
+DIRECT_UPLOAD_EXPIRES = int(os.getenv("RESUME_DIRECT_UPLOAD_EXPIRES", "900"))
+
+# 简历原始文件的浏览器缓存时间（秒），文件内容上传后不再变化
+RESUME_FILE_CACHE_MAX_AGE = int(os.getenv("RESUME_FILE_CACHE_MAX_AGE", str(365 * 24 * 3600)))
+
+# 下载对象存储中的文件时签名URL的有效期（秒）
+RESUME_FILE_URL_EXPIRES = int(os.getenv("RESUME_FILE_URL_EXPIRES", "3600"))
+
+def _validate_file_extension(filename: str) -> str:
+    """验证文件类型并返回扩展名"""
+    file_extension = filename.split(".")[-1].lower()
+    if file_extension not in ALLOWED_EXTENSIONS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"不支持的文件类型: {file_extension}，支持的类型: {', '.join(ALLOWED_EXTENSIONS)}"
+        )
+    return file_extension
+
+async def _store_resume(
+    db: Session,
+    storage_service,
+    file: UploadFile,
+    candidate_name: str,
+    timer: Optional[StageTimer] = None
+) -> Tuple[Resume, Optional[asyncio.Task]]:
+    """
+    保存简历文件并创建待解析的简历记录
+    
+    内容与已有简历相同时不再上传文件，新记录直接关联原始简历并复用其解析结果。
+    新文件写入存储的同时，在线程池中从本地暂存副本提取文本，省去解析阶段
+    从存储读回文件的往返；存储写入失败时文本提取结果只保留在OCR缓存中。
+    传入 timer 时记录哈希、存储和数据库提交各阶段的耗时。
+    
+    Returns:
+        简历记录和文本提取任务（重复简历或未启用时为None）
+    """
+    timer = timer or StageTimer()
+    file_type = _validate_file_extension(file.filename)
+    
+    # 计算文件内容哈希，用于识别重复上传
+    with timer.stage("hash"):
+        content_hash = await run_in_threadpool(compute_content_hash, file.file)
+    with timer.stage("dedup_lookup"):
+        original = await run_in_threadpool(find_resume_by_hash, db, content_hash)
+    
+    # 创建简历记录，解析结果由后台流水线填充
+    resume = Resume(
+        candidate_name=candidate_name,
+        file_type=file_type,
+        file_size=file.size,
+        processing_status=STATUS_PENDING
+    )
+    
+    ocr_task = None
+    if original and original.processing_status != STATUS_FAILED:
+        logger.info(f"检测到重复简历: {file.filename}, 原始简历ID={original.id}")
+        await run_in_threadpool(link_duplicate, original, resume)
+    else:
+        if PREFETCH_OCR:
+            ocr_task = await _start_text_extraction(file, file_type, content_hash, timer)
+        # 分块流式写入存储服务，避免将整个文件读入内存
+        with timer.stage("storage"):
+            upload_result = await run_in_threadpool(
+                storage_service.upload_stream, file.file, file.filename, content_hash
+            )
+        resume.file_url = upload_result["file_url"]
+        resume.file_size = upload_result.get("file_size", resume.file_size)
+        if original:
+            # 原始简历解析失败，由新简历接管内容哈希并重新解析
+            original.content_hash = None
+            await run_in_threadpool(db.flush)
+        resume.content_hash = content_hash
+    
+    # 保存到数据库
+    db.add(resume)
+    with timer.stage("db_commit"):
+        committed = await run_in_threadpool(safe_commit, db, "保存简历失败")
+    if not committed:
+        # 并发上传相同内容时唯一索引冲突，改为关联先提交的简历
+        original = await run_in_threadpool(find_resume_by_hash, db, content_hash)
+        if not original:
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail="数据库保存失败"
+            )
+        # 文本提取结果不再需要，本次写入存储的文件或引用随之释放
+        if ocr_task is not None:
+            ocr_task.cancel()
+            ocr_task = None
+        uploaded_url = resume.file_url
+        resume = Resume(candidate_name=candidate_name, file_type=file_type, file_size=file.size)
+        await run_in_threadpool(link_duplicate, original, resume)
+        db.add(resume)
+        with timer.stage("db_commit"):
+            committed = await run_in_threadpool(safe_commit, db, "保存简历失败")
+        if not committed:
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail="数据库保存失败"
+            )
+        await run_in_threadpool(release_uploaded_file, storage_service, uploaded_url, resume)
+    
+    await run_in_threadpool(db.refresh, resume)
+    return resume, ocr_task
+
+async def _start_text_extraction(file: UploadFile, file_type: str, content_hash: str, timer: StageTimer) -> asyncio.Task:
+    """将上传内容暂存到本地，并在后台线程中开始提取文本"""
+    with timer.stage("staging"):
+        staged_path = await run_in_threadpool(stage_upload, file.file)
+    
+    async def extract():
+        return await run_in_threadpool(extract_staged_text, staged_path, file_type, content_hash)
+    
+    def cleanup(task: asyncio.Task):
+        # 任务在开始执行前被取消时协程不会运行，暂存文件在完成回调中删除
+        _extraction_tasks.discard(task)
+        remove_staged_file(staged_path)
+    
+    task = asyncio.create_task(extract())
+    _extraction_tasks.add(task)
+    task.add_done_callback(cleanup)
+    return task
+
+async def _run_pipeline(resume_id: int, ocr_task: Optional[asyncio.Task] = None) -> bool:
+    """等待上传时的文本提取完成后执行解析流水线，提取失败时由OCR阶段重新处理"""
+    ocr_content = None
+    if ocr_task is not None:
+        try:
+            ocr_content = await ocr_task
+        except Exception as e:
+            logger.warning(f"上传时提取文本失败，由解析流水线重新处理: ID={resume_id}, 错误: {str(e)}")
+    if ocr_content:
+        return await run_in_threadpool(process_resume, resume_id, ocr_content=ocr_content)
+    return await run_in_threadpool(process_resume, resume_id)
+
+@router.post("/upload", status_code=status.HTTP_202_ACCEPTED)
 async def upload_resume(
     request: Request,
+    response: Response,
+    background_tasks: BackgroundTasks,
     file: UploadFile = File(...),
     candidate_name: str = Form(...),
     db: Session = Depends(get_db)
 ):
-    """上传简历文件并解析"""
+    """上传简历文件，解析流程在后台执行"""
     logger.info(f"上传简历: {candidate_name}, 文件: {file.filename}")
     
     try:
-        # 验证文件类型
-        allowed_extensions = ["pdf", "doc", "docx", "jpg", "jpeg", "png"]
-        file_extension = file.filename.split(".")[-1].lower()
-        if file_extension not in allowed_extensions:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail=f"不支持的文件类型: {file_extension}，支持的类型: {', '.join(allowed_extensions)}"
-            )
-        
         # 获取服务实例
         storage_service = get_storage_service()
-        ocr_service = get_ocr_service()
-        gpt_service = get_gpt_service()
-        
-        # 上传文件到存储服务
-        file_content = await file.read()
-        file_url = storage_service.upload_file(file_content, file.filename)
-        file_type = file_extension
-        
-        # 使用OCR服务提取文本
-        ocr_content = ocr_service.extract_text_from_file(file_url)
-        if not ocr_content:
-            logger.warning(f"OCR提取文本为空: {file.filename}")
-            ocr_content = "无法提取文本内容"
-        
-        # 使用GPT服务解析简历内容
-        parsed_content = gpt_service.parse_resume(ocr_content)
         
-        # 生成人才画像
-        talent_portrait = gpt_service.generate_talent_portrait(parsed_content)
+        timer = StageTimer()
+        resume, ocr_task = await _store_resume(db, storage_service, file, candidate_name, timer)
         
-        # 创建简历记录
-        resume = Resume(
-            candidate_name=candidate_name,
-            file_url=file_url,
-            file_type=file_type,
-            ocr_content=ocr_content,
-            parsed_content=parsed_content,
-            talent_portrait=talent_portrait
-        )
-        
-        # 提取技能标签并关联
-        if parsed_content and "skills" in parsed_content:
-            skills = parsed_content["skills"]
-            tags = create_or_get_tags(db, skills)
-            resume.tags = tags
-        
-        # 保存到数据库
-        db.add(resume)
-        if not safe_commit(db, "保存简历失败"):
-            raise HTTPException(
-                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                detail="数据库保存失败"
-            )
+        # 记录各阶段耗时，解析阶段的耗时由流水线记录，可通过状态接口查询
+        timer.record(resume.file_type, resume.file_size)
+        response.headers["Server-Timing"] = timer.server_timing()
         
-        db.refresh(resume)
+        if resume.duplicate_of_id is None:
+            # 交给后台流水线执行 OCR → 解析 → 人才画像 → 标签
+            background_tasks.add_task(_run_pipeline, resume.id, ocr_task)
+            message = "简历上传成功，正在后台解析"
+        else:
+            message = "检测到重复简历，已复用解析结果"
         
         # 记录成功创建
-        logger.info(f"成功上传简历: ID={resume.id}, 候选人={resume.candidate_name}")
+        logger.info(f"成功接收简历: ID={resume.id}, 候选人={resume.candidate_name}")
         
         return {
-            "message": "简历上传成功",
+            "message": message,
             "resume_id": resume.id,
+            "duplicate_of_id": resume.duplicate_of_id,
+            "processing_id": resume.id,
             "candidate_name": resume.candidate_name,
             "file_url": resume.file_url,
-            "tags": [tag.name for tag in resume.tags]
+            "processing_status": resume.processing_status,
+            "status_url": f"/api/v1/resumes/{resume.id}/status",
+            "timings": timer.timings
         }
     except HTTPException:
         raise
+    except FileTooLargeError as e:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=str(e)
+        )
     except SQLAlchemyError as e:
         logger.error(f"数据库错误: {str(e)}")
         raise HTTPException(
@@ -108,6 +250,287 @@ async def upload_resume(
             detail=f"简历上传失败: {str(e)}"
         )
 
+def _start_batch_pipelines(
+    accepted: List[Dict[str, Any]],
+    ocr_tasks: Dict[int, asyncio.Task]
+) -> List[asyncio.Task]:
+    """
+    并发执行批量上传的解析流水线
+
+    任务由模块级集合持有，不依赖响应的生命周期：客户端断开连接、
+    响应生成器被取消后，尚未开始的流水线仍会执行完。
+    """
+    semaphore = asyncio.Semaphore(BATCH_CONCURRENCY)
+    
+    async def run(item: Dict[str, Any]) -> Dict[str, Any]:
+        if item["duplicate_of_id"] is not None:
+            return item
+        async with semaphore:
+            success = await _run_pipeline(item["resume_id"], ocr_tasks.get(item["resume_id"]))
+        return {**item, "processing_status": STATUS_COMPLETED if success else STATUS_FAILED}
+    
+    tasks = []
+    for item in accepted:
+        task = asyncio.create_task(run(item))
+        _pipeline_tasks.add(task)
+        task.add_done_callback(_pipeline_tasks.discard)
+        tasks.append(task)
+    return tasks
+
+async def _stream_batch_results(rejected: List[Dict[str, Any]], tasks: List[asyncio.Task]):
+    """按完成顺序逐行输出批量上传的处理结果"""
+    for result in rejected:
+        yield json.dumps(result, ensure_ascii=False) + "\n"
+    
+    for finished in asyncio.as_completed(tasks):
+        yield json.dumps(await finished, ensure_ascii=False) + "\n"
+
+@router.post("/batch", status_code=status.HTTP_202_ACCEPTED)
+async def batch_upload_resumes(
+    request: Request,
+    files: List[UploadFile] = File(...),
+    candidate_names: Optional[str] = Form(None),
+    db: Session = Depends(get_db)
+):
+    """
+    批量上传简历
+    
+    candidate_names 为 {文件名: 候选人姓名} 的JSON对象，未提供时使用文件名作为姓名。
+    文件保存后并发执行解析流水线，响应以NDJSON格式逐行返回每个文件的处理结果。
+    """
+    logger.info(f"批量上传简历: {len(files)}个文件")
+    
+    try:
+        name_mapping = json.loads(candidate_names) if candidate_names else {}
+    except ValueError:
+        name_mapping = None
+    if not isinstance(name_mapping, dict):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="candidate_names 必须是 {文件名: 候选人姓名} 格式的JSON对象"
+        )
+    
+    storage_service = get_storage_service()
+    accepted = []
+    rejected = []
+    ocr_tasks = {}
+    
+    for file in files:
+        candidate_name = name_mapping.get(file.filename) or os.path.splitext(file.filename)[0]
+        try:
+            resume, ocr_task = await _store_resume(db, storage_service, file, candidate_name)
+            if ocr_task is not None:
+                ocr_tasks[resume.id] = ocr_task
+            accepted.append({
+                "filename": file.filename,
+                "resume_id": resume.id,
+                "candidate_name": resume.candidate_name,
+                "file_url": resume.file_url,
+                "duplicate_of_id": resume.duplicate_of_id,
+                "processing_status": resume.processing_status
+            })
+        except HTTPException as e:
+            rejected.append({"filename": file.filename, "processing_status": "rejected", "error": e.detail})
+        except ValueError as e:
+            rejected.append({"filename": file.filename, "processing_status": "rejected", "error": str(e)})
+        except Exception as e:
+            logger.error(f"批量上传简历失败: {file.filename}, 错误: {str(e)}")
+            rejected.append({"filename": file.filename, "processing_status": "rejected", "error": str(e)})
+    
+    logger.info(f"批量上传简历: 接收{len(accepted)}个, 拒绝{len(rejected)}个")
+    
+    tasks = _start_batch_pipelines(accepted, ocr_tasks)
+    return StreamingResponse(
+        _stream_batch_results(rejected, tasks),
+        status_code=status.HTTP_202_ACCEPTED,
+        media_type="application/x-ndjson"
+    )
+
+class _RequestBodyReader:
+    """在线程池中以同步方式按块读取请求体，供存储服务流式写入"""
+    
+    def __init__(self, request: Request):
+        self._chunks = request.stream()
+        self._buffer = b""
+        self._finished = False
+    
+    def read(self, size: int = -1) -> bytes:
+        while not self._finished and (size < 0 or len(self._buffer) < size):
+            try:
+                self._buffer += anyio.from_thread.run(self._chunks.__anext__)
+            except StopAsyncIteration:
+                self._finished = True
+        if size < 0:
+            data, self._buffer = self._buffer, b""
+        else:
+            data, self._buffer = self._buffer[:size], self._buffer[size:]
+        return data
+
+def _deduplicate_direct_upload(resume_id: int, content_hash: Optional[str]) -> bool:
+    """计算直传文件的内容哈希并去重，返回是否需要执行解析流水线"""
+    storage_service = get_storage_service()
+    db = SessionLocal()
+    try:
+        resume = db.query(Resume).filter(Resume.id == resume_id).first()
+        if resume is None:
+            return False
+        if content_hash is None:
+            reader = HashingReader(storage_service.open_file(resume.file_url))
+            try:
+                for _ in reader.chunks():
+                    pass
+            finally:
+                reader.file_obj.close()
+            content_hash = reader.content_hash
+        return claim_content_hash(db, storage_service, resume, content_hash)
+    finally:
+        db.close()
+
+async def _ingest_direct_upload(resume_id: int, content_hash: Optional[str]):
+    """直传上传完成后去重，新内容交给解析流水线；去重失败时仍执行解析"""
+    try:
+        needs_processing = await run_in_threadpool(_deduplicate_direct_upload, resume_id, content_hash)
+    except Exception as e:
+        logger.error(f"直传简历去重失败: ID={resume_id}, 错误: {str(e)}")
+        needs_processing = True
+    if needs_processing:
+        await _run_pipeline(resume_id)
+
+@router.post("/direct-uploads", status_code=status.HTTP_201_CREATED)
+def create_direct_upload(request: Request, upload_data: Dict[str, Any] = Body(...)):
+    """
+    申请直传上传
+    
+    返回签名上传URL和上传凭证。客户端按 upload 中的方法、URL和请求头将文件直接上传到存储，
+    完成后调用 /direct-uploads/complete 提交凭证，文件内容不经过API服务转发。
+    """
+    for field in ["filename", "candidate_name"]:
+        if not upload_data.get(field):
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"缺少必填字段: {field}")
+    filename = upload_data["filename"]
+    file_type = _validate_file_extension(filename)
+    content_type = upload_data.get("content_type") or mimetypes.guess_type(filename)[0] or "application/octet-stream"
+    object_key = f"{uuid.uuid4().hex}.{file_type}"
+    
+    try:
+        upload = get_storage_service().create_upload_url(object_key, content_type, DIRECT_UPLOAD_EXPIRES)
+    except NotImplementedError:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="当前存储服务不支持直传上传")
+    
+    upload_token = sign_payload(
+        {"object_key": object_key, "candidate_name": upload_data["candidate_name"], "file_type": file_type},
+        DIRECT_UPLOAD_EXPIRES
+    )
+    logger.info(f"申请直传上传: {upload_data['candidate_name']}, 文件: {filename}, 对象: {object_key}")
+    return {"upload_token": upload_token, "upload": upload, "expires_in": DIRECT_UPLOAD_EXPIRES}
+
+@router.post("/direct-uploads/complete", status_code=status.HTTP_202_ACCEPTED)
+def complete_direct_upload(
+    request: Request,
+    background_tasks: BackgroundTasks,
+    upload_data: Dict[str, Any] = Body(...),
+    db: Session = Depends(get_db)
+):
+    """完成直传上传，创建简历记录并在后台去重和解析"""
+    try:
+        payload = verify_payload(upload_data.get("upload_token"))
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    
+    try:
+        stored = get_storage_service().complete_upload(payload["object_key"])
+    except FileNotFoundError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    except FileTooLargeError as e:
+        raise HTTPException(status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE, detail=str(e))
+    
+    # 凭证只能使用一次：OSS的对象名不随内容变化，重复提交时已有简历引用同一对象
+    if stored["content_hash"] is None and db.query(Resume).filter(Resume.file_url == stored["file_url"]).first():
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="上传已完成，不能重复提交")
+    
+    resume = Resume(
+        candidate_name=payload["candidate_name"],
+        file_type=payload["file_type"],
+        file_url=stored["file_url"],
+        file_size=stored["file_size"],
+        processing_status=STATUS_PENDING
+    )
+    db.add(resume)
+    if not safe_commit(db, "保存简历失败"):
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="数据库保存失败"
+        )
+    db.refresh(resume)
+    
+    background_tasks.add_task(_ingest_direct_upload, resume.id, stored["content_hash"])
+    logger.info(f"直传简历上传完成: ID={resume.id}, 候选人={resume.candidate_name}")
+    
+    return {
+        "message": "简历上传成功，正在后台解析",
+        "resume_id": resume.id,
+        "processing_id": resume.id,
+        "candidate_name": resume.candidate_name,
+        "file_url": resume.file_url,
+        "processing_status": resume.processing_status,
+        "status_url": f"/api/v1/resumes/{resume.id}/status"
+    }
+
+@router.put("/direct-uploads/{object_key}")
+async def receive_direct_upload(object_key: str, expires: int, signature: str, request: Request):
+    """本地存储的直传接口，校验URL签名后将请求体流式写入暂存目录"""
+    storage_service = get_storage_service()
+    if not isinstance(storage_service, LocalStorageService):
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="当前存储服务不使用本地直传接口")
+    if not storage_service.verify_upload_signature(object_key, expires, signature):
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="上传签名无效或已过期")
+    
+    try:
+        file_size = await run_in_threadpool(
+            storage_service.save_direct_upload, object_key, _RequestBodyReader(request)
+        )
+    except FileTooLargeError as e:
+        raise HTTPException(status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    return {"object_key": object_key, "file_size": file_size}
+
+@router.post("/import", response_model=Dict[str, Any])
+def import_candidates(
+    request: Request,
+    background_tasks: BackgroundTasks,
+    file: UploadFile = File(...),
+    db: Session = Depends(get_db)
+):
+    """
+    从Excel/CSV表格导入候选人
+    
+    第1行为表头，至少包含姓名列；可选简历链接、文件类型、电话、邮箱、学历、工作经验和技能列。
+    表格逐行流式读取并分批写入，响应中返回失败行的行号和原因；
+    有简历链接的行在后台执行解析流水线，其简历ID在 pending_ids 中返回。
+    """
+    file_type = file.filename.split(".")[-1].lower()
+    if file_type not in SPREADSHEET_TYPES:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"不支持的表格类型: {file_type}，支持的类型: {', '.join(SPREADSHEET_TYPES)}"
+        )
+    
+    logger.info(f"导入候选人表格: {file.filename}")
+    try:
+        result = import_spreadsheet(db.get_bind(), file.file, file_type)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    except Exception as e:
+        logger.error(f"导入候选人表格失败: {file.filename}, 错误: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"导入候选人表格失败: {str(e)}"
+        )
+    if result["pending_ids"]:
+        background_tasks.add_task(process_imported_resumes, result["pending_ids"])
+    return result
+
 @router.get("", response_model=Dict[str, Any])
 def get_resumes(request: Request, db: Session = Depends(get_db)):
     """获取所有简历列表"""
@@ -161,6 +584,86 @@ def get_resume(resume_id: int, request: Request, db: Session = Depends(get_db)):
             detail=f"获取简历详情失败: {str(e)}"
         )
 
+@router.get("/{resume_id}/status", response_model=Dict[str, Any])
+def get_resume_status(resume_id: int, request: Request, response: Response, db: Session = Depends(get_db)):
+    """获取简历解析进度"""
+    try:
+        resume = db.query(Resume).filter(Resume.id == resume_id).first()
+        if not resume:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"简历不存在: {resume_id}"
+            )
+        
+        status_dict = resume.to_status_dict()
+        if status_dict["timings"]:
+            response.headers["Server-Timing"] = format_server_timing(status_dict["timings"])
+        return status_dict
+    except HTTPException:
+        raise
+    except SQLAlchemyError as e:
+        logger.error(f"获取简历解析状态失败: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"数据库查询失败: {str(e)}"
+        )
+
+@router.get("/{resume_id}/file")
+def download_resume_file(resume_id: int, request: Request, db: Session = Depends(get_db)):
+    """
+    下载简历原始文件
+    
+    本地存储的文件由本服务发送，支持Range分段请求和ETag条件请求；
+    对象存储中的文件重定向到签名URL，由对象存储处理分段和缓存。
+    压缩存储的文件由本服务发送，客户端支持该编码时发送压缩内容，否则边解压边发送。
+    """
+    resume = db.query(Resume).filter(Resume.id == resume_id).first()
+    if not resume:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"简历不存在: {resume_id}")
+    if not resume.file_url:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"简历没有原始文件: {resume_id}")
+    
+    storage_service = get_storage_service()
+    media_type = mimetypes.guess_type(f"resume.{resume.file_type}")[0] or "application/octet-stream"
+    filename = f"{resume.candidate_name}.{resume.file_type}"
+    if isinstance(storage_service, LocalStorageService) and not resume.file_url.startswith(("http://", "https://")):
+        try:
+            file_path, codec = storage_service.resolve_file(resume.file_url)
+            return file_download_response(
+                request.headers,
+                file_path,
+                media_type,
+                filename,
+                f"private, max-age={RESUME_FILE_CACHE_MAX_AGE}",
+                codec
+            )
+        except (FileNotFoundError, ValueError):
+            logger.warning(f"简历文件不存在: ID={resume_id}, 文件: {resume.file_url}")
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"简历文件不存在: {resume_id}")
+    
+    try:
+        codec = storage_service.get_codec(resume.file_url)
+        if codec:
+            file_obj, codec = storage_service.open_stored(resume.file_url)
+            return encoded_stream_response(request.headers, file_obj, codec, media_type, {
+                "Cache-Control": f"private, max-age={RESUME_FILE_CACHE_MAX_AGE}",
+                "Content-Disposition": content_disposition(filename)
+            })
+    except FileNotFoundError:
+        logger.warning(f"简历文件不存在: ID={resume_id}, 文件: {resume.file_url}")
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"简历文件不存在: {resume_id}")
+    
+    try:
+        download_url = storage_service.create_download_url(resume.file_url, RESUME_FILE_URL_EXPIRES)
+    except NotImplementedError:
+        download_url = resume.file_url
+    # 签名URL过期前允许浏览器复用重定向
+    return RedirectResponse(
+        download_url,
+        status_code=status.HTTP_307_TEMPORARY_REDIRECT,
+        headers={"Cache-Control": f"private, max-age={RESUME_FILE_URL_EXPIRES // 2}"}
+    )
+
 @router.delete("/{resume_id}", status_code=status.HTTP_200_OK)
 def delete_resume(resume_id: int, request: Request, db: Session = Depends(get_db)):
     """删除简历"""
@@ -175,12 +678,13 @@ def delete_resume(resume_id: int, request: Request, db: Session = Depends(get_db
                 detail=f"简历不存在: {resume_id}"
             )
         
-        # 删除存储中的文件
-        try:
-            storage_service = get_storage_service()
-            storage_service.delete_file(resume.file_url)
-        except Exception as e:
-            logger.warning(f"删除文件失败: {str(e)}")
+        # 删除存储中的文件，文件仍被重复简历引用时保留
+        if release_resume(db, resume):
+            try:
+                storage_service = get_storage_service()
+                storage_service.delete_file(resume.file_url)
+            except Exception as e:
+                logger.warning(f"删除文件失败: {str(e)}")
         
         # 删除数据库记录
         db.delete(resume)
@@ -0,0 +1,278 @@
+"""批量导入服务
+
+初始化环境和从旧招聘系统迁移数据时，按批次将JSON/NDJSON数据直接写入数据库，
+每批使用一次 executemany 插入，不经过逐行的ORM对象和HTTP接口。
+简历的技能会批量解析为标签并写入 resume_tag 关联表。
+
+支持的输入格式：
+    - NDJSON（.ndjson/.jsonl），每行一条记录
+    - JSON数组，或 demo_data/*.json 这种 {"resumes": [...]} 的包装格式，按条流式解析
+
+用法:
+    python -m app.services.bulk_import resumes demo_data/resumes.json --batch-size 5000
+"""
+import os
+import json
+import time
+import argparse
+import logging
+from datetime import datetime
+from typing import Any, Dict, Iterator, List, Optional, TextIO
+from sqlalchemy import Table, func, insert, select
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.types import DateTime, JSON, Text
+
+from app.models.resume import Resume
+from app.models.job_requirement import JobRequirement
+from app.models.interview import Interview
+from app.models.onboarding import Onboarding, OnboardingTask
+from app.models.tag import Tag, resume_tag
+
+# 获取日志记录器
+logger = logging.getLogger("hr_recruitment")
+
+# 每批写入的记录数
+IMPORT_BATCH_SIZE = int(os.getenv("BULK_IMPORT_BATCH_SIZE", "5000"))
+
+# 流式解析JSON时每次读取的字符数
+READ_CHUNK_SIZE = 64 * 1024
+
+# 各类数据对应的表和字段别名（旧系统字段名 -> 当前字段名）
+ENTITIES: Dict[str, Dict[str, Any]] = {
+    "resumes": {"table": Resume.__table__, "aliases": {}},
+    "jobs": {"table": JobRequirement.__table__, "aliases": {"job_description": "responsibilities"}},
+    "interviews": {"table": Interview.__table__, "aliases": {"evaluation_score": "score"}},
+    "onboardings": {"table": Onboarding.__table__, "aliases": {}},
+    "onboarding_tasks": {"table": OnboardingTask.__table__, "aliases": {"title": "name"}},
+}
+
+
+def iter_json_array(stream: TextIO) -> Iterator[Dict[str, Any]]:
+    """
+    流式解析JSON数组
+
+    从第一个 '[' 开始逐条解码，不会将整个文件读入内存；
+    兼容 {"resumes": [...]} 这种只包含一个数组的包装对象。
+    """
+    decoder = json.JSONDecoder()
+    buffer = ""
+    position = 0
+    started = False
+
+    while True:
+        if not started:
+            chunk = stream.read(READ_CHUNK_SIZE)
+            if not chunk:
+                return
+            buffer += chunk
+            start = buffer.find("[")
+            if start < 0:
+                continue
+            position = start + 1
+            started = True
+
+        # 跳过空白和分隔符
+        while position < len(buffer) and buffer[position] in " \t\r\n,":
+            position += 1
+        if position < len(buffer) and buffer[position] == "]":
+            return
+
+        try:
+            item, end = decoder.raw_decode(buffer, position)
+        except ValueError:
+            chunk = stream.read(READ_CHUNK_SIZE)
+            if not chunk:
+                raise ValueError("JSON数据不完整")
+            buffer = buffer[position:] + chunk
+            position = 0
+            continue
+
+        yield item
+        position = end
+        if position > READ_CHUNK_SIZE:
+            buffer = buffer[position:]
+            position = 0
+
+
+def iter_records(stream: TextIO, ndjson: bool) -> Iterator[Dict[str, Any]]:
+    """按条读取输入数据"""
+    if ndjson:
+        for line in stream:
+            line = line.strip()
+            if line:
+                yield json.loads(line)
+    else:
+        yield from iter_json_array(stream)
+
+
+def _column_default(column) -> Any:
+    """列的Python端默认值，executemany要求每行字段一致，缺失字段需要补齐"""
+    default = column.default
+    if default is None or not default.is_scalar and not default.is_callable:
+        return None
+    if default.is_callable:
+        return default.arg(None)
+    return default.arg
+
+
+def _convert_value(column, value: Any) -> Any:
+    """将JSON中的值转换为列类型可接受的值"""
+    if value is None:
+        return None
+    if isinstance(column.type, DateTime) and isinstance(value, str):
+        return datetime.fromisoformat(value)
+    if isinstance(column.type, Text) and not isinstance(column.type, JSON) and isinstance(value, (dict, list)):
+        return json.dumps(value, ensure_ascii=False)
+    return value
+
+
+class BulkImporter:
+    """按批次写入一类数据"""
+
+    def __init__(self, bind: Engine, entity: str, batch_size: int = IMPORT_BATCH_SIZE):
+        if entity not in ENTITIES:
+            raise ValueError(f"不支持的数据类型: {entity}，支持的类型: {', '.join(ENTITIES)}")
+        self.bind = bind
+        self.entity = entity
+        self.table: Table = ENTITIES[entity]["table"]
+        self.aliases: Dict[str, str] = ENTITIES[entity]["aliases"]
+        self.batch_size = batch_size
+        self.columns = {column.name: column for column in self.table.columns}
+        self._tag_ids: Dict[str, int] = {}
+        self._next_id: Optional[int] = None
+        self.rows = 0
+        self.tag_links = 0
+
+    def _allocate_id(self, conn: Connection) -> int:
+        """为没有ID的记录分配ID，导入期间不应有其他写入"""
+        if self._next_id is None:
+            self._next_id = (conn.execute(select(func.max(self.table.c.id))).scalar() or 0) + 1
+        allocated = self._next_id
+        self._next_id += 1
+        return allocated
+
+    def _build_row(self, conn: Connection, record: Dict[str, Any], now: datetime) -> Dict[str, Any]:
+        values = {}
+        for key, value in record.items():
+            name = self.aliases.get(key, key)
+            if name in self.columns and name not in values:
+                values[name] = _convert_value(self.columns[name], value)
+
+        row = {}
+        for name, column in self.columns.items():
+            if name in values:
+                row[name] = values[name]
+            elif name in ("created_at", "updated_at"):
+                row[name] = now
+            else:
+                row[name] = _column_default(column)
+        if row.get("id") is None:
+            row["id"] = self._allocate_id(conn)
+        elif self._next_id is not None:
+            self._next_id = max(self._next_id, row["id"] + 1)
+        return row
+
+    @staticmethod
+    def _skills(record: Dict[str, Any]) -> List[str]:
+        """简历记录中的技能，兼容顶层和 parsed_content 中的 skills"""
+        skills = record.get("skills")
+        if skills is None and isinstance(record.get("parsed_content"), dict):
+            skills = record["parsed_content"].get("skills")
+        return [skill for skill in skills or [] if isinstance(skill, str) and skill.strip()]
+
+    def _resolve_tags(self, conn: Connection, names: List[str]) -> Dict[str, int]:
+        """批量查找或创建标签"""
+        missing = [name for name in set(names) if name not in self._tag_ids]
+        if missing:
+            tags = Tag.__table__
+            existing = conn.execute(select(tags.c.id, tags.c.name).where(tags.c.name.in_(missing))).all()
+            self._tag_ids.update({name: tag_id for tag_id, name in existing})
+            new_names = [name for name in missing if name not in self._tag_ids]
+            if new_names:
+                conn.execute(insert(tags), [{"name": name} for name in new_names])
+                created = conn.execute(select(tags.c.id, tags.c.name).where(tags.c.name.in_(new_names))).all()
+                self._tag_ids.update({name: tag_id for tag_id, name in created})
+        return self._tag_ids
+
+    def discard_tag_cache(self):
+        """事务回滚后清空标签缓存，回滚的事务中新建的标签已不存在"""
+        self._tag_ids.clear()
+
+    def write_batch(self, conn: Connection, records: List[Dict[str, Any]]) -> List[int]:
+        """在调用方的事务中写入一批记录，返回按记录顺序排列的ID"""
+        now = datetime.utcnow()
+        rows = [self._build_row(conn, record, now) for record in records]
+        conn.execute(insert(self.table), rows)
+        self.rows += len(rows)
+
+        if self.entity == "resumes":
+            links = []
+            skills_by_row = [(row["id"], self._skills(record)) for row, record in zip(rows, records)]
+            tag_ids = self._resolve_tags(conn, [skill for _, skills in skills_by_row for skill in skills])
+            for resume_id, skills in skills_by_row:
+                for tag_id in {tag_ids[skill] for skill in skills}:
+                    links.append({"resume_id": resume_id, "tag_id": tag_id})
+            if links:
+                conn.execute(insert(resume_tag), links)
+                self.tag_links += len(links)
+        return [row["id"] for row in rows]
+
+    def run(self, records: Iterator[Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        导入数据
+
+        每批在一个事务中写入，某一批失败时该批回滚，之前的批次已提交。
+
+        Returns:
+            导入统计
+        """
+        start = time.perf_counter()
+        batch: List[Dict[str, Any]] = []
+
+        def flush():
+            with self.bind.begin() as conn:
+                self.write_batch(conn, batch)
+            elapsed = time.perf_counter() - start
+            logger.info(f"已导入{self.entity} {self.rows}条，{self.rows / elapsed:.0f}条/秒")
+            batch.clear()
+
+        for record in records:
+            batch.append(record)
+            if len(batch) >= self.batch_size:
+                flush()
+        if batch:
+            flush()
+
+        elapsed = time.perf_counter() - start
+        return {
+            "entity": self.entity,
+            "rows": self.rows,
+            "tag_links": self.tag_links,
+            "seconds": round(elapsed, 3),
+            "rows_per_second": round(self.rows / elapsed) if elapsed > 0 else self.rows
+        }
+
+
+def import_file(bind: Engine, entity: str, path: str, batch_size: int = IMPORT_BATCH_SIZE) -> Dict[str, Any]:
+    """从文件导入一类数据，.ndjson/.jsonl 按行解析，其他按JSON数组流式解析"""
+    ndjson = path.endswith((".ndjson", ".jsonl"))
+    with open(path, "r", encoding="utf-8") as stream:
+        return BulkImporter(bind, entity, batch_size).run(iter_records(stream, ndjson))
+
+
+def main(argv=None):
+    """命令行入口"""
+    parser = argparse.ArgumentParser(description="批量导入简历、职位、面试和入职数据")
+    parser.add_argument("entity", choices=list(ENTITIES), help="数据类型")
+    parser.add_argument("path", help="JSON或NDJSON文件路径")
+    parser.add_argument("--batch-size", type=int, default=IMPORT_BATCH_SIZE, help="每批写入的记录数")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO)
+    from app.database import engine, init_db
+    init_db()
+    print(import_file(engine, args.entity, args.path, args.batch_size))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,42 +1,169 @@
 """GPT服务模块"""
 import os
 import logging
-from typing import List, Dict, Any
+import json
+from typing import Any, Callable, Dict, List, Optional
+
+from app.services.llm_client import get_openai_client
+from app.services.llm_cache import LLM_CACHE_ENABLED, LLMResponseCache, get_llm_cache, make_cache_key
 
 # 获取日志记录器
 logger = logging.getLogger(__name__)
 
+# 提示词模板版本，修改模板后递增对应的版本，使旧的缓存失效
+RESUME_PARSE_PROMPT_VERSION = "1"
+TALENT_PORTRAIT_PROMPT_VERSION = "1"
+CANDIDATE_NAME_PROMPT_VERSION = "1"
+JOB_TAGS_PROMPT_VERSION = "1"
+RESUME_TAGS_PROMPT_VERSION = "1"
+
+def parse_resume_content(content: str) -> Dict[str, Any]:
+    """解析GPT返回的简历结构化内容，格式不正确时抛出异常，结果不写入缓存"""
+    parsed = json.loads(content)
+    if not isinstance(parsed, dict):
+        raise ValueError("简历解析结果不是JSON对象")
+    skills = parsed.get("skills")
+    if skills is not None:
+        if not isinstance(skills, list):
+            raise ValueError("简历解析结果中的skills不是数组")
+        parsed["skills"] = [str(skill).strip() for skill in skills if str(skill).strip()]
+    return parsed
+
 class GPTService:
     """GPT-4服务实现"""
     
-    def __init__(self):
-        """初始化GPT服务"""
+    def __init__(self, client=None, cache: Optional[LLMResponseCache] = None):
+        """
+        初始化GPT服务
+
+        Args:
+            client: OpenAI客户端，默认使用进程内共享的客户端
+            cache: GPT回复缓存，默认使用进程内共享的缓存，模拟模式下不使用缓存
+        """
         self.env = os.getenv("ENV", "development")
         self.mock = self.env in ["development", "test"] or os.getenv("MOCK_SERVICES", "False").lower() == "true"
         self.model = "gpt-4"
         
         if not self.mock:
-            try:
-                import openai
-                self.api_key = os.getenv("OPENAI_API_KEY")
-                if not self.api_key:
-                    logger.warning("未设置OPENAI_API_KEY环境变量，将使用模拟模式")
-                    self.mock = True
-                else:
-                    openai.api_key = self.api_key
-                    # 创建OpenAI客户端
-                    self.openai = openai
-                    logger.info("初始化GPT服务，模型: gpt-4")
-            except ImportError:
-                logger.warning("无法导入openai模块，将使用模拟模式")
+            self.api_key = os.getenv("OPENAI_API_KEY")
+            self.openai = client or get_openai_client()
+            if self.openai is None:
+                logger.warning("未设置OPENAI_API_KEY环境变量或无法导入openai模块，将使用模拟模式")
                 self.mock = True
-        else:
+            else:
+                logger.info("初始化GPT服务，模型: gpt-4")
+        
+        if self.mock:
             # 创建模拟的OpenAI客户端
             from app.services.gpt_mock import MockOpenAI
             self.openai = MockOpenAI()
             logger.info("初始化模拟GPT服务")
+        
+        self.cache = cache
+        if self.cache is None and LLM_CACHE_ENABLED and not self.mock:
+            self.cache = get_llm_cache()
     
-    def generate_talent_portrait(self, text: str) -> str:
+    def complete(
+        self,
+        method: str,
+        prompt_version: str,
+        text: Any,
+        messages: List[Dict[str, str]],
+        temperature: float,
+        max_tokens: int,
+        parse: Optional[Callable[[str], Any]] = None,
+        use_cache: bool = True,
+        **kwargs
+    ) -> Any:
+        """
+        调用GPT对话补全，相同输入的结果从缓存读取
+
+        Args:
+            method: 调用方名称，参与缓存键并按名称统计命中率
+            prompt_version: 提示词模板版本
+            text: 提示词中的输入内容，规范化后参与缓存键
+            messages: 对话消息
+            temperature: 采样温度
+            max_tokens: 最大生成长度
+            parse: 解析回复内容，抛出异常时结果不写入缓存
+            use_cache: 为False时跳过缓存，直接调用API
+            **kwargs: 传给 chat.completions.create 的其他参数
+
+        Returns:
+            解析后的结果，未提供parse时为回复内容
+        """
+        key = None
+        if self.cache is not None:
+            if use_cache:
+                key = make_cache_key(method, self.model, prompt_version, text, temperature)
+                cached = self.cache.get(key, method)
+                if cached is not None:
+                    return cached
+            else:
+                self.cache.record_bypass(method)
+        
+        response = self.openai.chat.completions.create(
+            model=self.model,
+            messages=messages,
+            temperature=temperature,
+            max_tokens=max_tokens,
+            **kwargs
+        )
+        content = response.choices[0].message.content
+        result = parse(content) if parse else content
+        
+        if key is not None:
+            self.cache.set(key, result, method)
+        return result
+    
+    def parse_resume(self, text: str, use_cache: bool = True) -> Dict[str, Any]:
+        """
+        将简历文本解析为结构化内容
+
+        与其他方法不同，调用失败时不返回默认数据，异常由流水线记录为解析阶段失败。
+        """
+        if not text:
+            return {}
+        if self.mock:
+            # 测试环境使用模拟数据
+            logger.info("使用模拟数据解析简历")
+            return {
+                "name": "张三",
+                "education": "本科",
+                "skills": ["Python", "FastAPI", "微服务"],
+                "experience": "8年"
+            }
+        
+        # 构建提示词
+        prompt = f"""
+        请从以下简历内容中提取结构化信息。
+        要求：
+        1. 以JSON对象格式返回，包含字段：name（姓名）、education（学历）、experience（工作经验）、
+           contact（联系方式）、skills（技能数组）
+        2. 找不到的字段不要返回
+        3. 技能使用简短的名称，如"Python"、"Kafka"
+        
+        简历内容：
+        {text}
+        """
+        
+        # 调用GPT-4 API，解析JSON响应
+        return self.complete(
+            "parse_resume",
+            RESUME_PARSE_PROMPT_VERSION,
+            text,
+            messages=[
+                {"role": "system", "content": "你是一位专业的HR招聘助手，擅长分析简历并提取关键信息。"},
+                {"role": "user", "content": prompt}
+            ],
+            temperature=0.2,
+            max_tokens=800,
+            parse=parse_resume_content,
+            use_cache=use_cache,
+            response_format={"type": "json_object"}
+        )
+    
+    def generate_talent_portrait(self, text: str, use_cache: bool = True) -> str:
         """生成人才画像"""
         try:
             if self.mock:
@@ -57,25 +184,24 @@ class GPTService:
             """
             
             # 调用GPT-4 API
-            response = self.openai.chat.completions.create(
-                model=self.model,
+            return self.complete(
+                "generate_talent_portrait",
+                TALENT_PORTRAIT_PROMPT_VERSION,
+                text,
                 messages=[
                     {"role": "system", "content": "你是一位专业的HR招聘助手，擅长分析简历并提取关键信息。"},
                     {"role": "user", "content": prompt}
                 ],
                 temperature=0.7,
-                max_tokens=200
+                max_tokens=200,
+                use_cache=use_cache
             )
-            
-            # 处理响应
-            portrait = response.choices[0].message.content
-            return portrait
                 
         except Exception as e:
             logger.error(f"生成人才画像失败: {str(e)}")
             return "具有8年Python开发经验的高级工程师，在微服务架构和分布式系统方面有丰富经验"
     
-    def extract_candidate_name(self, text: str) -> str:
+    def extract_candidate_name(self, text: str, use_cache: bool = True) -> str:
         """提取候选人姓名"""
         try:
             if self.mock:
@@ -95,23 +221,25 @@ class GPTService:
             """
             
             # 调用GPT-4 API
-            response = self.openai.chat.completions.create(
-                model=self.model,
+            return self.complete(
+                "extract_candidate_name",
+                CANDIDATE_NAME_PROMPT_VERSION,
+                text,
                 messages=[
                     {"role": "system", "content": "你是一位专业的HR招聘助手，擅长分析简历并提取关键信息。"},
                     {"role": "user", "content": prompt}
                 ],
                 temperature=0.3,
-                max_tokens=50
+                max_tokens=50,
+                parse=str.strip,
+                use_cache=use_cache
             )
-            
-            return response.choices[0].message.content.strip()
                 
         except Exception as e:
             logger.error(f"提取候选人姓名失败: {str(e)}")
             return "张三"
     
-    def extract_job_tags(self, text: str) -> List[str]:
+    def extract_job_tags(self, text: str, use_cache: bool = True) -> List[str]:
         """提取职位标签"""
         try:
             if self.mock:
@@ -132,29 +260,27 @@ class GPTService:
             {text}
             """
             
-            # 调用GPT-4 API
-            response = self.openai.chat.completions.create(
-                model=self.model,
+            # 调用GPT-4 API，解析JSON响应
+            return self.complete(
+                "extract_job_tags",
+                JOB_TAGS_PROMPT_VERSION,
+                text,
                 messages=[
                     {"role": "system", "content": "你是一位专业的HR招聘助手，擅长分析职位描述并提取关键标签。"},
                     {"role": "user", "content": prompt}
                 ],
                 temperature=0.5,
                 max_tokens=200,
+                parse=lambda content: json.loads(content).get("tags", []),
+                use_cache=use_cache,
                 response_format={"type": "json_object"}
             )
-            
-            # 解析JSON响应
-            import json
-            content = response.choices[0].message.content
-            tags = json.loads(content).get("tags", [])
-            return tags
                 
         except Exception as e:
             logger.error(f"提取职位标签失败: {str(e)}")
             return ["Python", "微服务", "分布式系统", "8年经验"]
     
-    def generate_resume_tags(self, text: str) -> List[str]:
+    def generate_resume_tags(self, text: str, use_cache: bool = True) -> List[str]:
         """从简历内容中提取标签"""
         try:
             if self.mock:
@@ -175,23 +301,21 @@ class GPTService:
             {text}
             """
             
-            # 调用GPT-4 API
-            response = self.openai.chat.completions.create(
-                model=self.model,
+            # 调用GPT-4 API，解析JSON响应
+            return self.complete(
+                "generate_resume_tags",
+                RESUME_TAGS_PROMPT_VERSION,
+                text,
                 messages=[
                     {"role": "system", "content": "你是一位专业的HR招聘助手，擅长分析简历并提取关键标签。"},
                     {"role": "user", "content": prompt}
                 ],
                 temperature=0.5,
                 max_tokens=200,
+                parse=lambda content: json.loads(content).get("tags", []),
+                use_cache=use_cache,
                 response_format={"type": "json_object"}
             )
-            
-            # 解析JSON响应
-            import json
-            content = response.choices[0].message.content
-            tags = json.loads(content).get("tags", [])
-            return tags
                 
         except Exception as e:
             logger.error(f"提取简历标签失败: {str(e)}")
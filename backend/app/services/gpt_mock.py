@@ -2,14 +2,23 @@ import json
 import os
 from typing import Dict, Any, List, Optional
 import logging
+from types import SimpleNamespace
+
+from app.services.gpt import GPTService as BaseGPTService
 
 logger = logging.getLogger(__name__)
 
-class GPTService:
-    """GPT-4服务的模拟实现"""
+class GPTService(BaseGPTService):
+    """
+    GPT-4服务的模拟实现
+
+    继承真实实现，路由使用的职位标签、匹配评分等方法由基类的模拟模式处理，
+    解析流水线使用的方法返回模拟数据。
+    """
     
     def __init__(self):
         """初始化GPT服务"""
+        super().__init__()
         self.mock_data_path = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), 
                                           "tests", "mocks", "data")
         logger.info(f"初始化模拟GPT服务，数据路径: {self.mock_data_path}")
@@ -227,3 +236,16 @@ class GPTService:
         except Exception as e:
             logger.error(f"读取模拟数据失败: {str(e)}")
             return []
+
+
+class MockOpenAI:
+    """OpenAI客户端的模拟实现，chat.completions.create 返回空的JSON对象"""
+
+    def __init__(self):
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self._create_completion))
+
+    def _create_completion(self, **kwargs):
+        """模拟创建对话补全"""
+        logger.info(f"模拟调用OpenAI对话补全，模型: {kwargs.get('model')}")
+        message = SimpleNamespace(role="assistant", content="{}")
+        return SimpleNamespace(choices=[SimpleNamespace(index=0, message=message, finish_reason="stop")])
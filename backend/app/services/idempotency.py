@@ -0,0 +1,114 @@
+"""幂等请求存储
+
+按 Idempotency-Key 请求头保存接口的首次响应。同一个键的重复请求直接返回
+保存的响应；首次请求仍在处理时，重复请求等待其完成。记录保存在数据库中，
+多个工作进程之间同样生效。
+"""
+import os
+import logging
+from datetime import datetime, timedelta
+from typing import Any, Dict, Optional
+from sqlalchemy.exc import IntegrityError
+
+from app.database import SessionLocal
+from app.models.idempotency import IdempotencyRecord
+from app.utils.db_utils import safe_commit
+
+# 获取日志记录器
+logger = logging.getLogger("hr_recruitment")
+
+# 已完成响应的保留时间（秒）
+IDEMPOTENCY_TTL = int(os.getenv("IDEMPOTENCY_TTL", str(24 * 3600)))
+
+# 处理中的记录超过该时间（秒）视为进程已崩溃，允许重新处理
+IDEMPOTENCY_LOCK_TIMEOUT = int(os.getenv("IDEMPOTENCY_LOCK_TIMEOUT", "300"))
+
+# 记录状态
+STATUS_PROCESSING = "processing"
+STATUS_COMPLETED = "completed"
+
+
+def _find_record(db, key: str, method: str, path: str) -> Optional[IdempotencyRecord]:
+    return db.query(IdempotencyRecord).filter(
+        IdempotencyRecord.idempotency_key == key,
+        IdempotencyRecord.method == method,
+        IdempotencyRecord.path == path
+    ).first()
+
+
+def _is_expired(record: IdempotencyRecord) -> bool:
+    """已完成的记录超过保留时间，或处理中的记录超过锁定时间"""
+    timeout = IDEMPOTENCY_TTL if record.status == STATUS_COMPLETED else IDEMPOTENCY_LOCK_TIMEOUT
+    return record.created_at < datetime.utcnow() - timedelta(seconds=timeout)
+
+
+def _to_dict(record: IdempotencyRecord) -> Dict[str, Any]:
+    return {
+        "status": record.status,
+        "request_hash": record.request_hash,
+        "response_status": record.response_status,
+        "response_body": record.response_body,
+        "content_type": record.content_type
+    }
+
+
+def claim_request(key: str, method: str, path: str, request_hash: Optional[str] = None) -> Optional[Dict[str, Any]]:
+    """
+    占用幂等键，同时记录请求指纹
+
+    Returns:
+        占用成功返回None；键已被占用时返回已有记录
+    """
+    db = SessionLocal()
+    try:
+        record = _find_record(db, key, method, path)
+        if record is not None and _is_expired(record):
+            logger.info(f"幂等记录已过期，重新处理: {method} {path} {key}")
+            db.delete(record)
+            safe_commit(db, "删除过期幂等记录失败")
+            record = None
+        if record is not None:
+            return _to_dict(record)
+
+        db.add(IdempotencyRecord(
+            idempotency_key=key, method=method, path=path, request_hash=request_hash, status=STATUS_PROCESSING
+        ))
+        try:
+            db.commit()
+        except IntegrityError:
+            # 并发请求先一步占用了该键
+            db.rollback()
+            record = _find_record(db, key, method, path)
+            return _to_dict(record) if record else {"status": STATUS_PROCESSING}
+        return None
+    finally:
+        db.close()
+
+
+def complete_request(key: str, method: str, path: str, status_code: int, body: bytes, content_type: Optional[str]):
+    """保存首次请求的响应"""
+    db = SessionLocal()
+    try:
+        record = _find_record(db, key, method, path)
+        if record is None:
+            return
+        record.status = STATUS_COMPLETED
+        record.response_status = status_code
+        record.response_body = body
+        record.content_type = content_type
+        record.completed_at = datetime.utcnow()
+        safe_commit(db, "保存幂等响应失败")
+    finally:
+        db.close()
+
+
+def release_request(key: str, method: str, path: str):
+    """首次请求失败时释放幂等键，允许客户端重试"""
+    db = SessionLocal()
+    try:
+        record = _find_record(db, key, method, path)
+        if record is not None and record.status == STATUS_PROCESSING:
+            db.delete(record)
+            safe_commit(db, "释放幂等键失败")
+    finally:
+        db.close()
@@ -0,0 +1,115 @@
+"""GPT回复缓存
+
+以“调用方法 + 模型 + 提示词模板版本 + 采样温度 + 规范化输入的哈希”为键缓存解析后的GPT回复，
+分为两级：进程内的LRU内存缓存和基于SQLite的磁盘缓存（见 sqlite_cache）。条目超过有效期后失效，
+磁盘缓存超过容量上限时按最近访问时间淘汰。重复保存的职位、重复匹配的简历和职位不再重复调用GPT。
+"""
+import os
+import json
+import time
+import hashlib
+import logging
+import threading
+from typing import Any, Dict, Optional
+
+from app.services.sqlite_cache import SQLiteLRUCache
+
+logger = logging.getLogger(__name__)
+
+# 是否启用GPT回复缓存
+LLM_CACHE_ENABLED = os.getenv("LLM_CACHE_ENABLED", "True").lower() == "true"
+
+# 磁盘缓存文件路径
+LLM_CACHE_PATH = os.getenv("LLM_CACHE_PATH", "./cache/llm_cache.sqlite3")
+
+# 内存缓存的条目数
+LLM_CACHE_MEMORY_SIZE = int(os.getenv("LLM_CACHE_MEMORY_SIZE", "1024"))
+
+# 磁盘缓存的容量上限（字节）
+LLM_CACHE_MAX_BYTES = int(os.getenv("LLM_CACHE_MAX_BYTES", str(128 * 1024 * 1024)))
+
+# 缓存有效期（秒），默认7天
+LLM_CACHE_TTL = int(os.getenv("LLM_CACHE_TTL", str(7 * 24 * 3600)))
+
+
+def normalize_input(text: Any) -> str:
+    """规范化输入，忽略首尾空白和连续空白的差异；非字符串输入（如解析后的简历）按键排序序列化"""
+    if not isinstance(text, str):
+        text = json.dumps(text, ensure_ascii=False, sort_keys=True, default=str) if text is not None else ""
+    return " ".join(text.split())
+
+
+def make_cache_key(method: str, model: str, prompt_version: str, text: Any, temperature: float) -> str:
+    """生成缓存键"""
+    digest = hashlib.sha256(normalize_input(text).encode("utf-8")).hexdigest()
+    return f"{method}:{model}:{prompt_version}:{temperature}:{digest}"
+
+
+class LLMResponseCache(SQLiteLRUCache):
+    """两级GPT回复缓存，另按调用方法统计命中率"""
+
+    table = "llm_cache"
+    extra_columns = {"method": "TEXT NOT NULL DEFAULT ''"}
+
+    def __init__(self, path: str = LLM_CACHE_PATH, memory_size: int = LLM_CACHE_MEMORY_SIZE,
+                 max_bytes: int = LLM_CACHE_MAX_BYTES, ttl: int = LLM_CACHE_TTL, clock=time.time):
+        super().__init__(path, memory_size, max_bytes, ttl, clock)
+        self._methods: Dict[str, Dict[str, int]] = {}
+
+    def encode(self, value: Any) -> str:
+        return json.dumps(value, ensure_ascii=False)
+
+    def decode(self, content: str) -> Any:
+        return json.loads(content)
+
+    def _count(self, method: Optional[str], name: str):
+        """累计按方法的统计"""
+        if method:
+            with self._lock:
+                counters = self._methods.setdefault(method, {"hits": 0, "misses": 0, "bypassed": 0})
+                counters[name] += 1
+
+    def get(self, key: str, method: Optional[str] = None) -> Optional[Any]:
+        """读取缓存，依次查找内存和磁盘，过期的条目视为未命中并删除"""
+        value = super().get(key)
+        self._count(method, "misses" if value is None else "hits")
+        return value
+
+    def set(self, key: str, value: Any, method: Optional[str] = None):
+        """写入缓存，磁盘缓存超过容量时先删除过期条目，再淘汰最久未访问的条目"""
+        super().set(key, value, method=method or "")
+
+    def record_bypass(self, method: Optional[str] = None):
+        """记录一次跳过缓存的调用"""
+        self._count(method, "bypassed")
+
+    def stats(self) -> Dict[str, Any]:
+        """返回命中统计，包括总命中率和按方法的命中率"""
+        stats = super().stats()
+        with self._lock:
+            methods = {method: dict(counters) for method, counters in self._methods.items()}
+        for counters in methods.values():
+            method_lookups = counters["hits"] + counters["misses"]
+            counters["hit_rate"] = counters["hits"] / method_lookups if method_lookups else 0.0
+        stats["methods"] = methods
+        return stats
+
+    def clear(self):
+        """清空缓存和统计"""
+        super().clear()
+        with self._lock:
+            self._methods = {}
+
+
+_cache_instance = None
+_cache_lock = threading.Lock()
+
+
+def get_llm_cache() -> LLMResponseCache:
+    """获取进程内共享的GPT回复缓存"""
+    global _cache_instance
+    if _cache_instance is None:
+        with _cache_lock:
+            if _cache_instance is None:
+                _cache_instance = LLMResponseCache()
+    return _cache_instance
@@ -0,0 +1,109 @@
+"""OpenAI客户端
+
+进程内共享一个OpenAI客户端，底层的httpx连接池保持长连接（已安装h2时使用HTTP/2），
+各请求和各线程复用同一组连接，避免每次调用都重新创建客户端和进行TLS握手。
+客户端在应用启动时创建，应用关闭时释放连接。
+"""
+import os
+import logging
+import threading
+from typing import Optional
+
+import httpx
+
+try:
+    import openai
+except ImportError:
+    openai = None
+
+try:
+    import h2
+except ImportError:
+    h2 = None
+
+logger = logging.getLogger(__name__)
+
+# 连接超时（秒）
+LLM_CONNECT_TIMEOUT = float(os.getenv("LLM_CONNECT_TIMEOUT", "5"))
+
+# 读取超时（秒），生成较长内容时需要适当调大
+LLM_READ_TIMEOUT = float(os.getenv("LLM_READ_TIMEOUT", "60"))
+
+# 等待连接池空闲连接的超时（秒）
+LLM_POOL_TIMEOUT = float(os.getenv("LLM_POOL_TIMEOUT", "10"))
+
+# 连接池最大连接数
+LLM_MAX_CONNECTIONS = int(os.getenv("LLM_MAX_CONNECTIONS", "20"))
+
+# 连接池保留的空闲长连接数
+LLM_MAX_KEEPALIVE = int(os.getenv("LLM_MAX_KEEPALIVE", "10"))
+
+# 空闲长连接的保留时间（秒）
+LLM_KEEPALIVE_EXPIRY = float(os.getenv("LLM_KEEPALIVE_EXPIRY", "60"))
+
+# 是否使用HTTP/2，未安装h2时自动使用HTTP/1.1
+LLM_HTTP2 = os.getenv("LLM_HTTP2", "True").lower() == "true"
+
+# 请求失败时SDK的重试次数
+LLM_MAX_RETRIES = int(os.getenv("LLM_MAX_RETRIES", "2"))
+
+
+def create_http_client(http2: bool = LLM_HTTP2) -> httpx.Client:
+    """创建带连接池和超时配置的httpx客户端"""
+    if http2 and h2 is None:
+        logger.warning("未安装h2，OpenAI请求使用HTTP/1.1")
+        http2 = False
+    return httpx.Client(
+        http2=http2,
+        limits=httpx.Limits(
+            max_connections=LLM_MAX_CONNECTIONS,
+            max_keepalive_connections=LLM_MAX_KEEPALIVE,
+            keepalive_expiry=LLM_KEEPALIVE_EXPIRY
+        ),
+        timeout=httpx.Timeout(
+            LLM_READ_TIMEOUT, connect=LLM_CONNECT_TIMEOUT, pool=LLM_POOL_TIMEOUT
+        )
+    )
+
+
+def create_openai_client(api_key: Optional[str] = None, http_client: Optional[httpx.Client] = None):
+    """
+    创建OpenAI客户端
+
+    Returns:
+        OpenAI客户端，未安装openai或未设置OPENAI_API_KEY时返回None
+    """
+    api_key = api_key or os.getenv("OPENAI_API_KEY")
+    if openai is None or not api_key:
+        return None
+    return openai.OpenAI(
+        api_key=api_key,
+        base_url=os.getenv("OPENAI_BASE_URL") or None,
+        max_retries=LLM_MAX_RETRIES,
+        http_client=http_client or create_http_client()
+    )
+
+
+_instance = None
+_lock = threading.Lock()
+
+
+def get_openai_client():
+    """获取进程内共享的OpenAI客户端，无法创建时返回None"""
+    global _instance
+    if _instance is None:
+        with _lock:
+            if _instance is None:
+                _instance = create_openai_client()
+                if _instance is not None:
+                    logger.info("创建共享OpenAI客户端")
+    return _instance
+
+
+def close_openai_client():
+    """关闭共享的OpenAI客户端，释放连接池中的连接"""
+    global _instance
+    with _lock:
+        client, _instance = _instance, None
+    if client is not None:
+        client.close()
@@ -2,8 +2,17 @@ import os
 import json
 import base64
 import logging
+import threading
 from typing import Optional
 
+from app.services.ocr_client import (
+    OCR_CONNECT_TIMEOUT,
+    OCR_MAX_IN_FLIGHT,
+    OCR_READ_TIMEOUT,
+    AsyncOCRClient,
+)
+from app.services.ocr_scheduler import PRIORITY_INTERACTIVE, OCRDeadlineExceeded, is_throttling_error
+
 # 根据环境变量决定是否使用模拟实现
 if os.getenv("TESTING", "False").lower() == "true":
     from app.services.ocr_mock import Client, RecognizeGeneralRequest
@@ -17,30 +26,88 @@ else:
 
 logger = logging.getLogger(__name__)
 
-class OCRService:
-    def __init__(self):
-        self.client = Client(
-            os.getenv("ALIYUN_REGION_ID", "cn-shanghai"),
-            os.getenv("ALIYUN_ACCESS_KEY", "test_access_key"),
-            os.getenv("ALIYUN_ACCESS_SECRET", "test_access_secret")
-        )
+_client_instance = None
+_client_lock = threading.Lock()
+
+
+def create_ocr_client() -> AsyncOCRClient:
+    """创建OCR客户端，SDK连接池大小与并发上限一致"""
+    client = Client(
+        ak=os.getenv("ALIYUN_ACCESS_KEY", "test_access_key"),
+        secret=os.getenv("ALIYUN_ACCESS_SECRET", "test_access_secret"),
+        region_id=os.getenv("ALIYUN_REGION_ID", "cn-shanghai"),
+        connect_timeout=OCR_CONNECT_TIMEOUT,
+        timeout=OCR_READ_TIMEOUT,
+        pool_size=OCR_MAX_IN_FLIGHT
+    )
+    return AsyncOCRClient(client, OCR_MAX_IN_FLIGHT)
+
+
+def get_ocr_client() -> AsyncOCRClient:
+    """获取进程内共享的OCR客户端"""
+    global _client_instance
+    if _client_instance is None:
+        with _client_lock:
+            if _client_instance is None:
+                _client_instance = create_ocr_client()
+    return _client_instance
+
+
+def close_ocr_client():
+    """关闭共享的OCR客户端，处理完已排队的请求后停止调度线程；客户端未创建时不做任何事"""
+    global _client_instance
+    with _client_lock:
+        client, _client_instance = _client_instance, None
+    if client is not None:
+        client.close()
+
+
+class OCRBackend:
+    """
+    OCR后端接口
+
+    识别方法均为异步方法，识别失败时返回None；由 get_ocr_service 按 OCR_BACKEND 选择实现。
+    """
+    # OCR引擎版本，作为识别结果缓存键的一部分
+    engine_version = "unknown"
     
-    async def extract_text_from_url(self, file_url: str) -> Optional[str]:
+    async def extract_text_from_base64(self, base64_content: str) -> Optional[str]:
+        """从Base64编码的文件内容中提取文本"""
+        raise NotImplementedError
+    
+    async def extract_text_from_file(self, file_url: str) -> Optional[str]:
+        """从已存储的文件中提取文本"""
+        raise NotImplementedError
+
+
+class OCRService(OCRBackend):
+    """阿里云OCR服务"""
+    
+    # OCR引擎版本，作为识别结果缓存键的一部分
+    engine_version = "aliyun-ocr-20191230"
+    
+    def __init__(self, client: Optional[AsyncOCRClient] = None, priority: str = PRIORITY_INTERACTIVE,
+                 deadline: Optional[float] = None):
         """
-        从文件URL中提取文本内容
-        
         Args:
-            file_url: 文件的URL地址
-            
-        Returns:
-            提取的文本内容，如果失败则返回None
+            client: OCR客户端，默认使用进程内共享的客户端
+            priority: 请求的优先级队列，批量重新解析使用 PRIORITY_BULK
+            deadline: 每个请求的截止时间（秒），默认使用该优先级的配置
+        """
+        self.client = client or get_ocr_client()
+        self.priority = priority
+        self.deadline = deadline
+    
+    async def _recognize(self, request) -> Optional[str]:
+        """
+        发送识别请求并提取文本内容，识别失败时返回None
+
+        Raises:
+            OCRDeadlineExceeded: 超过截止时间
+            限流重试后仍然失败时抛出SDK异常，由调用方稍后重试，不当作无法识别处理
         """
         try:
-            request = RecognizeGeneralRequest()
-            request.set_Url(file_url)
-            
-            # 调用阿里云OCR服务
-            response = self.client.do_action_with_exception(request)
+            response = await self.client.do_action(request, self.priority, self.deadline)
             response_json = json.loads(response)
             
             # 提取文本内容
@@ -50,9 +117,30 @@ class OCRService:
             logger.error(f"OCR服务返回格式错误: {response_json}")
             return None
         except Exception as e:
+            if isinstance(e, OCRDeadlineExceeded) or is_throttling_error(e):
+                logger.error(f"OCR服务繁忙: {str(e)}")
+                raise
             logger.error(f"OCR文本提取失败: {str(e)}")
             return None
     
+    async def extract_text_from_url(self, file_url: str) -> Optional[str]:
+        """
+        从文件URL中提取文本内容
+        
+        Args:
+            file_url: 文件的URL地址
+            
+        Returns:
+            提取的文本内容，如果失败则返回None
+        """
+        request = RecognizeGeneralRequest()
+        request.set_Url(file_url)
+        return await self._recognize(request)
+    
+    async def extract_text_from_file(self, file_url: str) -> Optional[str]:
+        """阿里云OCR直接读取文件URL"""
+        return await self.extract_text_from_url(file_url)
+    
     async def extract_text_from_base64(self, base64_content: str) -> Optional[str]:
         """
         从Base64编码的内容中提取文本
@@ -63,20 +151,6 @@ class OCRService:
         Returns:
             提取的文本内容，如果失败则返回None
         """
-        try:
-            request = RecognizeGeneralRequest()
-            request.set_body(base64_content)
-            
-            # 调用阿里云OCR服务
-            response = self.client.do_action_with_exception(request)
-            response_json = json.loads(response)
-            
-            # 提取文本内容
-            if "Data" in response_json and "Content" in response_json["Data"]:
-                return response_json["Data"]["Content"]
-            
-            logger.error(f"OCR服务返回格式错误: {response_json}")
-            return None
-        except Exception as e:
-            logger.error(f"OCR文本提取失败: {str(e)}")
-            return None
+        request = RecognizeGeneralRequest()
+        request.set_body(base64_content)
+        return await self._recognize(request)
@@ -0,0 +1,106 @@
+"""OCR结果缓存
+
+以“OCR引擎版本 + 文件内容哈希”为键缓存识别结果，分为两级：
+进程内的LRU内存缓存和基于SQLite的磁盘缓存（见 sqlite_cache）。磁盘缓存
+超过容量上限时按最近访问时间淘汰。重新解析、失败重试和重复上传都不再重复调用OCR。
+"""
+import os
+import base64
+import asyncio
+import hashlib
+import inspect
+import logging
+import threading
+from typing import Optional
+
+from app.services.sqlite_cache import SQLiteLRUCache
+
+logger = logging.getLogger(__name__)
+
+# 是否启用OCR结果缓存
+OCR_CACHE_ENABLED = os.getenv("OCR_CACHE_ENABLED", "True").lower() == "true"
+
+# 磁盘缓存文件路径
+OCR_CACHE_PATH = os.getenv("OCR_CACHE_PATH", "./cache/ocr_cache.sqlite3")
+
+# 内存缓存的条目数
+OCR_CACHE_MEMORY_SIZE = int(os.getenv("OCR_CACHE_MEMORY_SIZE", "1024"))
+
+# 磁盘缓存的容量上限（字节）
+OCR_CACHE_MAX_BYTES = int(os.getenv("OCR_CACHE_MAX_BYTES", str(512 * 1024 * 1024)))
+
+
+def make_cache_key(content_hash: str, engine_version: str) -> str:
+    """生成缓存键"""
+    return f"{engine_version}:{content_hash}"
+
+
+def get_engine_version(ocr_service) -> str:
+    """获取OCR服务的引擎版本，用于区分不同引擎的识别结果"""
+    return getattr(ocr_service, "engine_version", type(ocr_service).__name__)
+
+
+class OCRResultCache(SQLiteLRUCache):
+    """两级OCR结果缓存，识别结果不设有效期"""
+
+    table = "ocr_cache"
+
+    def __init__(self, path: str = OCR_CACHE_PATH, memory_size: int = OCR_CACHE_MEMORY_SIZE,
+                 max_bytes: int = OCR_CACHE_MAX_BYTES):
+        super().__init__(path, memory_size, max_bytes)
+
+
+_cache_instance = None
+_cache_lock = threading.Lock()
+
+
+def get_ocr_cache() -> OCRResultCache:
+    """获取进程内共享的OCR结果缓存"""
+    global _cache_instance
+    if _cache_instance is None:
+        with _cache_lock:
+            if _cache_instance is None:
+                _cache_instance = OCRResultCache()
+    return _cache_instance
+
+
+def resolve_result(result):
+    """兼容同步和异步的OCR实现"""
+    if inspect.isawaitable(result):
+        return asyncio.run(result)
+    return result
+
+
+class CachedOCRService:
+    """带结果缓存的OCR服务包装器"""
+
+    def __init__(self, ocr_service, cache: Optional[OCRResultCache] = None):
+        self.ocr_service = ocr_service
+        self.cache = cache or get_ocr_cache()
+        self.engine_version = get_engine_version(ocr_service)
+
+    def _cached(self, content_hash: Optional[str], call) -> Optional[str]:
+        if not content_hash:
+            return resolve_result(call())
+
+        key = make_cache_key(content_hash, self.engine_version)
+        cached = self.cache.get(key)
+        if cached is not None:
+            return cached
+
+        text = resolve_result(call())
+        if text:
+            self.cache.set(key, text)
+        return text
+
+    def extract_text_from_file(self, file_url: str, content_hash: Optional[str] = None) -> Optional[str]:
+        """从文件URL提取文本，提供内容哈希时使用缓存"""
+        return self._cached(content_hash, lambda: self.ocr_service.extract_text_from_file(file_url))
+
+    def extract_text_from_base64(self, base64_content: str) -> Optional[str]:
+        """从Base64内容提取文本，按内容哈希缓存"""
+        content_hash = hashlib.sha256(base64.b64decode(base64_content)).hexdigest()
+        return self._cached(content_hash, lambda: self.ocr_service.extract_text_from_base64(base64_content))
+
+    def __getattr__(self, name):
+        return getattr(self.ocr_service, name)
@@ -0,0 +1,98 @@
+"""异步OCR客户端
+
+进程内共享一个阿里云SDK客户端，SDK内部通过连接池保持HTTP长连接。
+阻塞的SDK调用由 OCRScheduler 的工作线程执行，线程数即同时进行的请求数上限，
+超出上限的请求按优先级排队并经令牌桶限速；记录排队数、进行中的请求数、排队耗时和调用耗时。
+调用方可以处于不同的事件循环或线程中，限流对整个进程生效。
+"""
+import os
+import time
+import asyncio
+import threading
+from collections import deque
+from typing import Any, Deque, Dict, Optional
+
+from app.services.ocr_scheduler import PRIORITY_INTERACTIVE, OCRScheduler, percentile
+
+# 同时进行的OCR请求数上限，按阿里云OCR的QPS配额设置
+OCR_MAX_IN_FLIGHT = int(os.getenv("OCR_MAX_IN_FLIGHT", "4"))
+
+# 连接超时（秒）
+OCR_CONNECT_TIMEOUT = int(os.getenv("OCR_CONNECT_TIMEOUT", "5"))
+
+# 读取超时（秒）
+OCR_READ_TIMEOUT = int(os.getenv("OCR_READ_TIMEOUT", "30"))
+
+# 统计耗时分位数时保留的最近样本数
+OCR_METRICS_WINDOW = int(os.getenv("OCR_METRICS_WINDOW", "1024"))
+
+
+class AsyncOCRClient:
+    """对同步OCR SDK客户端的异步包装，限制同时进行的请求数并统计排队和耗时"""
+
+    def __init__(
+        self,
+        client,
+        max_in_flight: int = OCR_MAX_IN_FLIGHT,
+        metrics_window: int = OCR_METRICS_WINDOW,
+        scheduler: Optional[OCRScheduler] = None
+    ):
+        self.client = client
+        self.max_in_flight = max(1, max_in_flight)
+        self.scheduler = scheduler or OCRScheduler(self.max_in_flight, metrics_window=metrics_window)
+        self._lock = threading.Lock()
+        self._in_flight = 0
+        self._counters = {"requests": 0, "completed": 0, "failed": 0}
+        self._latency_ms: Deque[float] = deque(maxlen=metrics_window)
+
+    def _call(self, request) -> bytes:
+        started = time.perf_counter()
+        with self._lock:
+            self._in_flight += 1
+            self._counters["requests"] += 1
+        succeeded = False
+        try:
+            response = self.client.do_action_with_exception(request)
+            succeeded = True
+            return response
+        finally:
+            with self._lock:
+                self._in_flight -= 1
+                self._latency_ms.append((time.perf_counter() - started) * 1000)
+                self._counters["completed" if succeeded else "failed"] += 1
+
+    async def do_action(self, request, priority: str = PRIORITY_INTERACTIVE, deadline: Optional[float] = None) -> bytes:
+        """
+        发送OCR请求，超过并发上限或速率上限时排队等待
+
+        Args:
+            request: SDK请求
+            priority: 优先级队列
+            deadline: 截止时间（秒），默认使用该优先级的配置
+
+        Returns:
+            SDK返回的原始响应内容
+
+        Raises:
+            OCRDeadlineExceeded: 超过截止时间
+            重试后仍然失败时，SDK调用抛出的异常原样抛出
+        """
+        future = self.scheduler.submit(lambda: self._call(request), priority, deadline)
+        return await asyncio.wrap_future(future)
+
+    def metrics(self) -> Dict[str, Any]:
+        """返回调度器的排队统计、进行中的请求数、累计计数和最近请求的耗时分位数（毫秒）"""
+        scheduler_metrics = self.scheduler.metrics()
+        with self._lock:
+            latency_ms = list(self._latency_ms)
+            return {
+                "max_in_flight": self.max_in_flight,
+                **scheduler_metrics,
+                "in_flight": self._in_flight,
+                **self._counters,
+                "latency_ms": {"p50": percentile(latency_ms, 0.5), "p95": percentile(latency_ms, 0.95)}
+            }
+
+    def close(self):
+        """处理完已排队的请求后停止工作线程"""
+        self.scheduler.shutdown()
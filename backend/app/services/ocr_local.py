@@ -0,0 +1,155 @@
+"""本地OCR引擎
+
+使用Tesseract在本机识别简历，不依赖网络，OCR服务商故障时入库不中断。
+识别在进程池中执行，进程数默认为CPU核数；PDF优先用PyMuPDF按页渲染为图片，
+未安装时取出页面中嵌入的扫描图片。通过 OCR_BACKEND=local 启用。
+"""
+import io
+import os
+import base64
+import asyncio
+import logging
+import threading
+import multiprocessing
+from concurrent.futures import Executor, ProcessPoolExecutor
+from functools import lru_cache
+from typing import Iterator, Optional
+
+from app.services.ocr import OCRBackend
+
+try:
+    import pytesseract
+except ImportError:
+    pytesseract = None
+
+try:
+    from PIL import Image
+except ImportError:
+    Image = None
+
+try:
+    import fitz
+except ImportError:
+    fitz = None
+
+try:
+    from pypdf import PdfReader
+except ImportError:
+    PdfReader = None
+
+logger = logging.getLogger(__name__)
+
+# Tesseract识别语言，需安装对应的语言包
+OCR_LOCAL_LANG = os.getenv("OCR_LOCAL_LANG", "chi_sim+eng")
+
+# Tesseract的其他命令行参数
+OCR_LOCAL_CONFIG = os.getenv("OCR_LOCAL_CONFIG", "--psm 3")
+
+# 识别进程数，默认为CPU核数
+OCR_LOCAL_WORKERS = int(os.getenv("OCR_LOCAL_WORKERS", "0")) or os.cpu_count() or 1
+
+# PDF页面渲染分辨率
+OCR_LOCAL_DPI = int(os.getenv("OCR_LOCAL_DPI", "300"))
+
+
+def iter_page_images(content: bytes, dpi: int = OCR_LOCAL_DPI) -> Iterator[bytes]:
+    """将文件内容拆分为逐页的图片数据，非PDF文件视为单张图片"""
+    if not content.startswith(b"%PDF"):
+        yield content
+        return
+
+    if fitz is not None:
+        with fitz.open(stream=content, filetype="pdf") as document:
+            for page in document:
+                yield page.get_pixmap(dpi=dpi).tobytes("png")
+        return
+
+    if PdfReader is None:
+        raise RuntimeError("未安装PyMuPDF或pypdf，无法识别PDF")
+    for page in PdfReader(io.BytesIO(content)).pages:
+        for image in page.images:
+            yield image.data
+
+
+def recognize(content: bytes, lang: str = OCR_LOCAL_LANG, config: str = OCR_LOCAL_CONFIG,
+              dpi: int = OCR_LOCAL_DPI) -> str:
+    """识别文件内容，在进程池的工作进程中执行"""
+    texts = []
+    for image_data in iter_page_images(content, dpi):
+        with Image.open(io.BytesIO(image_data)) as image:
+            texts.append(pytesseract.image_to_string(image, lang=lang, config=config).strip())
+    return "\n".join(text for text in texts if text)
+
+
+@lru_cache(maxsize=1)
+def get_tesseract_version() -> str:
+    """Tesseract版本，作为识别结果缓存键的一部分"""
+    return str(pytesseract.get_tesseract_version())
+
+
+_pool_instance = None
+_pool_lock = threading.Lock()
+
+
+def get_ocr_process_pool() -> ProcessPoolExecutor:
+    """
+    获取进程内共享的识别进程池
+
+    使用spawn启动工作进程，避免在多线程的服务进程中fork。
+    """
+    global _pool_instance
+    if _pool_instance is None:
+        with _pool_lock:
+            if _pool_instance is None:
+                _pool_instance = ProcessPoolExecutor(
+                    max_workers=OCR_LOCAL_WORKERS, mp_context=multiprocessing.get_context("spawn")
+                )
+    return _pool_instance
+
+
+class LocalOCRService(OCRBackend):
+    """基于Tesseract的本地OCR服务"""
+
+    def __init__(self, lang: str = OCR_LOCAL_LANG, executor: Optional[Executor] = None, storage_service=None):
+        """
+        Args:
+            lang: Tesseract识别语言
+            executor: 执行识别的进程池，默认使用进程内共享的进程池
+            storage_service: 读取已存储文件的存储服务，默认按配置创建
+
+        Raises:
+            RuntimeError: 未安装pytesseract或Pillow
+        """
+        if pytesseract is None or Image is None:
+            raise RuntimeError("未安装pytesseract或Pillow，无法使用本地OCR")
+        self.lang = lang
+        self.executor = executor or get_ocr_process_pool()
+        self.storage_service = storage_service
+        self.engine_version = f"tesseract-{get_tesseract_version()}-{lang}"
+
+    async def _recognize(self, content: bytes, source: str) -> Optional[str]:
+        """在进程池中识别，失败时返回None"""
+        try:
+            future = self.executor.submit(recognize, content, self.lang, OCR_LOCAL_CONFIG, OCR_LOCAL_DPI)
+            return await asyncio.wrap_future(future) or None
+        except Exception as e:
+            logger.error(f"本地OCR识别失败: {source}, 原因: {str(e)}")
+            return None
+
+    async def extract_text_from_base64(self, base64_content: str) -> Optional[str]:
+        """从Base64编码的内容中提取文本"""
+        return await self._recognize(base64.b64decode(base64_content), "base64")
+
+    async def extract_text_from_file(self, file_url: str) -> Optional[str]:
+        """从存储中读取文件并提取文本"""
+        storage_service = self.storage_service
+        if storage_service is None:
+            from app.services.service_factory import get_storage_service
+            storage_service = get_storage_service()
+        try:
+            with storage_service.open_file(file_url) as file_obj:
+                content = file_obj.read()
+        except Exception as e:
+            logger.error(f"读取OCR文件失败: {file_url}, 原因: {str(e)}")
+            return None
+        return await self._recognize(content, file_url)
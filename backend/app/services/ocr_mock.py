@@ -1,13 +1,49 @@
 import json
 import os
+import time
 from typing import Dict, Any, Optional
 import logging
 
 logger = logging.getLogger(__name__)
 
+# 模拟OCR接口的响应延迟（秒），用于验证并发控制和排队统计
+OCR_MOCK_LATENCY = float(os.getenv("OCR_MOCK_LATENCY", "0"))
+
+
+class RecognizeGeneralRequest:
+    """阿里云通用文字识别请求的模拟实现"""
+
+    def __init__(self):
+        self.url = None
+        self.body = None
+
+    def set_Url(self, url):
+        self.url = url
+
+    def set_body(self, body):
+        self.body = body
+
+
+class Client:
+    """阿里云 AcsClient 的模拟实现，参数与 AcsClient 一致，可注入响应延迟"""
+
+    def __init__(self, ak=None, secret=None, region_id="cn-shanghai", latency: Optional[float] = None, **kwargs):
+        self.ak = ak
+        self.secret = secret
+        self.region_id = region_id
+        self.latency = OCR_MOCK_LATENCY if latency is None else latency
+
+    def do_action_with_exception(self, request) -> bytes:
+        """返回模拟的OCR结果"""
+        if self.latency:
+            time.sleep(self.latency)
+        return '{"Data": {"Content": "这是一份测试简历\\n姓名：张三\\n学历：本科\\n技能：Python, FastAPI, Vue.js"}}'.encode()
+
 class OCRService:
     """阿里云OCR服务的模拟实现"""
     
+    engine_version = "mock"
+    
     def __init__(self):
         """初始化OCR服务"""
         self.mock_data_path = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), 
@@ -44,6 +80,15 @@ class OCRService:
             logger.error(f"读取模拟数据失败: {str(e)}")
             return "模拟OCR提取的文本内容"
     
+    def extract_text_from_base64(self, base64_content: str) -> str:
+        """从Base64编码的内容中提取文本（模拟实现）"""
+        logger.info("模拟从Base64内容提取文本")
+        
+        if not base64_content:
+            return ""
+        
+        return "姓名：测试用户\n学历：本科\n技能：Python, Java\n工作经验：3年\n联系电话：13800000000"
+    
     def _is_file_empty(self, file_url: str) -> bool:
         """检查文件是否为空"""
         # 模拟实现，实际应该检查文件内容
@@ -53,3 +98,6 @@ class OCRService:
         """获取文件类型"""
         # 从URL中提取文件扩展名
         return file_url.split(".")[-1]
+
+
+MockOCRService = OCRService
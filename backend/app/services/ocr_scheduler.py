@@ -0,0 +1,242 @@
+"""OCR请求调度
+
+发往OCR服务的请求经令牌桶限速，速率与阿里云OCR的QPS配额一致，批量导入时不再触发限流。
+请求分为交互式上传和批量重新解析两个优先级队列，工作线程总是先处理交互式请求。
+仍然遇到限流错误时按带随机抖动的指数退避重试；每个请求有截止时间，
+排队、等待令牌或重试超过截止时间后抛出 OCRDeadlineExceeded。
+"""
+import os
+import time
+import logging
+import threading
+from collections import deque
+from concurrent.futures import Future
+from typing import Any, Callable, Deque, Dict, Optional
+
+from tenacity import Retrying, retry_if_exception, stop_after_attempt, wait_random_exponential
+
+logger = logging.getLogger(__name__)
+
+# 优先级队列，按处理顺序排列
+PRIORITY_INTERACTIVE = "interactive"
+PRIORITY_BULK = "bulk"
+PRIORITIES = (PRIORITY_INTERACTIVE, PRIORITY_BULK)
+
+# 每秒发往OCR服务的请求数上限，按阿里云OCR的QPS配额设置，0表示不限速
+OCR_QPS = float(os.getenv("OCR_QPS", "10"))
+
+# 令牌桶容量，即空闲后允许的突发请求数，默认为一秒的配额
+OCR_BURST = int(os.getenv("OCR_BURST", "0")) or None
+
+# 遇到限流错误时的最大尝试次数
+OCR_RETRY_ATTEMPTS = int(os.getenv("OCR_RETRY_ATTEMPTS", "5"))
+
+# 退避等待的基础时间和上限（秒）
+OCR_RETRY_BASE_DELAY = float(os.getenv("OCR_RETRY_BASE_DELAY", "0.5"))
+OCR_RETRY_MAX_DELAY = float(os.getenv("OCR_RETRY_MAX_DELAY", "10"))
+
+# 各优先级请求的默认截止时间（秒），从提交时开始计算
+OCR_DEADLINES = {
+    PRIORITY_INTERACTIVE: float(os.getenv("OCR_INTERACTIVE_DEADLINE", "60")),
+    PRIORITY_BULK: float(os.getenv("OCR_BULK_DEADLINE", "600")),
+}
+
+
+def percentile(samples, ratio: float) -> float:
+    """计算样本的分位数，保留三位小数"""
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    return round(ordered[min(len(ordered) - 1, int(len(ordered) * ratio))], 3)
+
+
+class OCRDeadlineExceeded(Exception):
+    """OCR请求超过截止时间"""
+
+
+def is_throttling_error(exc: BaseException) -> bool:
+    """判断是否为OCR服务的限流错误"""
+    get_error_code = getattr(exc, "get_error_code", None)
+    error_code = get_error_code() if callable(get_error_code) else ""
+    get_http_status = getattr(exc, "get_http_status", None)
+    http_status = get_http_status() if callable(get_http_status) else None
+    return http_status == 429 or "Throttling" in (error_code or "") or "Throttling" in str(exc)
+
+
+class TokenBucket:
+    """线程安全的令牌桶"""
+
+    def __init__(self, rate: float, capacity: Optional[int] = None, clock: Callable[[], float] = time.monotonic):
+        self.rate = rate
+        self.capacity = max(1, capacity or int(rate) or 1)
+        self.clock = clock
+        self._tokens = float(self.capacity)
+        self._updated = clock()
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float):
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def acquire(self, deadline: Optional[float] = None, sleep: Callable[[float], None] = time.sleep) -> bool:
+        """
+        取得一个令牌，令牌不足时等待
+
+        Args:
+            deadline: 截止时刻（与 clock 同一时钟），在此之前无法取得令牌时立即返回False
+        """
+        if self.rate <= 0:
+            return True
+        while True:
+            with self._lock:
+                now = self.clock()
+                self._refill(now)
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return True
+                wait = (1 - self._tokens) / self.rate
+            if deadline is not None and now + wait > deadline:
+                return False
+            sleep(wait)
+
+
+class _Job:
+    __slots__ = ("fn", "priority", "deadline", "enqueued_at", "future")
+
+    def __init__(self, fn: Callable[[], Any], priority: str, deadline: float, enqueued_at: float):
+        self.fn = fn
+        self.priority = priority
+        self.deadline = deadline
+        self.enqueued_at = enqueued_at
+        self.future = Future()
+
+
+class OCRScheduler:
+    """按优先级、令牌桶和截止时间调度OCR请求的工作线程池"""
+
+    def __init__(
+        self,
+        workers: int,
+        rate: float = OCR_QPS,
+        burst: Optional[int] = OCR_BURST,
+        retry_attempts: int = OCR_RETRY_ATTEMPTS,
+        retry_base_delay: float = OCR_RETRY_BASE_DELAY,
+        retry_max_delay: float = OCR_RETRY_MAX_DELAY,
+        metrics_window: int = 1024,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], None] = time.sleep
+    ):
+        self.workers = max(1, workers)
+        self.bucket = TokenBucket(rate, burst, clock)
+        self.retry_attempts = max(1, retry_attempts)
+        self.retry_base_delay = retry_base_delay
+        self.retry_max_delay = retry_max_delay
+        self.clock = clock
+        self.sleep = sleep
+        self._queues: Dict[str, Deque[_Job]] = {priority: deque() for priority in PRIORITIES}
+        self._condition = threading.Condition()
+        self._threads = []
+        self._shutdown = False
+        self._counters = {"max_queued": 0, "throttled": 0, "deadline_exceeded": 0}
+        self._wait_ms: Deque[float] = deque(maxlen=metrics_window)
+
+    def submit(self, fn: Callable[[], Any], priority: str = PRIORITY_INTERACTIVE,
+               deadline: Optional[float] = None) -> Future:
+        """
+        提交请求
+
+        Args:
+            fn: 发送请求的函数，在工作线程中调用
+            priority: 优先级队列
+            deadline: 截止时间（秒），默认使用该优先级的配置
+        """
+        if priority not in self._queues:
+            raise ValueError(f"不支持的OCR优先级: {priority}")
+        now = self.clock()
+        job = _Job(fn, priority, now + (deadline if deadline is not None else OCR_DEADLINES[priority]), now)
+        with self._condition:
+            if self._shutdown:
+                raise RuntimeError("OCR调度器已关闭")
+            self._queues[priority].append(job)
+            queued = sum(len(queue) for queue in self._queues.values())
+            self._counters["max_queued"] = max(self._counters["max_queued"], queued)
+            if len(self._threads) < self.workers:
+                thread = threading.Thread(target=self._work, name=f"ocr-{len(self._threads)}", daemon=True)
+                self._threads.append(thread)
+                thread.start()
+            self._condition.notify()
+        return job.future
+
+    def _next_job(self) -> Optional[_Job]:
+        with self._condition:
+            while True:
+                for priority in PRIORITIES:
+                    if self._queues[priority]:
+                        return self._queues[priority].popleft()
+                if self._shutdown:
+                    return None
+                self._condition.wait()
+
+    def _work(self):
+        while True:
+            job = self._next_job()
+            if job is None:
+                return
+            if not job.future.set_running_or_notify_cancel():
+                continue
+            with self._condition:
+                self._wait_ms.append((self.clock() - job.enqueued_at) * 1000)
+            try:
+                job.future.set_result(self._run(job))
+            except BaseException as e:
+                if isinstance(e, OCRDeadlineExceeded):
+                    with self._condition:
+                        self._counters["deadline_exceeded"] += 1
+                job.future.set_exception(e)
+
+    def _run(self, job: _Job) -> Any:
+        """取得令牌后发送请求，遇到限流错误时退避重试，等待时间不超过截止时间"""
+        backoff = wait_random_exponential(multiplier=self.retry_base_delay, max=self.retry_max_delay)
+
+        def wait(retry_state) -> float:
+            return max(0.0, min(backoff(retry_state), job.deadline - self.clock()))
+
+        def before_sleep(retry_state):
+            with self._condition:
+                self._counters["throttled"] += 1
+            logger.warning(f"OCR服务限流，第{retry_state.attempt_number}次尝试失败，退避后重试")
+
+        retrying = Retrying(
+            retry=retry_if_exception(is_throttling_error),
+            stop=stop_after_attempt(self.retry_attempts),
+            wait=wait,
+            sleep=self.sleep,
+            before_sleep=before_sleep,
+            reraise=True
+        )
+        for attempt in retrying:
+            with attempt:
+                if self.clock() >= job.deadline or not self.bucket.acquire(job.deadline, self.sleep):
+                    raise OCRDeadlineExceeded(f"OCR请求超过截止时间（{job.priority}）")
+                return job.fn()
+
+    def metrics(self) -> Dict[str, Any]:
+        """返回各优先级的排队数、限流重试次数、超时数和排队耗时分位数（毫秒）"""
+        with self._condition:
+            wait_ms = list(self._wait_ms)
+            lanes = {priority: len(queue) for priority, queue in self._queues.items()}
+            return {
+                "qps": self.bucket.rate,
+                "queued": sum(lanes.values()),
+                "lanes": lanes,
+                **self._counters,
+                "queue_wait_ms": {"p50": percentile(wait_ms, 0.5), "p95": percentile(wait_ms, 0.95)}
+            }
+
+    def shutdown(self):
+        """处理完已排队的请求后停止工作线程"""
+        with self._condition:
+            self._shutdown = True
+            self._condition.notify_all()
+        for thread in self._threads:
+            thread.join()
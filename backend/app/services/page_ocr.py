@@ -0,0 +1,125 @@
+"""分页OCR服务
+
+多页扫描版PDF按页拆分后并发识别，每页独立重试，最后按页码顺序拼接文本。
+已有可用文本层的页面直接使用文本层，不再调用OCR；单页结果的缓存由
+CachedOCRService 按页面内容哈希完成。
+"""
+import io
+import os
+import time
+import base64
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import BinaryIO, List, NamedTuple, Optional
+
+from app.services.ocr_cache import resolve_result
+from app.services.text_extractor import PdfReader, is_readable_text
+
+try:
+    from pypdf import PdfWriter
+except ImportError:
+    PdfWriter = None
+
+logger = logging.getLogger(__name__)
+
+# 同时识别的页数上限
+OCR_PAGE_CONCURRENCY = int(os.getenv("OCR_PAGE_CONCURRENCY", "4"))
+
+# 单页识别失败后的重试次数
+OCR_PAGE_RETRIES = int(os.getenv("OCR_PAGE_RETRIES", "2"))
+
+# 重试的基础等待时间（秒），按重试次数翻倍
+OCR_PAGE_RETRY_DELAY = float(os.getenv("OCR_PAGE_RETRY_DELAY", "0.5"))
+
+
+class PageOCRResult(NamedTuple):
+    """分页识别结果"""
+    text: Optional[str]
+    # 识别失败的页码（从1开始），部分页面失败的结果不应缓存
+    failed_pages: List[int]
+
+    @property
+    def complete(self) -> bool:
+        return bool(self.text) and not self.failed_pages
+
+
+def render_page(reader, index: int) -> bytes:
+    """
+    获取单页的识别内容
+
+    扫描页通常只包含一张整页图片，直接取出图片数据；
+    其他情况把该页单独写成一个PDF。
+    """
+    page = reader.pages[index]
+    try:
+        images = page.images
+        if len(images) == 1:
+            return images[0].data
+    except Exception as e:
+        logger.debug(f"提取第{index + 1}页图片失败: {str(e)}")
+
+    writer = PdfWriter()
+    writer.add_page(page)
+    buffer = io.BytesIO()
+    writer.write(buffer)
+    return buffer.getvalue()
+
+
+def ocr_page(ocr_service, page_content: bytes) -> Optional[str]:
+    """识别单页内容，失败时按指数退避重试"""
+    base64_content = base64.b64encode(page_content).decode()
+    for attempt in range(OCR_PAGE_RETRIES + 1):
+        try:
+            text = resolve_result(ocr_service.extract_text_from_base64(base64_content))
+            if text:
+                return text
+            logger.warning(f"单页OCR结果为空，第{attempt + 1}次尝试")
+        except Exception as e:
+            logger.warning(f"单页OCR失败，第{attempt + 1}次尝试: {str(e)}")
+        if attempt < OCR_PAGE_RETRIES:
+            time.sleep(OCR_PAGE_RETRY_DELAY * (2 ** attempt))
+    return None
+
+
+def ocr_pdf_pages(file_obj: BinaryIO, ocr_service) -> PageOCRResult:
+    """
+    分页识别PDF
+
+    Args:
+        file_obj: 可随机访问的PDF文件对象
+        ocr_service: OCR服务实例
+
+    Returns:
+        按页码顺序拼接的文本和识别失败的页码；无法拆分或所有页都识别失败时文本为None
+    """
+    if PdfReader is None or PdfWriter is None:
+        return PageOCRResult(None, [])
+
+    reader = PdfReader(file_obj)
+    page_count = len(reader.pages)
+    texts: List[Optional[str]] = [None] * page_count
+    pending = {}
+
+    for index, page in enumerate(reader.pages):
+        text = page.extract_text() or ""
+        if is_readable_text(text):
+            texts[index] = text.strip()
+        else:
+            pending[index] = render_page(reader, index)
+
+    if pending:
+        workers = max(1, min(OCR_PAGE_CONCURRENCY, len(pending)))
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = {index: executor.submit(ocr_page, ocr_service, content) for index, content in pending.items()}
+            for index, future in futures.items():
+                texts[index] = future.result()
+
+    failed_pages = [index + 1 for index, text in enumerate(texts) if not text]
+    if failed_pages:
+        logger.warning(f"以下页面OCR失败: {failed_pages}，共{page_count}页")
+    if len(failed_pages) == page_count:
+        return PageOCRResult(None, failed_pages)
+
+    if pending:
+        logger.info(f"分页OCR完成: 共{page_count}页，OCR识别{len(pending)}页")
+    return PageOCRResult("\n".join(text for text in texts if text), failed_pages)
@@ -0,0 +1,136 @@
+"""简历去重服务
+
+按文件内容的SHA-256识别重复上传的简历。content_hash 只保存在首次上传的
+简历记录上（唯一索引），重复上传的记录通过 duplicate_of_id 指向它，
+并直接复用其文件地址、OCR文本、解析结果、人才画像和标签。
+"""
+import logging
+from typing import List, Optional
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.models.resume import Resume
+
+# 获取日志记录器
+logger = logging.getLogger("hr_recruitment")
+
+# 需要从原始简历复制的解析结果字段
+RESULT_FIELDS = [
+    "ocr_content", "parsed_content", "talent_portrait",
+    "processing_status", "ocr_status", "parse_status", "portrait_status", "tag_status",
+    "processing_error"
+]
+
+
+def find_resume_by_hash(db: Session, content_hash: str) -> Optional[Resume]:
+    """根据内容哈希查找已上传的简历"""
+    if not content_hash:
+        return None
+    return db.query(Resume).filter(Resume.content_hash == content_hash).first()
+
+
+def copy_processing_results(source: Resume, target: Resume):
+    """将原始简历的解析结果复制到重复简历"""
+    for field in RESULT_FIELDS:
+        setattr(target, field, getattr(source, field))
+    target.tags = list(source.tags)
+
+
+def link_duplicate(original: Resume, resume: Resume):
+    """将新简历关联到内容相同的原始简历"""
+    resume.duplicate_of_id = original.id
+    resume.file_url = original.file_url
+    copy_processing_results(original, resume)
+
+
+def sync_duplicates(db: Session, original: Resume) -> int:
+    """原始简历解析完成后，将结果同步给所有关联的重复简历"""
+    duplicates = db.query(Resume).filter(Resume.duplicate_of_id == original.id).all()
+    for duplicate in duplicates:
+        copy_processing_results(original, duplicate)
+    return len(duplicates)
+
+
+def release_resume(db: Session, resume: Resume) -> bool:
+    """
+    删除简历前解除重复关联
+
+    若被删除的是原始简历，则将内容哈希和关联关系转移给第一个重复简历。
+
+    Returns:
+        存储中的文件不再被其他简历引用、可以删除时返回True
+    """
+    if resume.duplicate_of_id is not None:
+        return False
+
+    duplicates: List[Resume] = (
+        db.query(Resume)
+        .filter(Resume.duplicate_of_id == resume.id)
+        .order_by(Resume.id)
+        .all()
+    )
+    if not duplicates:
+        return True
+
+    successor = duplicates[0]
+    content_hash = resume.content_hash
+    resume.content_hash = None
+    db.flush()
+
+    successor.content_hash = content_hash
+    successor.duplicate_of_id = None
+    for duplicate in duplicates[1:]:
+        duplicate.duplicate_of_id = successor.id
+
+    logger.info(f"简历{resume.id}被删除，重复简历{successor.id}成为原始简历")
+    return False
+
+
+def release_uploaded_file(storage_service, uploaded_url: str, resume: Resume):
+    """
+    简历改为关联原始简历后，释放本次上传写入的文件
+
+    不计引用的存储中，原始简历引用同一个文件时（如重复提交的上传）不能删除。
+    """
+    if not uploaded_url or not (storage_service.counts_references or uploaded_url != resume.file_url):
+        return
+    try:
+        storage_service.delete_file(uploaded_url)
+    except Exception as e:
+        logger.warning(f"释放重复上传的文件失败: {uploaded_url}, 原因: {str(e)}")
+
+
+def claim_content_hash(db: Session, storage_service, resume: Resume, content_hash: str) -> bool:
+    """
+    为已保存文件的简历记录内容哈希，内容与已有简历相同时改为关联原始简历
+
+    用于直传上传完成后：文件已由客户端写入存储，重复时释放本次上传的文件。
+
+    Returns:
+        简历需要执行解析流水线时返回True，已关联原始简历时返回False
+    """
+    uploaded_url = resume.file_url
+    original = find_resume_by_hash(db, content_hash)
+    if original is not None and original.id != resume.id and original.processing_status != "failed":
+        link_duplicate(original, resume)
+    else:
+        if original is not None and original.id != resume.id:
+            # 原始简历解析失败，由新简历接管内容哈希并重新解析
+            original.content_hash = None
+            db.flush()
+        resume.content_hash = content_hash
+        try:
+            db.commit()
+            return True
+        except IntegrityError:
+            # 并发完成相同内容的上传时唯一索引冲突，改为关联先提交的简历
+            db.rollback()
+            original = find_resume_by_hash(db, content_hash)
+            if original is None:
+                raise
+            link_duplicate(original, resume)
+
+    db.commit()
+    release_uploaded_file(storage_service, uploaded_url, resume)
+    logger.info(f"直传简历{resume.id}与简历{resume.duplicate_of_id}内容相同，已复用解析结果")
+    return False
@@ -0,0 +1,316 @@
+"""简历解析流水线
+
+上传接口只负责保存文件并创建简历记录，OCR（文本提取）→ 解析 → 人才画像 → 标签
+四个阶段由本模块在后台依次执行，每个阶段的状态都会写回简历记录，
+前端可通过 GET /api/v1/resumes/{id}/status 查询进度。
+"""
+import os
+import json
+import base64
+import hashlib
+import logging
+from typing import Any, BinaryIO, Callable, Dict, List, Optional, Tuple
+from sqlalchemy.orm import Session
+
+from app.database import SessionLocal
+from app.models.resume import Resume
+from app.services.service_factory import get_ocr_service, get_gpt_service, get_storage_service
+from app.services.text_extractor import extract_text, SUPPORTED_FILE_TYPES, ensure_seekable
+from app.services.page_ocr import PageOCRResult, ocr_pdf_pages
+from app.services.ocr_scheduler import PRIORITY_INTERACTIVE
+from app.services.ocr_cache import (
+    OCR_CACHE_ENABLED, get_ocr_cache, get_engine_version, make_cache_key, resolve_result
+)
+from app.services.tag import create_or_get_tags
+from app.services.resume_dedup import sync_duplicates
+from app.utils.db_utils import safe_commit
+from app.utils.metrics import StageTimer
+
+# 获取日志记录器
+logger = logging.getLogger("hr_recruitment")
+
+# 阶段状态
+STATUS_PENDING = "pending"
+STATUS_RUNNING = "running"
+STATUS_COMPLETED = "completed"
+STATUS_FAILED = "failed"
+
+# OCR无结果时写入的占位文本
+EMPTY_OCR_CONTENT = "无法提取文本内容"
+
+# 解析版本，修改GPT提示词或标签词表后递增，批量重新解析时据此判断简历是否需要重跑
+ENRICHMENT_VERSION = os.getenv("RESUME_ENRICHMENT_VERSION", "1")
+
+
+def load_parsed_content(resume: Resume) -> Dict[str, Any]:
+    """读取简历的结构化解析结果"""
+    if not resume.parsed_content:
+        return {}
+    if isinstance(resume.parsed_content, dict):
+        return resume.parsed_content
+    try:
+        return json.loads(resume.parsed_content)
+    except (TypeError, ValueError):
+        return {}
+
+
+def compute_enrichment_hash(ocr_content: Optional[str]) -> str:
+    """计算解析阶段的输入指纹"""
+    payload = f"{ENRICHMENT_VERSION}\n{ocr_content or ''}"
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def extract_local_text(open_file: Callable[[], BinaryIO], file_type: str, source: str) -> Optional[str]:
+    """读取数字版PDF/DOCX的文本层，无法读取时返回None"""
+    if file_type not in SUPPORTED_FILE_TYPES:
+        return None
+    try:
+        with open_file() as file_obj:
+            return extract_text(file_obj, file_type)
+    except Exception as e:
+        logger.info(f"无法读取简历文件，使用OCR提取文本: {source}, 原因: {str(e)}")
+        return None
+
+
+def extract_pdf_by_page(open_file: Callable[[], BinaryIO], ocr_service, source: str) -> PageOCRResult:
+    """分页读取PDF，文本层可读的页面直接使用，其余页面并发OCR；无法读取文件时文本为None"""
+    try:
+        with open_file() as file_obj:
+            return ocr_pdf_pages(ensure_seekable(file_obj), ocr_service)
+    except Exception as e:
+        logger.info(f"无法分页识别简历，整体调用OCR: {source}, 原因: {str(e)}")
+        return PageOCRResult(None, [])
+
+
+def extract_resume_text(
+    open_file: Callable[[], BinaryIO],
+    file_type: str,
+    services: Dict[str, Any],
+    whole_file_ocr: Callable[[], Optional[str]],
+    source: str
+) -> Tuple[Optional[str], bool]:
+    """
+    依次尝试文本层（PDF按页读取，只对无法读取的页面OCR）和整份文件OCR
+
+    Returns:
+        提取的文本，以及结果是否完整、可以写入OCR缓存（部分页面识别失败时为False）
+    """
+    if file_type == "pdf":
+        # 一次读取同时完成文本层提取和扫描页OCR，部分页面无文本层时不丢弃可读页面
+        pages = extract_pdf_by_page(open_file, services["ocr"], source)
+        if pages.text:
+            return pages.text, pages.complete
+    else:
+        ocr_content = extract_local_text(open_file, file_type, source)
+        if ocr_content:
+            logger.info(f"使用本地文本层提取简历内容: {source}")
+            return ocr_content, True
+    return whole_file_ocr(), True
+
+
+def _get_cache_key(services: Dict[str, Any], content_hash: Optional[str]) -> Optional[str]:
+    """OCR缓存键，未启用缓存或缺少内容哈希时返回None"""
+    if services.get("ocr_cache") is None or not content_hash:
+        return None
+    return make_cache_key(content_hash, get_engine_version(services["ocr"]))
+
+
+def extract_staged_text(
+    path: str,
+    file_type: str,
+    content_hash: Optional[str],
+    services: Optional[Dict[str, Any]] = None
+) -> Optional[str]:
+    """
+    从本地暂存文件提取文本
+
+    上传接口在写入存储的同时调用，直接使用上传的字节识别，
+    不必等待存储完成后再从存储读回文件。
+
+    Returns:
+        提取的文本；未能提取时返回None，由流水线OCR阶段重新处理
+    """
+    services = services or create_services()
+    cache_key = _get_cache_key(services, content_hash)
+    if cache_key:
+        cached = services["ocr_cache"].get(cache_key)
+        if cached:
+            return cached
+
+    def whole_file_ocr():
+        with open(path, "rb") as file_obj:
+            content = base64.b64encode(file_obj.read()).decode()
+        return resolve_result(services["ocr"].extract_text_from_base64(content))
+
+    ocr_content, complete = extract_resume_text(
+        lambda: open(path, "rb"), file_type, services, whole_file_ocr, path
+    )
+    if ocr_content and complete and cache_key:
+        services["ocr_cache"].set(cache_key, ocr_content)
+    return ocr_content or None
+
+
+def run_ocr_stage(db: Session, resume: Resume, services: Dict[str, Any]):
+    """OCR阶段：优先使用上传时已提取的文本、缓存和文件自带的文本层，扫描件再调用OCR服务"""
+    prefetched = services.get("prefetched_ocr")
+    if prefetched:
+        logger.info(f"使用上传时提取的文本: ID={resume.id}")
+        resume.ocr_content = prefetched
+        return
+
+    cache_key = _get_cache_key(services, resume.content_hash)
+    if cache_key:
+        cached = services["ocr_cache"].get(cache_key)
+        if cached:
+            logger.info(f"命中OCR缓存: ID={resume.id}")
+            resume.ocr_content = cached
+            return
+
+    storage_service = services["storage"]
+    ocr_content, complete = extract_resume_text(
+        lambda: storage_service.open_file(resume.file_url),
+        resume.file_type,
+        services,
+        lambda: resolve_result(services["ocr"].extract_text_from_file(resume.file_url)),
+        resume.file_url
+    )
+
+    if not ocr_content:
+        logger.warning(f"OCR提取文本为空: {resume.file_url}")
+        ocr_content = EMPTY_OCR_CONTENT
+    elif complete and cache_key:
+        services["ocr_cache"].set(cache_key, ocr_content)
+    resume.ocr_content = ocr_content
+
+
+def run_parse_stage(db: Session, resume: Resume, services: Dict[str, Any]):
+    """解析阶段：将OCR文本解析为结构化内容"""
+    parsed_content = services["gpt"].parse_resume(resume.ocr_content)
+    resume.parsed_content = json.dumps(parsed_content or {}, ensure_ascii=False)
+
+
+def run_portrait_stage(db: Session, resume: Resume, services: Dict[str, Any]):
+    """人才画像阶段"""
+    resume.talent_portrait = services["gpt"].generate_talent_portrait(load_parsed_content(resume))
+
+
+def run_tag_stage(db: Session, resume: Resume, services: Dict[str, Any]):
+    """标签阶段：根据技能创建并关联标签"""
+    parsed_content = load_parsed_content(resume)
+    if parsed_content and "skills" in parsed_content:
+        resume.tags = create_or_get_tags(db, parsed_content["skills"])
+
+
+# 流水线阶段，按顺序执行
+PIPELINE_STAGES: List[Tuple[str, Callable]] = [
+    ("ocr", run_ocr_stage),
+    ("parse", run_parse_stage),
+    ("portrait", run_portrait_stage),
+    ("tag", run_tag_stage),
+]
+
+# 已有OCR文本时重新解析只需执行的阶段
+ENRICHMENT_STAGES = PIPELINE_STAGES[1:]
+
+
+def create_services(ocr_priority: str = PRIORITY_INTERACTIVE) -> Dict[str, Any]:
+    """
+    创建流水线使用的外部服务
+
+    Args:
+        ocr_priority: OCR请求的优先级队列，批量处理使用 PRIORITY_BULK
+    """
+    return {
+        "ocr": get_ocr_service(ocr_priority),
+        "gpt": get_gpt_service(),
+        "storage": get_storage_service(),
+        "ocr_cache": get_ocr_cache() if OCR_CACHE_ENABLED else None
+    }
+
+
+def _set_stage_status(resume: Resume, stage: str, stage_status: str):
+    """更新单个阶段的状态字段"""
+    setattr(resume, f"{stage}_status", stage_status)
+
+
+def _finish_timing(resume: Resume, timer: StageTimer):
+    """保存本次运行各阶段的耗时并写入直方图"""
+    resume.stage_timings = json.dumps(timer.timings)
+    timer.record(resume.file_type, resume.file_size)
+
+
+def process_resume(
+    resume_id: int,
+    session_factory: Callable[[], Session] = SessionLocal,
+    stages: Optional[List[Tuple[str, Callable]]] = None,
+    services: Optional[Dict[str, Any]] = None,
+    ocr_content: Optional[str] = None
+) -> bool:
+    """
+    执行简历解析流水线
+
+    作为后台任务运行，使用独立的数据库会话；每个阶段完成后立即提交，
+    任一阶段失败时记录错误并停止后续阶段。各阶段和数据库提交的耗时
+    保存到 stage_timings 并写入入库耗时直方图。
+
+    Args:
+        resume_id: 简历ID
+        session_factory: 数据库会话工厂
+        stages: 需要执行的阶段，默认执行全部阶段
+        services: 外部服务，批量处理时由调用方共享，默认新建
+        ocr_content: 上传时已提取的文本，提供时OCR阶段直接使用
+
+    Returns:
+        全部阶段成功返回True，否则返回False
+    """
+    db = session_factory()
+    try:
+        resume = db.query(Resume).filter(Resume.id == resume_id).first()
+        if not resume:
+            logger.error(f"简历解析失败，简历不存在: {resume_id}")
+            return False
+
+        resume.processing_status = STATUS_RUNNING
+        resume.processing_error = None
+        safe_commit(db, "更新简历解析状态失败")
+
+        services = services or create_services()
+        if ocr_content:
+            services = {**services, "prefetched_ocr": ocr_content}
+        timer = StageTimer()
+
+        for stage, handler in stages or PIPELINE_STAGES:
+            _set_stage_status(resume, stage, STATUS_RUNNING)
+            with timer.stage("db_commit"):
+                safe_commit(db, f"更新简历解析状态失败: {stage}")
+            try:
+                with timer.stage(stage):
+                    handler(db, resume, services)
+                _set_stage_status(resume, stage, STATUS_COMPLETED)
+                with timer.stage("db_commit"):
+                    committed = safe_commit(db, f"保存简历解析结果失败: {stage}")
+                if not committed:
+                    raise RuntimeError("数据库保存失败")
+            except Exception as e:
+                db.rollback()
+                logger.error(f"简历解析阶段失败: ID={resume_id}, 阶段={stage}, 错误={str(e)}")
+                _set_stage_status(resume, stage, STATUS_FAILED)
+                resume.processing_status = STATUS_FAILED
+                resume.processing_error = f"{stage}: {str(e)}"
+                _finish_timing(resume, timer)
+                sync_duplicates(db, resume)
+                safe_commit(db, "更新简历解析状态失败")
+                return False
+
+        resume.processing_status = STATUS_COMPLETED
+        resume.enrichment_hash = compute_enrichment_hash(resume.ocr_content)
+        _finish_timing(resume, timer)
+        sync_duplicates(db, resume)
+        safe_commit(db, "更新简历解析状态失败")
+        logger.info(f"简历解析完成: ID={resume_id}")
+        return True
+    except Exception as e:
+        logger.error(f"简历解析流水线异常: ID={resume_id}, 错误={str(e)}")
+        return False
+    finally:
+        db.close()
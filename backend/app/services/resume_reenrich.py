@@ -0,0 +1,168 @@
+"""简历批量重新解析任务
+
+修改GPT提示词或标签词表后，对已有简历重新执行解析 → 人才画像 → 标签阶段。
+按简历ID做键集分页，每批处理完成后写入检查点，进程中断后再次运行同名任务
+会从检查点继续；输入指纹（OCR文本 + 解析版本）未变化的简历直接跳过，
+表格导入的没有简历文件的记录不处理。
+
+用法:
+    python -m app.services.resume_reenrich --job prompts-v2 --batch-size 500 --concurrency 8
+"""
+import os
+import argparse
+import logging
+from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional
+from sqlalchemy.orm import Session
+
+from app.database import SessionLocal, init_db
+from app.models.resume import Resume
+from app.models.reenrichment import ReenrichmentCheckpoint
+from app.services.ocr_scheduler import PRIORITY_BULK
+from app.services.resume_pipeline import (
+    EMPTY_OCR_CONTENT, ENRICHMENT_STAGES, PIPELINE_STAGES,
+    compute_enrichment_hash, create_services, process_resume
+)
+from app.utils.db_utils import safe_commit
+
+# 获取日志记录器
+logger = logging.getLogger("hr_recruitment")
+
+# 每批读取的简历数
+REENRICH_BATCH_SIZE = int(os.getenv("RESUME_REENRICH_BATCH_SIZE", "500"))
+
+# 同时处理的简历数
+REENRICH_CONCURRENCY = int(os.getenv("RESUME_REENRICH_CONCURRENCY", "4"))
+
+
+def get_checkpoint(db: Session, job_name: str, restart: bool = False) -> ReenrichmentCheckpoint:
+    """获取任务检查点，已完成或要求重新开始的任务从头计数"""
+    checkpoint = db.query(ReenrichmentCheckpoint).filter(ReenrichmentCheckpoint.job_name == job_name).first()
+    if checkpoint is None:
+        checkpoint = ReenrichmentCheckpoint(job_name=job_name)
+        db.add(checkpoint)
+    elif restart or checkpoint.completed_at is not None:
+        checkpoint.last_resume_id = 0
+        checkpoint.processed_count = 0
+        checkpoint.skipped_count = 0
+        checkpoint.failed_count = 0
+        checkpoint.started_at = datetime.utcnow()
+        checkpoint.completed_at = None
+    else:
+        logger.info(f"从检查点继续任务 {job_name}: 简历ID > {checkpoint.last_resume_id}")
+    safe_commit(db, "保存重新解析检查点失败")
+    return checkpoint
+
+
+def _select_stages(ocr_content: Optional[str]):
+    """已有OCR文本时只重跑解析相关阶段，否则执行完整流水线"""
+    if not ocr_content or ocr_content == EMPTY_OCR_CONTENT:
+        return PIPELINE_STAGES
+    return ENRICHMENT_STAGES
+
+
+def reenrich_resumes(
+    job_name: str,
+    batch_size: int = REENRICH_BATCH_SIZE,
+    concurrency: int = REENRICH_CONCURRENCY,
+    force: bool = False,
+    restart: bool = False,
+    session_factory: Callable[[], Session] = SessionLocal,
+    services: Optional[Dict[str, Any]] = None
+) -> Dict[str, Any]:
+    """
+    批量重新解析简历
+
+    重复上传的简历不单独处理，原始简历解析完成后由流水线同步结果。
+
+    Args:
+        job_name: 任务名称，同名任务共享检查点
+        batch_size: 每批读取的简历数
+        concurrency: 同时处理的简历数
+        force: 是否忽略输入指纹，全部重新解析
+        restart: 是否忽略已有检查点，从头开始
+        session_factory: 数据库会话工厂
+        services: 外部服务，默认新建并在所有简历间共享，OCR请求排在交互式上传之后
+
+    Returns:
+        任务进度统计
+    """
+    services = services or create_services(PRIORITY_BULK)
+    db = session_factory()
+    try:
+        checkpoint = get_checkpoint(db, job_name, restart)
+        with ThreadPoolExecutor(max_workers=max(1, concurrency)) as executor:
+            while True:
+                rows = (
+                    db.query(Resume.id, Resume.ocr_content, Resume.enrichment_hash)
+                    .filter(
+                        Resume.id > checkpoint.last_resume_id,
+                        Resume.duplicate_of_id.is_(None),
+                        # 表格导入的没有简历文件的记录没有可重新解析的内容
+                        Resume.file_url.isnot(None),
+                        Resume.file_url != ""
+                    )
+                    .order_by(Resume.id)
+                    .limit(batch_size)
+                    .all()
+                )
+                if not rows:
+                    break
+
+                pending = []
+                for resume_id, ocr_content, enrichment_hash in rows:
+                    if not force and enrichment_hash == compute_enrichment_hash(ocr_content):
+                        checkpoint.skipped_count += 1
+                    else:
+                        pending.append((resume_id, _select_stages(ocr_content)))
+
+                results = executor.map(
+                    lambda item: process_resume(item[0], session_factory, item[1], services),
+                    pending
+                )
+                for succeeded in results:
+                    if succeeded:
+                        checkpoint.processed_count += 1
+                    else:
+                        checkpoint.failed_count += 1
+
+                checkpoint.last_resume_id = rows[-1][0]
+                safe_commit(db, "保存重新解析检查点失败")
+                logger.info(
+                    f"重新解析任务 {job_name}: 已处理到简历ID {checkpoint.last_resume_id}，"
+                    f"成功{checkpoint.processed_count}，跳过{checkpoint.skipped_count}，失败{checkpoint.failed_count}"
+                )
+
+        checkpoint.completed_at = datetime.utcnow()
+        safe_commit(db, "保存重新解析检查点失败")
+        logger.info(f"重新解析任务 {job_name} 完成")
+        return checkpoint.to_dict()
+    finally:
+        db.close()
+
+
+def main(argv=None):
+    """命令行入口"""
+    parser = argparse.ArgumentParser(description="批量重新解析已有简历")
+    parser.add_argument("--job", default="default", help="任务名称，中断后使用相同名称继续")
+    parser.add_argument("--batch-size", type=int, default=REENRICH_BATCH_SIZE, help="每批读取的简历数")
+    parser.add_argument("--concurrency", type=int, default=REENRICH_CONCURRENCY, help="同时处理的简历数")
+    parser.add_argument("--force", action="store_true", help="忽略输入指纹，全部重新解析")
+    parser.add_argument("--restart", action="store_true", help="忽略检查点，从头开始")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO)
+    init_db()
+    result = reenrich_resumes(
+        args.job,
+        batch_size=args.batch_size,
+        concurrency=args.concurrency,
+        force=args.force,
+        restart=args.restart
+    )
+    print(result)
+
+
+if __name__ == "__main__":
+    main()
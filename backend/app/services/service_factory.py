@@ -8,13 +8,20 @@ from app.services.gpt import GPTService
 from app.services.gpt_mock import GPTService as MockGPTService
 from app.services.ocr import OCRService
 from app.services.ocr_mock import MockOCRService
+from app.services.ocr_local import LocalOCRService
+from app.services.ocr_cache import OCR_CACHE_ENABLED, CachedOCRService
+from app.services.ocr_scheduler import PRIORITY_INTERACTIVE
 from app.services.storage import StorageService, LocalStorageService, AliyunOSSService
 
 # 获取日志记录器
 logger = logging.getLogger(__name__)
 
-def get_gpt_service():
-    """获取GPT服务实例"""
+def get_gpt_service() -> GPTService:
+    """
+    获取GPT服务实例，解析流水线直接调用，路由作为FastAPI依赖注入
+
+    GPT服务复用进程内共享的OpenAI客户端，创建开销很小。
+    """
     # 在测试环境中使用模拟服务
     if os.getenv("MOCK_SERVICES", "False").lower() == "true" or os.getenv("ENV") == "test":
         logger.info("使用模拟GPT服务")
@@ -22,14 +29,41 @@ def get_gpt_service():
     logger.info("使用真实GPT服务")
     return GPTService()
 
-def get_ocr_service():
-    """获取OCR服务实例"""
+def uses_aliyun_ocr() -> bool:
+    """是否使用阿里云OCR：非模拟环境且 OCR_BACKEND 为 aliyun"""
+    if os.getenv("MOCK_SERVICES", "False").lower() == "true" or os.getenv("ENV") == "test":
+        return False
+    return os.getenv("OCR_BACKEND", "aliyun") == "aliyun"
+
+def get_ocr_service(priority: str = PRIORITY_INTERACTIVE):
+    """
+    获取OCR服务实例
+
+    OCR_BACKEND 为 aliyun 时使用阿里云OCR，为 local 时使用本机的Tesseract。
+
+    Args:
+        priority: 阿里云OCR请求的优先级队列，交互式上传优先于批量重新解析
+    """
+    ocr_backend = os.getenv("OCR_BACKEND", "aliyun")
+    
     # 在测试环境中使用模拟服务
     if os.getenv("MOCK_SERVICES", "False").lower() == "true" or os.getenv("ENV") == "test":
         logger.info("使用模拟OCR服务")
-        return MockOCRService()
-    logger.info("使用真实OCR服务")
-    return OCRService()
+        ocr_service = MockOCRService()
+    elif ocr_backend == "aliyun":
+        logger.info("使用阿里云OCR服务")
+        ocr_service = OCRService(priority=priority)
+    elif ocr_backend == "local":
+        logger.info("使用本地OCR服务")
+        ocr_service = LocalOCRService()
+    else:
+        logger.error(f"不支持的OCR后端: {ocr_backend}")
+        raise ValueError(f"不支持的OCR后端: {ocr_backend}")
+    
+    # 识别结果按内容哈希缓存，避免重复调用OCR
+    if OCR_CACHE_ENABLED:
+        return CachedOCRService(ocr_service)
+    return ocr_service
 
 def get_storage_service():
     """获取存储服务实例"""
@@ -0,0 +1,341 @@
+"""候选人表格导入服务
+
+HR提供的Excel/CSV候选人名单逐行流式读取，按表头映射到简历字段，校验后分批写入。
+XLSX使用只读模式解析，CSV逐行读取，内存占用与表格行数无关。
+校验失败或写入失败的行单独记录行号和原因，不影响其他行导入。
+有简历链接的行导入后返回简历ID，由调用方在后台执行解析流水线。
+
+用法:
+    python -m app.services.spreadsheet_import candidates.xlsx --batch-size 1000
+"""
+import io
+import os
+import re
+import csv
+import time
+import argparse
+import logging
+import zipfile
+import tempfile
+from typing import Any, BinaryIO, Dict, Iterator, List, Optional, Tuple
+from sqlalchemy.engine import Engine
+
+from app.services.bulk_import import BulkImporter
+from app.services.ocr_scheduler import PRIORITY_BULK
+from app.services.resume_pipeline import STATUS_COMPLETED, STATUS_PENDING, create_services, process_resume
+
+try:
+    from openpyxl import load_workbook
+except ImportError:
+    load_workbook = None
+
+# 获取日志记录器
+logger = logging.getLogger("hr_recruitment")
+
+# 每批写入的行数
+SPREADSHEET_BATCH_SIZE = int(os.getenv("SPREADSHEET_IMPORT_BATCH_SIZE", "1000"))
+
+# 返回结果中保留的错误行数上限
+SPREADSHEET_MAX_ERRORS = int(os.getenv("SPREADSHEET_IMPORT_MAX_ERRORS", "1000"))
+
+# 支持的表格类型
+SPREADSHEET_TYPES = ["xlsx", "csv"]
+
+# 表头别名 -> 字段名
+COLUMN_ALIASES = {
+    "姓名": "candidate_name", "候选人": "candidate_name", "候选人姓名": "candidate_name",
+    "name": "candidate_name", "candidate_name": "candidate_name",
+    "简历链接": "file_url", "简历地址": "file_url", "file_url": "file_url", "resume_url": "file_url",
+    "文件类型": "file_type", "file_type": "file_type",
+    "电话": "phone", "手机": "phone", "手机号": "phone", "phone": "phone",
+    "邮箱": "email", "email": "email",
+    "学历": "education", "教育背景": "education", "education": "education",
+    "工作经验": "experience", "工作年限": "experience", "experience": "experience",
+    "技能": "skills", "skills": "skills",
+}
+
+# 写入 parsed_content 的字段
+PROFILE_FIELDS = ["phone", "email", "education", "experience", "skills"]
+
+# 简历链接允许的文件类型，与上传接口一致
+RESUME_FILE_TYPES = ["pdf", "doc", "docx", "jpg", "jpeg", "png"]
+
+# 技能之间的分隔符
+SKILL_SEPARATOR = re.compile(r"[,，;；、/\n]")
+
+
+class RowError(ValueError):
+    """单行数据校验失败"""
+
+
+def _unwrap_spooled_file(file_obj: BinaryIO) -> BinaryIO:
+    """
+    取出 SpooledTemporaryFile 内部的文件对象
+
+    UploadFile.file 是 SpooledTemporaryFile，Python 3.11 之前没有实现 readable()、
+    seekable() 等方法，不能被 TextIOWrapper 包装；内部的 BytesIO 或临时文件可以。
+    """
+    if isinstance(file_obj, tempfile.SpooledTemporaryFile):
+        return file_obj._file
+    return file_obj
+
+
+def iter_spreadsheet_rows(file_obj: BinaryIO, file_type: str) -> Iterator[Tuple[int, List[Any]]]:
+    """
+    流式读取表格，返回 (行号, 单元格值列表)，行号从1开始，第1行为表头
+
+    Args:
+        file_obj: 可随机访问的文件对象，XLSX需要
+        file_type: xlsx 或 csv
+    """
+    file_obj = _unwrap_spooled_file(file_obj)
+    if file_type == "xlsx":
+        if load_workbook is None:
+            raise RuntimeError("未安装openpyxl，无法读取XLSX文件")
+        try:
+            workbook = load_workbook(file_obj, read_only=True, data_only=True)
+        except zipfile.BadZipFile:
+            raise ValueError("无法读取XLSX文件，文件已损坏或不是XLSX格式")
+        try:
+            for number, values in enumerate(workbook.active.iter_rows(values_only=True), start=1):
+                yield number, list(values)
+        finally:
+            workbook.close()
+    elif file_type == "csv":
+        text = io.TextIOWrapper(file_obj, encoding="utf-8-sig", newline="")
+        try:
+            for number, values in enumerate(csv.reader(text), start=1):
+                yield number, values
+        finally:
+            # 不关闭调用方的文件对象
+            text.detach()
+    else:
+        raise ValueError(f"不支持的表格类型: {file_type}，支持的类型: {', '.join(SPREADSHEET_TYPES)}")
+
+
+def map_header(header: List[Any]) -> Tuple[Dict[int, str], List[str]]:
+    """
+    将表头映射为字段名
+
+    Returns:
+        {列序号: 字段名} 和无法识别的列名
+    """
+    columns, ignored = {}, []
+    for index, title in enumerate(header):
+        name = str(title).strip() if title is not None else ""
+        field = COLUMN_ALIASES.get(name.lower())
+        if field and field not in columns.values():
+            columns[index] = field
+        elif name:
+            ignored.append(name)
+    if "candidate_name" not in columns.values():
+        raise ValueError("表格缺少姓名列")
+    return columns, ignored
+
+
+def _cell_text(value: Any) -> str:
+    if value is None:
+        return ""
+    if isinstance(value, float) and value.is_integer():
+        # Excel中的手机号等数字列读出为浮点数
+        value = int(value)
+    return str(value).strip()
+
+
+def build_record(columns: Dict[int, str], values: List[Any], source_type: str) -> Optional[Dict[str, Any]]:
+    """
+    将一行数据转换为简历记录，空行返回None
+
+    有简历链接的行保持待解析状态，导入后由 process_imported_resumes 执行解析流水线；
+    没有简历链接的行直接使用表格中的信息作为解析结果。
+
+    Raises:
+        RowError: 数据校验失败
+    """
+    fields = {field: _cell_text(values[index]) for index, field in columns.items() if index < len(values)}
+    if not any(fields.values()):
+        return None
+
+    name = fields.get("candidate_name", "")
+    if not name:
+        raise RowError("姓名不能为空")
+    if len(name) > 50:
+        raise RowError("姓名长度不能超过50个字符")
+
+    file_url = fields.get("file_url", "")
+    if len(file_url) > 255:
+        raise RowError("简历链接长度不能超过255个字符")
+    file_type = fields.get("file_type", "").lower()
+    if file_url:
+        file_type = file_type or file_url.rsplit("?", 1)[0].rsplit(".", 1)[-1].lower()
+        if file_type not in RESUME_FILE_TYPES:
+            raise RowError(f"不支持的简历文件类型: {file_type}")
+    else:
+        file_type = source_type
+
+    email = fields.get("email", "")
+    if email and "@" not in email:
+        raise RowError(f"邮箱格式不正确: {email}")
+
+    skills = [skill.strip() for skill in SKILL_SEPARATOR.split(fields.get("skills", "")) if skill.strip()]
+    profile = {"name": name}
+    for field in PROFILE_FIELDS:
+        if field == "skills":
+            if skills:
+                profile["skills"] = skills
+        elif fields.get(field):
+            profile[field] = fields[field]
+
+    status = STATUS_PENDING if file_url else STATUS_COMPLETED
+    return {
+        "candidate_name": name,
+        "file_url": file_url,
+        "file_type": file_type,
+        "parsed_content": profile,
+        "skills": skills,
+        "processing_status": status,
+        "ocr_status": status,
+        "parse_status": status,
+        "portrait_status": status,
+        "tag_status": status
+    }
+
+
+class SpreadsheetImporter:
+    """分批写入表格中的候选人并记录错误行"""
+
+    def __init__(self, bind: Engine, batch_size: int = SPREADSHEET_BATCH_SIZE, max_errors: int = SPREADSHEET_MAX_ERRORS):
+        self.bind = bind
+        self.batch_size = batch_size
+        self.max_errors = max_errors
+        self.importer = BulkImporter(bind, "resumes", batch_size)
+        self.total_rows = 0
+        self.imported = 0
+        self.failed = 0
+        self.errors: List[Dict[str, Any]] = []
+        self.pending_ids: List[int] = []
+
+    def _add_error(self, row: int, message: str):
+        self.failed += 1
+        if len(self.errors) < self.max_errors:
+            self.errors.append({"row": row, "error": message})
+
+    def _record_pending(self, records: List[Dict[str, Any]], ids: List[int]):
+        """记录需要执行解析流水线的简历ID"""
+        self.pending_ids.extend(
+            resume_id for record, resume_id in zip(records, ids) if record["processing_status"] == STATUS_PENDING
+        )
+
+    def _flush(self, batch: List[Tuple[int, Dict[str, Any]]]):
+        """写入一批记录，整批失败时逐行重试以定位错误行"""
+        records = [record for _, record in batch]
+        try:
+            with self.bind.begin() as conn:
+                ids = self.importer.write_batch(conn, records)
+            self.imported += len(batch)
+            self._record_pending(records, ids)
+            return
+        except Exception as e:
+            logger.warning(f"批量写入候选人失败，逐行重试: {str(e)}")
+            self.importer.discard_tag_cache()
+
+        for row, record in batch:
+            try:
+                with self.bind.begin() as conn:
+                    ids = self.importer.write_batch(conn, [record])
+                self.imported += 1
+                self._record_pending([record], ids)
+            except Exception as e:
+                self.importer.discard_tag_cache()
+                self._add_error(row, f"写入失败: {str(e)}")
+
+    def run(self, file_obj: BinaryIO, file_type: str) -> Dict[str, Any]:
+        """
+        导入表格
+
+        Returns:
+            导入统计、错误行列表和需要执行解析流水线的简历ID（pending_ids）
+
+        Raises:
+            ValueError: 表格类型不支持或缺少必需的列
+        """
+        start = time.perf_counter()
+        rows = iter_spreadsheet_rows(file_obj, file_type)
+        try:
+            header = next(rows, None)
+            if header is None:
+                raise ValueError("表格为空")
+            columns, ignored = map_header(header[1])
+
+            batch: List[Tuple[int, Dict[str, Any]]] = []
+            for row, values in rows:
+                try:
+                    record = build_record(columns, values, file_type)
+                except RowError as e:
+                    self.total_rows += 1
+                    self._add_error(row, str(e))
+                    continue
+                if record is None:
+                    continue
+                self.total_rows += 1
+                batch.append((row, record))
+                if len(batch) >= self.batch_size:
+                    self._flush(batch)
+                    batch = []
+            if batch:
+                self._flush(batch)
+        finally:
+            rows.close()
+
+        elapsed = time.perf_counter() - start
+        logger.info(f"表格导入完成: 共{self.total_rows}行，成功{self.imported}行，失败{self.failed}行，耗时{elapsed:.2f}秒")
+        return {
+            "total_rows": self.total_rows,
+            "imported": self.imported,
+            "failed": self.failed,
+            "errors": self.errors,
+            "errors_truncated": self.failed > len(self.errors),
+            "ignored_columns": ignored,
+            "pending_ids": self.pending_ids,
+            "rows_per_second": round(self.imported / elapsed) if elapsed > 0 else self.imported
+        }
+
+
+def import_spreadsheet(bind: Engine, file_obj: BinaryIO, file_type: str, batch_size: int = SPREADSHEET_BATCH_SIZE) -> Dict[str, Any]:
+    """从表格导入候选人"""
+    return SpreadsheetImporter(bind, batch_size).run(file_obj, file_type)
+
+
+def process_imported_resumes(resume_ids: List[int]) -> int:
+    """
+    依次执行导入的简历的解析流水线，OCR请求排在交互式上传之后
+
+    Returns:
+        解析成功的简历数
+    """
+    services = create_services(PRIORITY_BULK)
+    succeeded = sum(1 for resume_id in resume_ids if process_resume(resume_id, services=services))
+    logger.info(f"导入简历解析完成: 共{len(resume_ids)}份，成功{succeeded}份")
+    return succeeded
+
+
+def main(argv=None):
+    """命令行入口"""
+    parser = argparse.ArgumentParser(description="从Excel/CSV表格导入候选人")
+    parser.add_argument("path", help="XLSX或CSV文件路径")
+    parser.add_argument("--batch-size", type=int, default=SPREADSHEET_BATCH_SIZE, help="每批写入的行数")
+    parser.add_argument("--process", action="store_true", help="导入后执行有简历链接的行的解析流水线")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO)
+    from app.database import engine, init_db
+    init_db()
+    with open(args.path, "rb") as file_obj:
+        result = import_spreadsheet(engine, file_obj, args.path.rsplit(".", 1)[-1].lower(), args.batch_size)
+    print(result)
+    if args.process:
+        process_imported_resumes(result["pending_ids"])
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,221 @@
+"""两级SQLite缓存
+
+OCR结果缓存和GPT回复缓存共用的基类：进程内的LRU内存缓存加上基于SQLite的
+磁盘缓存。条目可设置有效期，磁盘缓存超过容量上限时先删除过期条目，
+再按最近访问时间淘汰。
+
+命中时不立即写磁盘：访问时间先记录在内存中，攒够一批或间隔一段时间后
+批量写入，淘汰和统计前也会先写入；磁盘占用按写入和删除的条目大小累计，
+超过上限时才重新统计。
+"""
+import os
+import time
+import sqlite3
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+
+class SQLiteLRUCache:
+    """两级缓存基类，子类指定表名、附加列和值的序列化方式"""
+
+    # 磁盘缓存的表名
+    table = ""
+
+    # 附加列的定义，如 {"method": "TEXT NOT NULL DEFAULT ''"}
+    extra_columns: Dict[str, str] = {}
+
+    # 待写入的访问时间达到该条数时批量写入磁盘
+    touch_batch_size = 64
+
+    # 距上次写入访问时间超过该间隔（秒）时批量写入磁盘
+    touch_interval = 5.0
+
+    def __init__(self, path: str, memory_size: int, max_bytes: int, ttl: int = 0, clock=time.time):
+        self.path = path
+        self.memory_size = memory_size
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.clock = clock
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = {"memory_hits": 0, "disk_hits": 0, "misses": 0, "expired": 0, "evictions": 0}
+        self._pending_touches: Dict[str, float] = {}
+        self._last_flush = time.monotonic()
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._create_table()
+        self._total_bytes = self._disk_bytes()
+
+    def _create_table(self):
+        """创建缓存表，旧版本缓存文件中缺少的列自动补上"""
+        columns = {
+            "content": "TEXT NOT NULL",
+            "size": "INTEGER NOT NULL",
+            "created_at": "REAL NOT NULL DEFAULT 0",
+            "accessed_at": "REAL NOT NULL",
+            **self.extra_columns
+        }
+        definitions = ", ".join(f"{name} {definition}" for name, definition in columns.items())
+        self._conn.execute(f"CREATE TABLE IF NOT EXISTS {self.table} (key TEXT PRIMARY KEY, {definitions})")
+        existing = {row[1] for row in self._conn.execute(f"PRAGMA table_info({self.table})")}
+        for name, definition in columns.items():
+            if name not in existing:
+                self._conn.execute(f"ALTER TABLE {self.table} ADD COLUMN {name} {definition}")
+        self._conn.execute(
+            f"CREATE INDEX IF NOT EXISTS idx_{self.table}_accessed_at ON {self.table} (accessed_at)"
+        )
+        self._conn.commit()
+
+    def encode(self, value: Any) -> str:
+        """将值序列化为磁盘中保存的文本"""
+        return value
+
+    def decode(self, content: str) -> Any:
+        """将磁盘中保存的文本还原为值"""
+        return content
+
+    def _disk_bytes(self) -> int:
+        return self._conn.execute(f"SELECT COALESCE(SUM(size), 0) FROM {self.table}").fetchone()[0]
+
+    def _remember(self, key: str, value: Any, created_at: float):
+        """写入内存缓存"""
+        self._memory[key] = (value, created_at)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_size:
+            self._memory.popitem(last=False)
+
+    def _expired(self, created_at: float, now: float) -> bool:
+        return bool(self.ttl) and now - created_at > self.ttl
+
+    def get(self, key: str) -> Optional[Any]:
+        """读取缓存，依次查找内存和磁盘，过期的条目视为未命中并删除"""
+        now = self.clock()
+        with self._lock:
+            if key in self._memory:
+                value, created_at = self._memory[key]
+                if not self._expired(created_at, now):
+                    self._memory.move_to_end(key)
+                    self._touch(key, now)
+                    self._stats["memory_hits"] += 1
+                    return value
+
+            row = self._conn.execute(
+                f"SELECT content, created_at, size FROM {self.table} WHERE key = ?", (key,)
+            ).fetchone()
+            if row is not None and self._expired(row[1], now):
+                self._delete(key, row[2])
+                self._conn.commit()
+                self._stats["expired"] += 1
+                row = None
+            if row is None:
+                self._memory.pop(key, None)
+                self._stats["misses"] += 1
+                return None
+
+            value = self.decode(row[0])
+            self._touch(key, now)
+            self._remember(key, value, row[1])
+            self._stats["disk_hits"] += 1
+            return value
+
+    def _touch(self, key: str, now: float):
+        """记录条目的访问时间，内存命中同样计入，保证淘汰顺序正确；攒够一批后写入磁盘"""
+        self._pending_touches[key] = now
+        if (len(self._pending_touches) >= self.touch_batch_size
+                or time.monotonic() - self._last_flush >= self.touch_interval):
+            self._flush_touches()
+            self._conn.commit()
+
+    def _flush_touches(self):
+        """批量写入待更新的访问时间，由调用方提交"""
+        self._last_flush = time.monotonic()
+        if not self._pending_touches:
+            return
+        self._conn.executemany(
+            f"UPDATE {self.table} SET accessed_at = ? WHERE key = ?",
+            [(accessed_at, key) for key, accessed_at in self._pending_touches.items()]
+        )
+        self._pending_touches.clear()
+
+    def _delete(self, key: str, size: int):
+        self._conn.execute(f"DELETE FROM {self.table} WHERE key = ?", (key,))
+        self._memory.pop(key, None)
+        self._pending_touches.pop(key, None)
+        self._total_bytes -= size
+
+    def set(self, key: str, value: Any, **columns):
+        """写入缓存，columns 为附加列的值；磁盘缓存超过容量时先删除过期条目，再淘汰最久未访问的条目"""
+        if not value:
+            return
+        content = self.encode(value)
+        size = len(content.encode("utf-8"))
+        now = self.clock()
+        values = {"key": key, "content": content, "size": size, "created_at": now, "accessed_at": now, **columns}
+        names = ", ".join(values)
+        placeholders = ", ".join("?" for _ in values)
+        with self._lock:
+            self._remember(key, value, now)
+            self._pending_touches.pop(key, None)
+            row = self._conn.execute(f"SELECT size FROM {self.table} WHERE key = ?", (key,)).fetchone()
+            self._conn.execute(
+                f"INSERT OR REPLACE INTO {self.table} ({names}) VALUES ({placeholders})", tuple(values.values())
+            )
+            self._total_bytes += size - (row[0] if row else 0)
+            self._evict(now)
+            self._conn.commit()
+
+    def _evict(self, now: float):
+        """删除过期条目，再按最近访问时间淘汰，直到磁盘缓存低于容量上限的90%"""
+        if self._total_bytes <= self.max_bytes:
+            return
+        # 其他进程可能共用同一个缓存文件，淘汰前重新统计
+        self._total_bytes = self._disk_bytes()
+        if self._total_bytes <= self.max_bytes:
+            return
+
+        if self.ttl:
+            expired = self._conn.execute(
+                f"SELECT key, size FROM {self.table} WHERE created_at < ?", (now - self.ttl,)
+            ).fetchall()
+            for key, size in expired:
+                self._delete(key, size)
+                self._stats["expired"] += 1
+
+        self._flush_touches()
+        target = self.max_bytes * 0.9
+        rows = self._conn.execute(f"SELECT key, size FROM {self.table} ORDER BY accessed_at").fetchall()
+        for key, size in rows:
+            if self._total_bytes <= target:
+                break
+            self._delete(key, size)
+            self._stats["evictions"] += 1
+
+    def stats(self) -> Dict[str, Any]:
+        """返回命中统计"""
+        with self._lock:
+            self._flush_touches()
+            self._conn.commit()
+            stats = dict(self._stats)
+            entries, size = self._conn.execute(
+                f"SELECT COUNT(*), COALESCE(SUM(size), 0) FROM {self.table}"
+            ).fetchone()
+        lookups = stats["memory_hits"] + stats["disk_hits"] + stats["misses"]
+        stats["hit_rate"] = (stats["memory_hits"] + stats["disk_hits"]) / lookups if lookups else 0.0
+        stats["disk_entries"] = entries
+        stats["disk_bytes"] = size
+        return stats
+
+    def clear(self):
+        """清空缓存和统计"""
+        with self._lock:
+            self._memory.clear()
+            self._pending_touches.clear()
+            self._conn.execute(f"DELETE FROM {self.table}")
+            self._conn.commit()
+            self._total_bytes = 0
+            self._stats = {name: 0 for name in self._stats}
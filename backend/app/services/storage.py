@@ -1,12 +1,435 @@
 """存储服务"""
+import io
 import os
+import json
+import uuid
+import shutil
+import hashlib
+import itertools
+import logging
+import re
+import time
+import tempfile
+import threading
+from contextlib import contextmanager
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Any, BinaryIO, Dict, Iterator, Optional, Tuple
 import oss2
 
+from app.services.storage_codec import (
+    CODEC_SUFFIXES,
+    OSS_CODEC_HEADER,
+    STORAGE_COMPRESSION,
+    decode_stream,
+    encode_chunks,
+    select_codec,
+)
+from app.utils.signing import sign_value, verify_value
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+# 流式上传时每次读取的块大小
+CHUNK_SIZE = int(os.getenv("STORAGE_CHUNK_SIZE", str(1024 * 1024)))
+
+# 单个文件大小上限（100MB）
+MAX_FILE_SIZE = int(os.getenv("STORAGE_MAX_FILE_SIZE", str(100 * 1024 * 1024)))
+
+# 上传文件的本地暂存目录，默认使用系统临时目录
+UPLOAD_STAGING_DIR = os.getenv("UPLOAD_STAGING_DIR") or None
+
+# 直传上传的对象名格式
+DIRECT_UPLOAD_KEY_PATTERN = re.compile(r"^[0-9a-f]{32}\.[a-z0-9]+$")
+
+
+def _optional_int(value: Optional[str]) -> Optional[int]:
+    return int(value) if value else None
+
+
+class FileTooLargeError(ValueError):
+    """上传文件超过大小上限"""
+
+
+class HashingReader:
+    """边读取边计算SHA-256和文件大小的包装器，超过大小上限时抛出异常"""
+
+    def __init__(self, file_obj: BinaryIO, max_size: int = MAX_FILE_SIZE):
+        self.file_obj = file_obj
+        self.max_size = max_size
+        self.size = 0
+        self._sha256 = hashlib.sha256()
+
+    def read(self, size: int = -1) -> bytes:
+        chunk = self.file_obj.read(size)
+        self.size += len(chunk)
+        if self.max_size and self.size > self.max_size:
+            raise FileTooLargeError(f"文件大小超过限制（最大{self.max_size // (1024 * 1024)}MB）")
+        self._sha256.update(chunk)
+        return chunk
+
+    def chunks(self, chunk_size: int = CHUNK_SIZE) -> Iterator[bytes]:
+        """按块读取文件内容"""
+        while True:
+            chunk = self.read(chunk_size)
+            if not chunk:
+                break
+            yield chunk
+
+    @property
+    def content_hash(self) -> str:
+        return self._sha256.hexdigest()
+
+
+def compute_content_hash(file_obj: BinaryIO) -> str:
+    """分块计算文件内容的SHA-256，完成后将读取位置恢复到开头"""
+    reader = HashingReader(file_obj)
+    for _ in reader.chunks():
+        pass
+    file_obj.seek(0)
+    return reader.content_hash
+
+
+def stage_upload(file_obj: BinaryIO) -> str:
+    """
+    将上传文件复制到本地暂存文件，供写入存储期间并发提取文本
+
+    完成后将读取位置恢复到开头；暂存文件由调用方通过 remove_staged_file 删除。
+    """
+    fd, path = tempfile.mkstemp(prefix="resume-", suffix=".upload", dir=UPLOAD_STAGING_DIR)
+    with os.fdopen(fd, "wb") as staged:
+        shutil.copyfileobj(file_obj, staged, CHUNK_SIZE)
+    file_obj.seek(0)
+    return path
+
+
+def remove_staged_file(path: str):
+    """删除本地暂存文件"""
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+    except OSError as e:
+        logger.warning(f"删除暂存文件失败: {path}, 原因: {str(e)}")
+
+
 class StorageService:
-    """阿里云OSS存储服务"""
-    
+    """
+    存储服务基类
+
+    compression 为 zstd 时按文件类型压缩写入，编码方式记录在存储元数据中，读取时透明解压。
+    """
+
+    compression = STORAGE_COMPRESSION
+
+    # 文件按内容寻址并记录引用计数时为True，相同URL的每次上传各持有一个引用
+    counts_references = False
+
+    def upload_stream(self, file_obj: BinaryIO, file_name: str, content_hash: Optional[str] = None) -> Dict[str, Any]:
+        """
+        以流的方式上传文件
+
+        Args:
+            file_obj: 可读取的文件对象
+            file_name: 文件名
+            content_hash: 预先计算的内容哈希，可选
+
+        Returns:
+            包含 file_url、file_size、content_hash 的字典
+        """
+        raise NotImplementedError
+
+    def upload_file(self, file_content: bytes, file_name: str) -> str:
+        """上传文件内容并返回文件URL"""
+        return self.upload_stream(io.BytesIO(file_content), file_name)["file_url"]
+
+    def open_stored(self, file_url: str) -> Tuple[BinaryIO, Optional[str]]:
+        """
+        打开已存储的原始内容
+
+        Returns:
+            (文件对象, 编码方式)，未压缩时编码方式为None
+        """
+        raise NotImplementedError
+
+    def open_file(self, file_url: str) -> BinaryIO:
+        """以流的方式打开已存储的文件，压缩存储的文件边读取边解压"""
+        return decode_stream(*self.open_stored(file_url))
+
+    def get_codec(self, file_url: str) -> Optional[str]:
+        """获取文件的编码方式，未压缩时返回None"""
+        return None
+
+    def delete_file(self, file_url: str) -> bool:
+        """删除文件"""
+        raise NotImplementedError
+
+    def create_upload_url(self, object_key: str, content_type: str, expires: int) -> Dict[str, Any]:
+        """
+        生成客户端直传文件的签名URL
+
+        Returns:
+            包含 url、method、headers 的字典，客户端按此发送文件内容
+        """
+        raise NotImplementedError
+
+    def create_download_url(self, file_url: str, expires: int) -> str:
+        """生成客户端直接下载文件的签名URL"""
+        raise NotImplementedError
+
+    def complete_upload(self, object_key: str) -> Dict[str, Any]:
+        """
+        确认客户端直传的文件已上传
+
+        Returns:
+            包含 file_url、file_size、content_hash 的字典，无法获得内容哈希时为None
+
+        Raises:
+            FileNotFoundError: 文件尚未上传
+        """
+        raise NotImplementedError
+
+
+class LocalStorageService(StorageService):
+    """
+    本地文件存储服务
+
+    文件按内容的SHA-256寻址，存放在两级分片目录下（ab/cd/abcd...），与客户端文件名无关。
+    相同内容只保存一份，通过同目录下的 .refs 文件记录引用计数，引用全部删除后才删除文件。
+    压缩存储的文件带有编码后缀（abcd....zst），文件URL不变。
+    """
+
+    counts_references = True
+
+    def __init__(self, base_path: str = "./uploads"):
+        self.base_path = base_path
+        self.base_url = os.getenv("STORAGE_BASE_URL", "/uploads").rstrip("/")
+        self.upload_url = os.getenv("STORAGE_UPLOAD_URL", "/api/v1/resumes/direct-uploads").rstrip("/")
+        self._lock = threading.Lock()
+        os.makedirs(self.base_path, exist_ok=True)
+
+    @staticmethod
+    def get_object_key(content_hash: str) -> str:
+        """根据内容哈希生成分片后的相对路径"""
+        return f"{content_hash[:2]}/{content_hash[2:4]}/{content_hash}"
+
+    def get_file_path(self, file_url: str) -> str:
+        """根据文件URL获取本地路径，兼容旧版平铺目录下的文件"""
+        prefix = f"{self.base_url}/"
+        key = file_url[len(prefix):] if file_url.startswith(prefix) else os.path.basename(file_url)
+        parts = [part for part in key.split("/") if part]
+        if not parts or any(part in (".", "..") for part in parts):
+            raise ValueError(f"无效的文件URL: {file_url}")
+        return os.path.join(self.base_path, *parts)
+
+    def resolve_file(self, file_url: str) -> Tuple[str, Optional[str]]:
+        """
+        根据文件URL获取实际存储的本地路径和编码方式
+
+        文件不存在时返回未压缩的路径，由调用方打开时抛出 FileNotFoundError。
+        """
+        file_path = self.get_file_path(file_url)
+        if not os.path.exists(file_path):
+            for codec, suffix in CODEC_SUFFIXES.items():
+                if os.path.exists(file_path + suffix):
+                    return file_path + suffix, codec
+        return file_path, None
+
+    def get_codec(self, file_url: str) -> Optional[str]:
+        return self.resolve_file(file_url)[1]
+
+    @contextmanager
+    def _locked_refs(self, file_path: str):
+        """
+        锁定文件的引用计数，返回可读写的引用计数文件
+
+        多进程部署时通过文件锁互斥；获得锁后若引用计数文件已被删除（引用归零），重新打开。
+        """
+        ref_path = f"{file_path}.refs"
+        with self._lock:
+            while True:
+                ref_file = open(ref_path, "a+")
+                try:
+                    if fcntl is not None:
+                        fcntl.flock(ref_file, fcntl.LOCK_EX)
+                    if os.fstat(ref_file.fileno()).st_nlink == 0:
+                        continue
+                    yield ref_file
+                    return
+                finally:
+                    ref_file.close()
+
+    @staticmethod
+    def _read_refs(ref_file) -> int:
+        ref_file.seek(0)
+        content = ref_file.read().strip()
+        return int(content) if content else 0
+
+    @staticmethod
+    def _write_refs(ref_file, count: int):
+        ref_file.seek(0)
+        ref_file.truncate()
+        ref_file.write(str(count))
+        ref_file.flush()
+
+    def upload_stream(self, file_obj: BinaryIO, file_name: str, content_hash: Optional[str] = None) -> Dict[str, Any]:
+        """分块写入临时文件并计算哈希，完成后原子重命名到内容地址；内容已存在时只增加引用计数"""
+        temp_path = os.path.join(self.base_path, f".{uuid.uuid4().hex}.part")
+        reader = HashingReader(file_obj)
+        codec = select_codec(file_name, self.compression)
+
+        try:
+            with open(temp_path, "wb") as f:
+                for chunk in encode_chunks(reader.chunks(), codec, CHUNK_SIZE):
+                    f.write(chunk)
+            file_url = self._commit_file(temp_path, reader.content_hash, codec)
+        finally:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+
+        logger.info(f"本地存储文件: {file_name} -> {file_url}, 大小: {reader.size} bytes")
+        return {
+            "file_url": file_url,
+            "file_size": reader.size,
+            "content_hash": reader.content_hash
+        }
+
+    def _commit_file(self, temp_path: str, content_hash: str, codec: Optional[str] = None) -> str:
+        """
+        将写入完成的临时文件移动到内容地址并增加引用计数，返回文件URL
+
+        相同内容已以任一编码方式存储时保留已有文件。
+        """
+        key = self.get_object_key(content_hash)
+        target_path = os.path.join(self.base_path, *key.split("/"))
+        os.makedirs(os.path.dirname(target_path), exist_ok=True)
+        with self._locked_refs(target_path) as ref_file:
+            count = self._read_refs(ref_file)
+            variants = [target_path] + [target_path + suffix for suffix in CODEC_SUFFIXES.values()]
+            if any(os.path.exists(path) for path in variants):
+                # 旧版本写入的文件没有引用计数，至少计为一次引用
+                count = max(count, 1)
+            else:
+                os.replace(temp_path, target_path + CODEC_SUFFIXES[codec] if codec else target_path)
+                count = 0
+            self._write_refs(ref_file, count + 1)
+        return f"{self.base_url}/{key}"
+
+    def _direct_upload_path(self, object_key: str) -> str:
+        if not DIRECT_UPLOAD_KEY_PATTERN.match(object_key or ""):
+            raise ValueError(f"无效的上传对象名: {object_key}")
+        return os.path.join(self.base_path, ".direct", object_key)
+
+    def create_upload_url(self, object_key: str, content_type: str, expires: int) -> Dict[str, Any]:
+        """生成指向本服务直传接口的签名上传URL"""
+        self._direct_upload_path(object_key)
+        expires_at = int(time.time()) + expires
+        signature = sign_value(f"PUT:{object_key}:{expires_at}")
+        return {
+            "url": f"{self.upload_url}/{object_key}?expires={expires_at}&signature={signature}",
+            "method": "PUT",
+            "headers": {"Content-Type": content_type}
+        }
+
+    def verify_upload_signature(self, object_key: str, expires: int, signature: str) -> bool:
+        """校验直传上传URL的签名和有效期"""
+        return expires >= time.time() and verify_value(f"PUT:{object_key}:{expires}", signature)
+
+    def save_direct_upload(self, object_key: str, file_obj: BinaryIO) -> int:
+        """写入客户端直传的文件，完成上传前暂存在 .direct 目录，返回文件大小"""
+        target_path = self._direct_upload_path(object_key)
+        os.makedirs(os.path.dirname(target_path), exist_ok=True)
+        temp_path = f"{target_path}.{uuid.uuid4().hex}.part"
+        reader = HashingReader(file_obj)
+        try:
+            with open(temp_path, "wb") as f:
+                for chunk in reader.chunks():
+                    f.write(chunk)
+            os.replace(temp_path, target_path)
+        finally:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+        return reader.size
+
+    def complete_upload(self, object_key: str) -> Dict[str, Any]:
+        """将暂存的直传文件移动到内容地址，需要压缩的文件压缩后再移动"""
+        staged_path = self._direct_upload_path(object_key)
+        if not os.path.exists(staged_path):
+            raise FileNotFoundError(f"上传文件不存在或已完成: {object_key}")
+        with open(staged_path, "rb") as f:
+            content_hash = compute_content_hash(f)
+        file_size = os.path.getsize(staged_path)
+        codec = select_codec(object_key, self.compression)
+        source_path = staged_path
+        try:
+            if codec:
+                source_path = f"{staged_path}.{uuid.uuid4().hex}.part"
+                with open(staged_path, "rb") as f, open(source_path, "wb") as target:
+                    for chunk in encode_chunks(iter(lambda: f.read(CHUNK_SIZE), b""), codec, CHUNK_SIZE):
+                        target.write(chunk)
+            file_url = self._commit_file(source_path, content_hash, codec)
+        finally:
+            for path in {staged_path, source_path}:
+                if os.path.exists(path):
+                    os.remove(path)
+        return {"file_url": file_url, "file_size": file_size, "content_hash": content_hash}
+
+    def open_stored(self, file_url: str) -> Tuple[BinaryIO, Optional[str]]:
+        """打开本地文件"""
+        file_path, codec = self.resolve_file(file_url)
+        return open(file_path, "rb"), codec
+
+    def delete_file(self, file_url: str) -> bool:
+        """减少文件的引用计数，引用归零时删除文件"""
+        base_path = self.get_file_path(file_url)
+        file_path = self.resolve_file(file_url)[0]
+        if not os.path.exists(file_path):
+            logger.warning(f"文件不存在: {file_path}")
+            return False
+
+        with self._locked_refs(base_path) as ref_file:
+            count = self._read_refs(ref_file) - 1
+            if count > 0:
+                self._write_refs(ref_file, count)
+                logger.info(f"文件仍有{count}个引用，保留: {file_path}")
+                return True
+            os.remove(file_path)
+            os.remove(ref_file.name)
+        return True
+
+
+class AliyunOSSService(StorageService):
+    """
+    阿里云OSS存储服务
+
+    上传的对象按每次上传生成的UUID命名，不使用客户端文件名。超过分片阈值的文件以
+    并发分片的方式上传，已上传的分片记录在按内容哈希命名的本地检查点中，上传中断后
+    再次上传相同内容时继续写入原对象并跳过内容一致的分片；同一检查点同时只由一个
+    上传使用。超过下载阈值的文件按范围并发下载。
+    中断后不再继续的分片上传由存储桶的生命周期规则清理。
+    压缩存储的对象在 x-oss-meta-codec 元数据中记录编码方式。
+    """
+
     def __init__(self):
         self.env = os.getenv("ENV", "test")
+        # 分片上传的分片大小，OSS要求除最后一片外不小于100KB
+        self.part_size = int(os.getenv("ALIYUN_OSS_PART_SIZE", str(CHUNK_SIZE)))
+        # 超过该大小的文件使用分片上传，默认为一个分片的大小
+        self.multipart_threshold = _optional_int(os.getenv("ALIYUN_OSS_MULTIPART_THRESHOLD"))
+        # 超过该大小的文件分段并发下载，默认为四个分片的大小
+        self.download_threshold = _optional_int(os.getenv("ALIYUN_OSS_DOWNLOAD_THRESHOLD"))
+        # 同时上传或下载的分片数
+        self.concurrency = int(os.getenv("ALIYUN_OSS_CONCURRENCY", "4"))
+        # 分片上传检查点目录，为空时不保存检查点，上传失败即取消
+        self.checkpoint_dir = os.getenv(
+            "ALIYUN_OSS_CHECKPOINT_DIR", os.path.join(tempfile.gettempdir(), "oss-checkpoints")
+        )
+        self._checkpoint_lock = threading.Lock()
+        # 进程内正在使用的检查点，跨进程由检查点锁文件互斥
+        self._active_checkpoints = set()
         if self.env == "test":
             self.mock = True
             self.bucket_name = os.getenv("ALIYUN_OSS_BUCKET", "test-bucket")
@@ -17,27 +440,334 @@ class StorageService:
             self.access_key_secret = os.getenv("ALIYUN_ACCESS_KEY_SECRET")
             self.bucket_name = os.getenv("ALIYUN_OSS_BUCKET")
             self.endpoint = os.getenv("ALIYUN_OSS_ENDPOINT")
-            
+
             # 初始化OSS客户端
             auth = oss2.Auth(self.access_key_id, self.access_key_secret)
             self.bucket = oss2.Bucket(auth, self.endpoint, self.bucket_name)
-    
-    def upload_file(self, file_content: bytes, file_name: str) -> str:
-        """上传文件到OSS"""
-        try:
-            if self.mock:
-                return f"https://{self.bucket_name}.{self.endpoint}/{file_name}"
-                
-            # 上传文件
-            result = self.bucket.put_object(file_name, file_content)
-            
+
+    def get_file_url(self, file_name: str) -> str:
+        """生成文件URL"""
+        return f"https://{self.bucket_name}.{self.endpoint}/{file_name}"
+
+    @staticmethod
+    def new_object_key(file_name: str) -> str:
+        """为一次上传生成对象名，保留扩展名"""
+        extension = os.path.splitext(os.path.basename(file_name or ""))[1].lower()
+        return f"{uuid.uuid4().hex}{extension}"
+
+    def upload_stream(self, file_obj: BinaryIO, file_name: str, content_hash: Optional[str] = None) -> Dict[str, Any]:
+        """
+        以并发分片上传的方式流式写入OSS，内存中最多保留并发数加一个分片
+
+        Args:
+            file_obj: 可读取的文件对象
+            file_name: 客户端文件名，只用于选择压缩方式和扩展名
+            content_hash: 预先计算的内容哈希，提供时启用断点续传检查点
+        """
+        reader = HashingReader(file_obj)
+        codec = select_codec(file_name, self.compression)
+        chunks = encode_chunks(reader.chunks(self.part_size), codec, self.part_size)
+
+        if self.mock:
+            object_key = self.new_object_key(file_name)
+            for _ in chunks:
+                pass
+        else:
+            try:
+                object_key = self._multipart_upload(
+                    chunks, file_name, content_hash, {OSS_CODEC_HEADER: codec} if codec else None
+                )
+            except ValueError:
+                raise
+            except Exception as e:
+                raise Exception(f"OSS服务错误：{str(e)}")
+
+        if content_hash and reader.content_hash != content_hash:
+            logger.warning(f"上传内容与预先计算的哈希不一致: {file_name}")
+        return {
+            "file_url": self.get_file_url(object_key),
+            "file_size": reader.size,
+            "content_hash": reader.content_hash
+        }
+
+    def _checkpoint_path(self, content_hash: str) -> str:
+        key = hashlib.sha1(f"{self.bucket_name}/{content_hash}".encode()).hexdigest()
+        return os.path.join(self.checkpoint_dir, f"{key}.json")
+
+    @contextmanager
+    def _claim_checkpoint(self, content_hash: Optional[str]):
+        """
+        独占相同内容的检查点，返回是否可以使用
+
+        未提供内容哈希、未启用检查点，或相同内容的上传正在进行时返回False，
+        本次上传不读写检查点，避免并发上传共用同一个upload_id。
+        """
+        if not content_hash or not self.checkpoint_dir:
+            yield False
+            return
+        with self._checkpoint_lock:
+            if content_hash in self._active_checkpoints:
+                claimed = False
+            else:
+                self._active_checkpoints.add(content_hash)
+                claimed = True
+        if not claimed:
+            yield False
+            return
+
+        lock_path = f"{self._checkpoint_path(content_hash)}.lock"
+        lock_file = None
+        try:
+            if fcntl is not None:
+                os.makedirs(self.checkpoint_dir, exist_ok=True)
+                lock_file, claimed = self._lock_checkpoint(lock_path)
+            yield claimed
+        finally:
+            if lock_file is not None:
+                if claimed:
+                    os.remove(lock_path)
+                lock_file.close()
+            with self._checkpoint_lock:
+                self._active_checkpoints.discard(content_hash)
+
+    @staticmethod
+    def _lock_checkpoint(lock_path: str):
+        """非阻塞地锁定检查点锁文件，锁文件在释放时删除，加锁后确认未被其他进程替换"""
+        while True:
+            lock_file = open(lock_path, "a")
+            try:
+                fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except OSError:
+                return lock_file, False
+            try:
+                if os.fstat(lock_file.fileno()).st_ino == os.stat(lock_path).st_ino:
+                    return lock_file, True
+            except FileNotFoundError:
+                pass
+            lock_file.close()
+
+    def _load_checkpoint(self, content_hash: str) -> Optional[Dict[str, Any]]:
+        """读取分片上传检查点，分片大小变化后的检查点不再使用"""
+        try:
+            with open(self._checkpoint_path(content_hash), "r", encoding="utf-8") as f:
+                checkpoint = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if checkpoint.get("part_size") != self.part_size or not checkpoint.get("object_key"):
+            return None
+        return checkpoint
+
+    def _save_checkpoint(self, content_hash: str, checkpoint: Dict[str, Any]):
+        """原子写入分片上传检查点"""
+        with self._checkpoint_lock:
+            os.makedirs(self.checkpoint_dir, exist_ok=True)
+            path = self._checkpoint_path(content_hash)
+            temp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+            with open(temp_path, "w", encoding="utf-8") as f:
+                json.dump(checkpoint, f)
+            os.replace(temp_path, path)
+
+    def _remove_checkpoint(self, content_hash: str):
+        try:
+            os.remove(self._checkpoint_path(content_hash))
+        except FileNotFoundError:
+            pass
+
+    def _multipart_upload(self, chunks: Iterator[bytes], file_name: str, content_hash: Optional[str] = None,
+                          headers: Optional[Dict[str, str]] = None) -> str:
+        """
+        分片并发上传，不超过分片阈值的文件直接使用put_object
+
+        Returns:
+            写入的对象名
+        """
+        threshold = self.multipart_threshold or self.part_size
+        head, head_size = [], 0
+        for chunk in chunks:
+            head.append(chunk)
+            head_size += len(chunk)
+            if head_size > threshold:
+                break
+
+        if head_size <= threshold:
+            object_key = self.new_object_key(file_name)
+            result = self.bucket.put_object(object_key, b"".join(head), headers=headers)
             if result.status != 200:
-                raise Exception("OSS服务错误：上传失败")
-                
-            # 生成文件URL
-            return f"https://{self.bucket_name}.{self.endpoint}/{file_name}"
-            
+                raise Exception("上传失败")
+            return object_key
+
+        with self._claim_checkpoint(content_hash) as use_checkpoint:
+            return self._upload_parts(itertools.chain(head, chunks), file_name, content_hash if use_checkpoint else None, headers)
+
+    def _upload_parts(self, chunks: Iterator[bytes], file_name: str, checkpoint_key: Optional[str],
+                      headers: Optional[Dict[str, str]]) -> str:
+        """上传全部分片，checkpoint_key 为空时不使用检查点，失败即取消上传"""
+        checkpoint = self._load_checkpoint(checkpoint_key) if checkpoint_key else None
+        if checkpoint is None:
+            object_key = self.new_object_key(file_name)
+            upload_id = self.bucket.init_multipart_upload(object_key, headers=headers).upload_id
+            checkpoint = {"object_key": object_key, "upload_id": upload_id, "part_size": self.part_size, "parts": {}}
+            if checkpoint_key:
+                self._save_checkpoint(checkpoint_key, checkpoint)
+        else:
+            object_key, upload_id = checkpoint["object_key"], checkpoint["upload_id"]
+            logger.info(f"从检查点继续分片上传: {file_name} -> {object_key}, 已上传{len(checkpoint['parts'])}个分片")
+        uploaded = dict(checkpoint["parts"])
+        etags: Dict[int, str] = {}
+
+        def upload_part(part_number: int, chunk: bytes):
+            # 检查点中内容一致的分片不再上传
+            etag = uploaded.get(str(part_number))
+            if etag and etag.upper() == hashlib.md5(chunk).hexdigest().upper():
+                return part_number, etag
+            etag = self.bucket.upload_part(object_key, upload_id, part_number, chunk).etag
+            if checkpoint_key:
+                with self._checkpoint_lock:
+                    checkpoint["parts"][str(part_number)] = etag
+                self._save_checkpoint(checkpoint_key, checkpoint)
+            return part_number, etag
+
+        def collect(futures):
+            for future in futures:
+                part_number, etag = future.result()
+                etags[part_number] = etag
+
+        try:
+            with ThreadPoolExecutor(max_workers=max(1, self.concurrency)) as executor:
+                pending = set()
+                for part_number, chunk in enumerate(chunks, 1):
+                    if len(pending) >= max(1, self.concurrency):
+                        finished, pending = wait(pending, return_when=FIRST_COMPLETED)
+                        collect(finished)
+                    pending.add(executor.submit(upload_part, part_number, chunk))
+                collect(wait(pending)[0])
+            parts = [oss2.models.PartInfo(number, etags[number]) for number in sorted(etags)]
+            self.bucket.complete_multipart_upload(object_key, upload_id, parts)
         except Exception as e:
-            if not self.mock:
-                raise Exception(f"OSS服务错误：{str(e)}")
-            return f"https://{self.bucket_name}.{self.endpoint}/{file_name}"
+            # 文件内容不合法、分片上传已失效或未使用检查点时取消上传，否则保留供下次继续
+            if isinstance(e, (ValueError, oss2.exceptions.NoSuchUpload)) or not checkpoint_key:
+                if checkpoint_key:
+                    self._remove_checkpoint(checkpoint_key)
+                try:
+                    self.bucket.abort_multipart_upload(object_key, upload_id)
+                except Exception as abort_error:
+                    logger.warning(f"取消分片上传失败: {object_key}, 原因: {str(abort_error)}")
+            raise
+        if checkpoint_key:
+            self._remove_checkpoint(checkpoint_key)
+        return object_key
+
+    def create_upload_url(self, object_key: str, content_type: str, expires: int) -> Dict[str, Any]:
+        """生成OSS预签名PUT URL，客户端上传时需携带相同的Content-Type"""
+        headers = {"Content-Type": content_type}
+        if self.mock:
+            url = f"{self.get_file_url(object_key)}?Expires={int(time.time()) + expires}&Signature=mock"
+        else:
+            url = self.bucket.sign_url("PUT", object_key, expires, headers=headers)
+        return {"url": url, "method": "PUT", "headers": headers}
+
+    def create_download_url(self, file_url: str, expires: int) -> str:
+        """生成OSS预签名GET URL，不属于当前存储桶的地址原样返回"""
+        if self.mock or f"{self.endpoint}/" not in file_url:
+            return file_url
+        return self.bucket.sign_url("GET", self.get_object_key(file_url), expires)
+
+    def complete_upload(self, object_key: str) -> Dict[str, Any]:
+        """
+        确认对象已上传，OSS不提供SHA-256，内容哈希由调用方读取文件后计算
+
+        客户端直传的对象按原样保存，不压缩。超过大小上限的对象直接删除。
+
+        Raises:
+            FileNotFoundError: 文件尚未上传
+            FileTooLargeError: 文件超过大小上限
+        """
+        file_size = None
+        if not self.mock:
+            try:
+                file_size = self.bucket.head_object(object_key).content_length
+            except oss2.exceptions.NotFound:
+                raise FileNotFoundError(f"上传文件不存在: {object_key}")
+            if MAX_FILE_SIZE and file_size > MAX_FILE_SIZE:
+                self.bucket.delete_object(object_key)
+                raise FileTooLargeError(f"文件大小超过限制（最大{MAX_FILE_SIZE // (1024 * 1024)}MB）")
+        return {"file_url": self.get_file_url(object_key), "file_size": file_size, "content_hash": None}
+
+    def get_object_key(self, file_url: str) -> str:
+        """根据文件URL获取OSS对象名"""
+        return file_url.split(f"{self.endpoint}/", 1)[-1]
+
+    def download_to(self, file_url: str, target: BinaryIO) -> int:
+        """
+        按范围分段并发下载文件的存储内容，压缩存储的对象不解压
+
+        Args:
+            file_url: 文件URL
+            target: 可随机写入的文件对象，下载完成后读取位置恢复到开头
+
+        Returns:
+            文件大小
+        """
+        key = self.get_object_key(file_url)
+        size = self.bucket.head_object(key).content_length
+        self._download_ranges(key, size, target)
+        return size
+
+    def _download_ranges(self, key: str, size: int, target: BinaryIO):
+        ranges = [(start, min(start + self.part_size, size) - 1) for start in range(0, size, self.part_size)]
+        write_lock = threading.Lock()
+
+        def fetch(byte_range):
+            data = self.bucket.get_object(key, byte_range=byte_range).read()
+            if len(data) != byte_range[1] - byte_range[0] + 1:
+                raise Exception(f"分段下载长度不一致: {key} {byte_range}")
+            with write_lock:
+                target.seek(byte_range[0])
+                target.write(data)
+
+        with ThreadPoolExecutor(max_workers=max(1, self.concurrency)) as executor:
+            list(executor.map(fetch, ranges))
+        target.seek(0)
+
+    @staticmethod
+    def _object_codec(head) -> Optional[str]:
+        return (getattr(head, "headers", None) or {}).get(OSS_CODEC_HEADER) or None
+
+    def get_codec(self, file_url: str) -> Optional[str]:
+        """
+        从对象元数据读取编码方式
+
+        Raises:
+            FileNotFoundError: 对象不存在
+        """
+        if self.mock or f"{self.endpoint}/" not in file_url:
+            return None
+        try:
+            return self._object_codec(self.bucket.head_object(self.get_object_key(file_url)))
+        except oss2.exceptions.NotFound:
+            raise FileNotFoundError(f"文件不存在: {file_url}")
+
+    def open_stored(self, file_url: str) -> Tuple[BinaryIO, Optional[str]]:
+        """读取OSS文件，小文件以流的方式读取，大文件并发下载到本地临时文件"""
+        if self.mock:
+            raise FileNotFoundError(f"模拟OSS服务不保存文件内容: {file_url}")
+        key = self.get_object_key(file_url)
+        head = self.bucket.head_object(key)
+        codec = self._object_codec(head)
+        if head.content_length < (self.download_threshold or 4 * self.part_size):
+            return self.bucket.get_object(key), codec
+
+        temp_file = tempfile.TemporaryFile(dir=UPLOAD_STAGING_DIR)
+        try:
+            self._download_ranges(key, head.content_length, temp_file)
+        except Exception:
+            temp_file.close()
+            raise
+        return temp_file, codec
+
+    def delete_file(self, file_url: str) -> bool:
+        """删除OSS文件"""
+        if self.mock:
+            return True
+        self.bucket.delete_object(self.get_object_key(file_url))
+        return True
@@ -0,0 +1,79 @@
+"""存储压缩编码
+
+写入存储时按文件类型选择性地使用zstd压缩，读取时流式解压。
+编码方式记录在存储元数据中：本地存储为文件名后缀，OSS为对象的自定义元数据。
+DOCX、JPG、PNG本身已经压缩，默认不再压缩。
+"""
+import os
+from typing import BinaryIO, Iterator, Optional
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+# 存储压缩方式：none 或 zstd
+STORAGE_COMPRESSION = os.getenv("STORAGE_COMPRESSION", "none").lower()
+
+# 需要压缩的文件类型
+STORAGE_COMPRESS_TYPES = {
+    file_type.strip().lower()
+    for file_type in os.getenv("STORAGE_COMPRESS_TYPES", "pdf,doc,txt").split(",")
+    if file_type.strip()
+}
+
+# zstd压缩级别
+STORAGE_COMPRESSION_LEVEL = int(os.getenv("STORAGE_COMPRESSION_LEVEL", "3"))
+
+# 编码方式
+CODEC_ZSTD = "zstd"
+
+# 本地存储中压缩文件的后缀
+CODEC_SUFFIXES = {CODEC_ZSTD: ".zst"}
+
+# OSS对象中记录编码方式的元数据
+OSS_CODEC_HEADER = "x-oss-meta-codec"
+
+
+def select_codec(file_name: str, compression: str = STORAGE_COMPRESSION) -> Optional[str]:
+    """根据压缩配置和文件类型选择编码方式，不压缩时返回None"""
+    if compression != CODEC_ZSTD:
+        return None
+    if zstandard is None:
+        raise RuntimeError("未安装zstandard，无法压缩存储文件")
+    file_type = os.path.splitext(file_name)[1].lstrip(".").lower()
+    return CODEC_ZSTD if file_type in STORAGE_COMPRESS_TYPES else None
+
+
+def encode_chunks(chunks: Iterator[bytes], codec: Optional[str], chunk_size: int) -> Iterator[bytes]:
+    """
+    流式压缩
+
+    压缩输出重新切分为 chunk_size 大小的块（最后一块除外），便于按块写入或分片上传。
+    """
+    if codec is None:
+        yield from chunks
+        return
+
+    compressor = zstandard.ZstdCompressor(level=STORAGE_COMPRESSION_LEVEL).compressobj()
+    buffer = bytearray()
+    for chunk in chunks:
+        buffer += compressor.compress(chunk)
+        while len(buffer) >= chunk_size:
+            yield bytes(buffer[:chunk_size])
+            del buffer[:chunk_size]
+    buffer += compressor.flush()
+    while buffer:
+        yield bytes(buffer[:chunk_size])
+        del buffer[:chunk_size]
+
+
+def decode_stream(file_obj: BinaryIO, codec: Optional[str]) -> BinaryIO:
+    """返回流式解压的文件对象，关闭时同时关闭底层文件"""
+    if codec is None:
+        return file_obj
+    if codec != CODEC_ZSTD:
+        raise ValueError(f"不支持的编码方式: {codec}")
+    if zstandard is None:
+        raise RuntimeError("未安装zstandard，无法读取压缩存储的文件")
+    return zstandard.ZstdDecompressor().stream_reader(file_obj, closefd=True)
@@ -1,6 +1,7 @@
 """标签服务"""
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
 from sqlalchemy.orm import Session
+from sqlalchemy.exc import IntegrityError
 from app.models.tag import Tag
 from app.models.resume import Resume
 from app.services.gpt import GPTService
@@ -11,18 +12,22 @@ def create_or_get_tags(db: Session, tag_names: List[str]) -> List[Tag]:
     for name in tag_names:
         tag = db.query(Tag).filter(Tag.name == name).first()
         if not tag:
-            tag = Tag(name=name)
-            db.add(tag)
-            db.flush()
+            try:
+                # 并发解析的简历可能同时创建同名标签，冲突时改用已提交的标签
+                with db.begin_nested():
+                    tag = Tag(name=name)
+                    db.add(tag)
+            except IntegrityError:
+                tag = db.query(Tag).filter(Tag.name == name).one()
         result.append(tag)
     return result
 
 class TagService:
     """标签服务实现"""
     
-    def __init__(self, db: Session):
+    def __init__(self, db: Session, gpt_service: Optional[GPTService] = None):
         self.db = db
-        self.gpt_service = GPTService()
+        self.gpt_service = gpt_service or GPTService()
     
     def generate_resume_tags(self, resume: Resume) -> List[Dict[str, str]]:
         """生成简历标签"""
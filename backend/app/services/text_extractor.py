@@ -0,0 +1,108 @@
+"""本地文本提取服务
+
+数字版PDF和DOCX简历自带文本层，直接在本地读取即可，无需调用OCR服务。
+扫描件、乱码或文本过少的文档返回None，由调用方回退到OCR；PDF的分页回退
+（保留可读页面、只识别其余页面）由 page_ocr.ocr_pdf_pages 完成。
+"""
+import os
+import re
+import shutil
+import zipfile
+import logging
+import tempfile
+from typing import BinaryIO, List, Optional
+from xml.etree import ElementTree
+
+try:
+    from pypdf import PdfReader
+except ImportError:
+    # 未安装pypdf时PDF全部交给OCR处理
+    PdfReader = None
+
+logger = logging.getLogger(__name__)
+
+# 每页至少需要的有效字符数，低于该值视为扫描页
+MIN_CHARS_PER_PAGE = int(os.getenv("LOCAL_EXTRACT_MIN_CHARS_PER_PAGE", "30"))
+
+# 无法识别的字符占比上限，超过时视为字体缺失导致的乱码
+MAX_GARBLED_RATIO = float(os.getenv("LOCAL_EXTRACT_MAX_GARBLED_RATIO", "0.2"))
+
+# 支持本地提取的文件类型
+SUPPORTED_FILE_TYPES = ["pdf", "docx"]
+
+WORD_NAMESPACE = "{http://schemas.openxmlformats.org/wordprocessingml/2006/main}"
+
+# 缺字形时PDF常见的占位字符（实心方块、替换字符、私用区字符）
+GARBLED_CHARS = re.compile("[\u25a0\ufffd\ue000-\uf8ff]")
+
+
+def is_readable_text(text: str) -> bool:
+    """判断文本是否为可用的文本层"""
+    content = re.sub(r"\s", "", text or "")
+    if not content:
+        return False
+    garbled = len(GARBLED_CHARS.findall(content))
+    if garbled / len(content) > MAX_GARBLED_RATIO:
+        return False
+    meaningful = sum(1 for char in content if char.isalnum())
+    return meaningful >= MIN_CHARS_PER_PAGE
+
+
+def extract_pdf_pages(file_obj: BinaryIO) -> Optional[List[str]]:
+    """读取PDF每一页的文本层"""
+    if PdfReader is None:
+        return None
+    reader = PdfReader(file_obj)
+    return [page.extract_text() or "" for page in reader.pages]
+
+
+def extract_docx_text(file_obj: BinaryIO) -> str:
+    """读取DOCX正文中的段落文本"""
+    with zipfile.ZipFile(file_obj) as archive:
+        document = ElementTree.fromstring(archive.read("word/document.xml"))
+
+    paragraphs = []
+    for paragraph in document.iter(f"{WORD_NAMESPACE}p"):
+        text = "".join(node.text or "" for node in paragraph.iter(f"{WORD_NAMESPACE}t"))
+        if text.strip():
+            paragraphs.append(text)
+    return "\n".join(paragraphs)
+
+
+def ensure_seekable(file_obj: BinaryIO) -> BinaryIO:
+    """PDF和ZIP解析需要随机访问，不可定位的流先写入临时文件"""
+    if hasattr(file_obj, "seekable") and file_obj.seekable():
+        return file_obj
+    spooled = tempfile.SpooledTemporaryFile(max_size=1024 * 1024)
+    shutil.copyfileobj(file_obj, spooled)
+    spooled.seek(0)
+    return spooled
+
+
+def extract_text(file_obj: BinaryIO, file_type: str) -> Optional[str]:
+    """
+    从文件的文本层提取内容
+
+    Args:
+        file_obj: 文件对象
+        file_type: 文件类型（扩展名）
+
+    Returns:
+        提取的文本；不支持的类型、扫描件或文本过少时返回None
+    """
+    if file_type not in SUPPORTED_FILE_TYPES:
+        return None
+
+    try:
+        file_obj = ensure_seekable(file_obj)
+        if file_type == "pdf":
+            pages = extract_pdf_pages(file_obj)
+            if not pages or not all(is_readable_text(page) for page in pages):
+                return None
+            return "\n".join(page.strip() for page in pages)
+
+        text = extract_docx_text(file_obj)
+        return text if is_readable_text(text) else None
+    except Exception as e:
+        logger.warning(f"本地文本提取失败，回退到OCR: {str(e)}")
+        return None
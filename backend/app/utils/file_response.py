@@ -0,0 +1,237 @@
+"""
+文件下载响应模块
+支持单段Range请求和ETag/If-None-Match、If-Modified-Since条件请求；
+开启零拷贝且ASGI服务器提供扩展时通过sendfile发送文件内容，否则在线程池中按块读取发送。
+压缩存储的文件在客户端支持该编码时原样发送并设置 Content-Encoding，否则边解压边发送，均不支持Range请求
+"""
+import os
+import re
+import stat
+import hashlib
+from email.utils import formatdate, parsedate_to_datetime
+from typing import BinaryIO, Dict, Iterator, Mapping, Optional, Tuple
+from urllib.parse import quote
+
+import anyio
+from starlette.responses import Response, StreamingResponse
+from starlette.types import Receive, Scope, Send
+
+from app.services.storage_codec import decode_stream
+
+# 服务器提供 http.response.zerocopysend 扩展时是否使用零拷贝发送
+# BaseHTTPMiddleware 不能转发该消息，只有中间件全部为纯ASGI实现时才能开启
+FILE_ZERO_COPY_ENABLED = os.getenv("FILE_ZERO_COPY_ENABLED", "False").lower() == "true"
+
+# 单段Range请求格式，多段请求按完整文件返回
+RANGE_PATTERN = re.compile(r"^bytes=(\d*)-(\d*)$")
+
+
+def file_etag(stat_result: os.stat_result) -> str:
+    """根据文件修改时间和大小生成ETag"""
+    value = f"{stat_result.st_mtime_ns}-{stat_result.st_size}"
+    return f'"{hashlib.md5(value.encode()).hexdigest()}"'
+
+
+def parse_range(header: str, size: int) -> Optional[Tuple[int, int]]:
+    """
+    解析Range请求头
+
+    Returns:
+        (起始位置, 结束位置)，两端均包含；格式不支持时返回None，按完整文件返回
+
+    Raises:
+        ValueError: 请求范围超出文件大小
+    """
+    match = RANGE_PATTERN.match(header.strip())
+    if not match or match.group(1) == match.group(2) == "":
+        return None
+    first, last = match.groups()
+    if first == "":
+        # bytes=-N 表示最后N个字节
+        length = int(last)
+        if length == 0:
+            raise ValueError("请求范围无效")
+        return max(size - length, 0), size - 1
+    start = int(first)
+    end = min(int(last), size - 1) if last else size - 1
+    if start >= size or start > end:
+        raise ValueError("请求范围无效")
+    return start, end
+
+
+def _etag_matches(header: str, etag: str) -> bool:
+    """If-None-Match 使用弱比较"""
+    if header.strip() == "*":
+        return True
+    tags = [tag.strip() for tag in header.split(",")]
+    weak_etag = etag[2:] if etag.startswith("W/") else etag
+    return any((tag[2:] if tag.startswith("W/") else tag) == weak_etag for tag in tags)
+
+
+def is_not_modified(request_headers: Mapping[str, str], etag: str, mtime: float) -> bool:
+    """判断条件请求是否命中缓存，有 If-None-Match 时忽略 If-Modified-Since"""
+    if_none_match = request_headers.get("if-none-match")
+    if if_none_match is not None:
+        return _etag_matches(if_none_match, etag)
+    if_modified_since = request_headers.get("if-modified-since")
+    if if_modified_since:
+        try:
+            return int(mtime) <= parsedate_to_datetime(if_modified_since).timestamp()
+        except (TypeError, ValueError):
+            return False
+    return False
+
+
+def accepts_encoding(request_headers: Mapping[str, str], codec: str) -> bool:
+    """判断客户端的 Accept-Encoding 是否接受该编码"""
+    for item in request_headers.get("accept-encoding", "").split(","):
+        name, _, params = item.strip().partition(";")
+        if name.strip().lower() not in (codec, "*"):
+            continue
+        quality = params.strip().lower()
+        if quality.startswith("q="):
+            try:
+                return float(quality[2:]) > 0
+            except ValueError:
+                return False
+        return True
+    return False
+
+
+def iter_file(file_obj: BinaryIO, chunk_size: int = 256 * 1024) -> Iterator[bytes]:
+    """按块读取文件对象，读取完成或中断后关闭文件"""
+    try:
+        while True:
+            chunk = file_obj.read(chunk_size)
+            if not chunk:
+                break
+            yield chunk
+    finally:
+        file_obj.close()
+
+
+def encoded_stream_response(
+    request_headers: Mapping[str, str],
+    file_obj: BinaryIO,
+    codec: str,
+    media_type: str,
+    headers: Dict[str, str]
+) -> Response:
+    """发送压缩存储的文件对象，客户端支持该编码时发送压缩内容，否则发送解压后的内容"""
+    headers = {**headers, "Vary": "Accept-Encoding"}
+    if accepts_encoding(request_headers, codec):
+        headers["Content-Encoding"] = codec
+    else:
+        file_obj = decode_stream(file_obj, codec)
+    return StreamingResponse(iter_file(file_obj), headers=headers, media_type=media_type)
+
+
+def content_disposition(filename: str, disposition_type: str = "inline") -> str:
+    """生成支持中文文件名的 Content-Disposition"""
+    return f"{disposition_type}; filename*=utf-8''{quote(filename)}"
+
+
+class FileRangeResponse(Response):
+    """发送文件的全部或一段内容"""
+
+    chunk_size = 256 * 1024
+
+    def __init__(
+        self,
+        path: str,
+        start: int,
+        end: int,
+        status_code: int = 200,
+        headers: Optional[Dict[str, str]] = None,
+        media_type: Optional[str] = None
+    ):
+        self.path = path
+        self.start = start
+        self.count = max(end - start + 1, 0)
+        headers = {**(headers or {}), "Content-Length": str(self.count)}
+        super().__init__(status_code=status_code, headers=headers, media_type=media_type)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        await send({"type": "http.response.start", "status": self.status_code, "headers": self.raw_headers})
+        extensions = scope.get("extensions") or {}
+        if scope["method"].upper() == "HEAD" or self.count == 0:
+            await send({"type": "http.response.body", "body": b"", "more_body": False})
+            return
+
+        async with await anyio.open_file(self.path, mode="rb") as file:
+            if FILE_ZERO_COPY_ENABLED and "http.response.zerocopysend" in extensions:
+                await send({
+                    "type": "http.response.zerocopysend",
+                    "file": file.wrapped,
+                    "offset": self.start,
+                    "count": self.count,
+                    "more_body": False
+                })
+                return
+
+            await file.seek(self.start)
+            remaining = self.count
+            while remaining > 0:
+                chunk = await file.read(min(self.chunk_size, remaining))
+                remaining = remaining - len(chunk) if chunk else 0
+                await send({"type": "http.response.body", "body": chunk, "more_body": remaining > 0})
+
+
+def file_download_response(
+    request_headers: Mapping[str, str],
+    path: str,
+    media_type: str,
+    filename: str,
+    cache_control: str,
+    codec: Optional[str] = None
+) -> Response:
+    """
+    生成文件下载响应
+
+    Args:
+        codec: 文件的存储编码方式，压缩存储时不支持Range请求
+
+    Raises:
+        FileNotFoundError: 文件不存在
+    """
+    stat_result = os.stat(path)
+    if not stat.S_ISREG(stat_result.st_mode):
+        raise FileNotFoundError(path)
+    size = stat_result.st_size
+    etag = file_etag(stat_result)
+    if codec and not accepts_encoding(request_headers, codec):
+        # 解压后发送的内容与压缩内容是不同的表示，使用不同的ETag
+        etag = f'{etag[:-1]}-identity"'
+    last_modified = formatdate(stat_result.st_mtime, usegmt=True)
+    headers = {
+        "ETag": etag,
+        "Last-Modified": last_modified,
+        "Cache-Control": cache_control,
+        "Accept-Ranges": "none" if codec else "bytes"
+    }
+    if codec:
+        headers["Vary"] = "Accept-Encoding"
+
+    if is_not_modified(request_headers, etag, stat_result.st_mtime):
+        return Response(status_code=304, headers=headers)
+
+    headers["Content-Disposition"] = content_disposition(filename)
+    if codec:
+        if accepts_encoding(request_headers, codec):
+            headers["Content-Encoding"] = codec
+            return FileRangeResponse(path, 0, size - 1, 200, headers, media_type)
+        return encoded_stream_response(request_headers, open(path, "rb"), codec, media_type, headers)
+    range_header = request_headers.get("range")
+    if_range = request_headers.get("if-range")
+    # If-Range 与当前版本不一致时返回完整文件
+    if range_header and (if_range is None or if_range in (etag, last_modified)):
+        try:
+            byte_range = parse_range(range_header, size)
+        except ValueError:
+            return Response(status_code=416, headers={**headers, "Content-Range": f"bytes */{size}"})
+        if byte_range is not None:
+            start, end = byte_range
+            headers["Content-Range"] = f"bytes {start}-{end}/{size}"
+            return FileRangeResponse(path, start, end, 206, headers, media_type)
+
+    return FileRangeResponse(path, 0, size - 1, 200, headers, media_type)
@@ -0,0 +1,164 @@
+"""
+事件循环阻塞检测模块
+事件循环被同步代码阻塞超过阈值时，记录阻塞位置的调用栈和所属接口，
+按接口统计次数并写入日志。通过 LOOP_MONITOR_ENABLED 开启，用于预发环境排查。
+"""
+import os
+import sys
+import time
+import asyncio
+import logging
+import threading
+import traceback
+import weakref
+from collections import Counter, deque
+from typing import Any, Dict, Optional
+
+# 获取日志记录器
+logger = logging.getLogger("hr_recruitment")
+
+# 是否开启事件循环阻塞检测
+LOOP_MONITOR_ENABLED = os.getenv("LOOP_MONITOR_ENABLED", "False").lower() == "true"
+
+# 阻塞阈值（毫秒）
+LOOP_BLOCK_THRESHOLD_MS = float(os.getenv("LOOP_BLOCK_THRESHOLD_MS", "100"))
+
+# 保留的最近阻塞记录数
+LOOP_MONITOR_MAX_INCIDENTS = int(os.getenv("LOOP_MONITOR_MAX_INCIDENTS", "100"))
+
+# 未能关联到接口的阻塞
+UNKNOWN_ENDPOINT = "<unknown>"
+
+
+def endpoint_label(scope: Dict[str, Any]) -> str:
+    """生成接口名称，路由匹配后使用路径模板，避免按资源ID分散计数"""
+    route = scope.get("route")
+    path = getattr(route, "path", None) or scope.get("path", "")
+    return f"{scope.get('method', '')} {path}"
+
+
+class LoopBlockMonitor:
+    """
+    事件循环阻塞检测器
+
+    事件循环中的心跳协程定期更新时间戳，独立的监视线程发现心跳超过阈值未更新时，
+    读取事件循环线程当前的调用栈；心跳恢复后记录实际阻塞时长。
+    """
+
+    def __init__(self, threshold_ms: float = LOOP_BLOCK_THRESHOLD_MS, max_incidents: int = LOOP_MONITOR_MAX_INCIDENTS):
+        self.threshold = threshold_ms / 1000
+        self.interval = max(self.threshold / 4, 0.005)
+        self.incidents = deque(maxlen=max_incidents)
+        self.counts = Counter()
+        self._routes = weakref.WeakKeyDictionary()
+        self._lock = threading.Lock()
+        self._pending: Optional[Dict[str, Any]] = None
+        self._loop = None
+        self._loop_thread_id = None
+        self._last_beat = time.monotonic()
+        self._running = False
+        self._heartbeat_task = None
+        self._watchdog = None
+
+    @property
+    def running(self) -> bool:
+        return self._running
+
+    async def start(self):
+        """在当前事件循环中开始检测"""
+        if self._running:
+            return
+        self._loop = asyncio.get_running_loop()
+        self._loop_thread_id = threading.get_ident()
+        self._last_beat = time.monotonic()
+        self._running = True
+        self._heartbeat_task = asyncio.create_task(self._heartbeat())
+        self._watchdog = threading.Thread(target=self._watch, name="loop-block-monitor", daemon=True)
+        self._watchdog.start()
+        logger.info(f"事件循环阻塞检测已开启，阈值{self.threshold * 1000:.0f}ms")
+
+    async def stop(self):
+        """停止检测"""
+        if not self._running:
+            return
+        self._running = False
+        self._heartbeat_task.cancel()
+        try:
+            await self._heartbeat_task
+        except asyncio.CancelledError:
+            pass
+        self._watchdog.join(timeout=1)
+
+    def track(self, task: asyncio.Task, scope: Dict[str, Any]):
+        """将任务关联到请求，阻塞发生在该任务中时按接口计数"""
+        self._routes[task] = scope
+
+    async def _heartbeat(self):
+        while self._running:
+            now = time.monotonic()
+            blocked = now - self._last_beat - self.interval
+            self._last_beat = now
+            with self._lock:
+                pending, self._pending = self._pending, None
+            if pending is not None:
+                self._record(pending, max(blocked, self.threshold))
+            await asyncio.sleep(self.interval)
+
+    def _watch(self):
+        while self._running:
+            time.sleep(self.interval)
+            if time.monotonic() - self._last_beat < self.threshold + self.interval:
+                continue
+            with self._lock:
+                if self._pending is None:
+                    self._pending = self._capture()
+
+    def _capture(self) -> Dict[str, Any]:
+        """读取事件循环线程的调用栈和当前任务所属接口"""
+        frame = sys._current_frames().get(self._loop_thread_id)
+        stack = traceback.format_stack(frame) if frame is not None else []
+        task = asyncio.current_task(self._loop)
+        scope = self._routes.get(task) if task is not None else None
+        endpoint = endpoint_label(scope) if scope is not None else UNKNOWN_ENDPOINT
+        return {"endpoint": endpoint, "stack": "".join(stack), "detected_at": time.time()}
+
+    def _record(self, incident: Dict[str, Any], blocked: float):
+        incident["duration_ms"] = round(blocked * 1000, 1)
+        self.counts[incident["endpoint"]] += 1
+        self.incidents.append(incident)
+        logger.warning(
+            f"事件循环阻塞{incident['duration_ms']}ms: 接口={incident['endpoint']}\n{incident['stack']}"
+        )
+
+    def snapshot(self) -> Dict[str, Any]:
+        """返回按接口统计的阻塞次数和最近的阻塞记录"""
+        return {
+            "enabled": self._running,
+            "threshold_ms": self.threshold * 1000,
+            "counts": dict(self.counts),
+            "incidents": list(self.incidents)
+        }
+
+    def reset(self):
+        """清空统计"""
+        self.counts.clear()
+        self.incidents.clear()
+
+
+# 进程内共享的检测器
+loop_monitor = LoopBlockMonitor()
+
+
+class LoopMonitorMiddleware:
+    """将请求所在的任务关联到接口，需作为最内层中间件添加"""
+
+    def __init__(self, app, monitor: LoopBlockMonitor = loop_monitor):
+        self.app = app
+        self.monitor = monitor
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "http" and self.monitor.running:
+            task = asyncio.current_task()
+            if task is not None:
+                self.monitor.track(task, scope)
+        await self.app(scope, receive, send)
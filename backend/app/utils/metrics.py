@@ -0,0 +1,112 @@
+"""
+耗时统计模块
+按阶段、文件类型和文件大小区间记录简历入库各阶段耗时的直方图
+"""
+import time
+import threading
+from bisect import bisect_left
+from contextlib import contextmanager
+from typing import Any, Dict, List, Optional
+
+# 直方图桶的上边界（毫秒），最后一个桶收集超出范围的值
+HISTOGRAM_BUCKETS_MS = [5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000, 30000, 60000]
+
+# 文件大小区间（字节上边界, 标签）
+SIZE_BUCKETS = [
+    (100 * 1024, "<100KB"),
+    (1024 * 1024, "100KB-1MB"),
+    (5 * 1024 * 1024, "1MB-5MB"),
+]
+LARGEST_SIZE_BUCKET = ">5MB"
+
+
+def size_bucket(size: Optional[int]) -> str:
+    """返回文件大小所在的区间"""
+    if size is None:
+        return "unknown"
+    for limit, label in SIZE_BUCKETS:
+        if size < limit:
+            return label
+    return LARGEST_SIZE_BUCKET
+
+
+class StageHistograms:
+    """阶段耗时直方图，线程安全"""
+
+    def __init__(self, buckets: List[float] = HISTOGRAM_BUCKETS_MS):
+        self.buckets = buckets
+        self._series: Dict[tuple, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, stage: str, file_type: str, size_label: str, duration_ms: float):
+        """记录一次阶段耗时"""
+        key = (stage, file_type, size_label)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = {"counts": [0] * (len(self.buckets) + 1), "count": 0, "sum": 0.0}
+                self._series[key] = series
+            series["counts"][bisect_left(self.buckets, duration_ms)] += 1
+            series["count"] += 1
+            series["sum"] += duration_ms
+
+    def snapshot(self) -> List[Dict[str, Any]]:
+        """导出所有直方图，桶计数为累计值"""
+        labels = [str(bound) for bound in self.buckets] + ["+Inf"]
+        result = []
+        with self._lock:
+            for (stage, file_type, size_label), series in sorted(self._series.items()):
+                cumulative, total = {}, 0
+                for label, count in zip(labels, series["counts"]):
+                    total += count
+                    cumulative[label] = total
+                result.append({
+                    "stage": stage,
+                    "file_type": file_type,
+                    "size_bucket": size_label,
+                    "count": series["count"],
+                    "sum_ms": round(series["sum"], 3),
+                    "buckets_ms": cumulative
+                })
+        return result
+
+    def reset(self):
+        """清空统计"""
+        with self._lock:
+            self._series.clear()
+
+
+# 进程内共享的入库耗时直方图
+ingestion_histograms = StageHistograms()
+
+
+class StageTimer:
+    """记录一次请求或一次流水线运行中各阶段的耗时"""
+
+    def __init__(self):
+        self.timings: Dict[str, float] = {}
+
+    @contextmanager
+    def stage(self, name: str):
+        """统计代码块耗时，同名阶段多次执行时累加"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = (time.perf_counter() - start) * 1000
+            self.timings[name] = round(self.timings.get(name, 0.0) + elapsed, 3)
+
+    def record(self, file_type: str, size: Optional[int], histograms: StageHistograms = ingestion_histograms):
+        """将本次各阶段耗时写入直方图"""
+        size_label = size_bucket(size)
+        for name, duration_ms in self.timings.items():
+            histograms.observe(name, file_type or "unknown", size_label, duration_ms)
+
+    def server_timing(self) -> str:
+        """生成 Server-Timing 响应头"""
+        return format_server_timing(self.timings)
+
+
+def format_server_timing(timings: Optional[Dict[str, float]]) -> str:
+    """将阶段耗时格式化为 Server-Timing 响应头"""
+    return ", ".join(f"{name};dur={duration_ms}" for name, duration_ms in (timings or {}).items())
@@ -0,0 +1,87 @@
+"""
+签名工具模块
+为直传上传URL和上传凭证生成、校验HMAC签名
+"""
+import os
+import hmac
+import json
+import time
+import base64
+import hashlib
+import logging
+import secrets
+from typing import Any, Dict
+
+# 获取日志记录器
+logger = logging.getLogger("hr_recruitment")
+
+# 未配置签名密钥时使用的进程内随机密钥，只在测试环境中使用
+_fallback_secret = None
+
+
+def get_signing_secret() -> str:
+    """
+    获取签名密钥
+
+    密钥从环境变量 STORAGE_SIGNING_SECRET 读取，多进程部署时各进程必须使用相同的值，
+    否则一个进程签发的上传凭证在其他进程中校验失败；只有测试环境允许不配置。
+
+    Raises:
+        RuntimeError: 非测试环境未配置签名密钥
+    """
+    global _fallback_secret
+    secret = os.getenv("STORAGE_SIGNING_SECRET")
+    if secret:
+        return secret
+    if os.getenv("TESTING", "False").lower() != "true":
+        raise RuntimeError("未配置STORAGE_SIGNING_SECRET，直传上传的签名无法在多个进程间校验")
+    if _fallback_secret is None:
+        logger.warning("未配置STORAGE_SIGNING_SECRET，测试环境使用进程内随机密钥")
+        _fallback_secret = secrets.token_hex(32)
+    return _fallback_secret
+
+
+def sign_value(value: str) -> str:
+    """计算字符串的签名"""
+    return hmac.new(get_signing_secret().encode(), value.encode(), hashlib.sha256).hexdigest()
+
+
+def verify_value(value: str, signature: str) -> bool:
+    """校验字符串的签名"""
+    return hmac.compare_digest(sign_value(value), signature or "")
+
+
+def _b64encode(data: bytes) -> str:
+    return base64.urlsafe_b64encode(data).rstrip(b"=").decode()
+
+
+def _b64decode(data: str) -> bytes:
+    return base64.urlsafe_b64decode(data + "=" * (-len(data) % 4))
+
+
+def sign_payload(payload: Dict[str, Any], expires_in: int) -> str:
+    """
+    生成带过期时间的签名凭证
+
+    Args:
+        payload: 凭证内容
+        expires_in: 有效期（秒）
+    """
+    body = _b64encode(json.dumps({**payload, "exp": int(time.time()) + expires_in}, ensure_ascii=False).encode())
+    return f"{body}.{sign_value(body)}"
+
+
+def verify_payload(token: str) -> Dict[str, Any]:
+    """
+    校验签名凭证并返回凭证内容
+
+    Raises:
+        ValueError: 签名无效或凭证已过期
+    """
+    body, _, signature = (token or "").partition(".")
+    if not body or not verify_value(body, signature):
+        raise ValueError("上传凭证无效")
+    payload = json.loads(_b64decode(body))
+    if payload.get("exp", 0) < time.time():
+        raise ValueError("上传凭证已过期")
+    return payload
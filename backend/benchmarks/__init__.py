@@ -0,0 +1 @@
+"""性能基准测试脚本，在 backend 目录下以 python -m benchmarks.<名称> 运行"""
@@ -0,0 +1,114 @@
+"""
+OCR后端基准测试
+
+用同一批简历分别调用本地Tesseract和阿里云OCR，比较吞吐量和单份简历的识别延迟。
+不可用的后端（未安装Tesseract、未配置阿里云密钥）跳过。
+
+用法：
+    python -m benchmarks.ocr_backends [文件或目录 ...] [--backends local aliyun] [--concurrency 4] [--repeat 1]
+
+未指定文件时使用 tests/fixtures/resumes 下的示例简历。
+"""
+import os
+import sys
+import time
+import base64
+import asyncio
+import argparse
+import statistics
+from typing import Dict, List, Optional
+
+from benchmarks.storage_compression import collect_files
+
+# 默认使用的示例简历目录
+DEFAULT_CORPUS = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "tests", "fixtures", "resumes"
+)
+
+# 需要OCR识别的文件类型
+OCR_TYPES = (".pdf", ".jpg", ".jpeg", ".png")
+
+
+def create_backend(name: str):
+    """创建OCR后端，不可用时返回None"""
+    try:
+        if name == "local":
+            from app.services.ocr_local import LocalOCRService
+            return LocalOCRService()
+        if name == "aliyun":
+            if not os.getenv("ALIYUN_ACCESS_KEY"):
+                raise RuntimeError("未配置ALIYUN_ACCESS_KEY")
+            from app.services.ocr import OCRService
+            return OCRService()
+        raise ValueError(f"不支持的OCR后端: {name}")
+    except Exception as e:
+        print(f"跳过 {name}: {str(e)}", file=sys.stderr)
+        return None
+
+
+async def run_benchmark(backend, contents: List[str], concurrency: int) -> Dict[str, Optional[float]]:
+    """以固定并发识别全部文件，返回吞吐量、延迟分位数和识别成功的文件数"""
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+    latencies = []
+
+    async def recognize(content: str) -> Optional[str]:
+        async with semaphore:
+            started = time.perf_counter()
+            try:
+                return await backend.extract_text_from_base64(content)
+            except Exception:
+                return None
+            finally:
+                latencies.append((time.perf_counter() - started) * 1000)
+
+    # 预热，本地后端首次调用需要启动工作进程
+    await recognize(contents[0])
+    latencies.clear()
+
+    started = time.perf_counter()
+    results = await asyncio.gather(*[recognize(content) for content in contents])
+    elapsed = time.perf_counter() - started
+    latencies.sort()
+    return {
+        "files_per_second": len(contents) / elapsed if elapsed else None,
+        "p50_ms": statistics.median(latencies),
+        "p95_ms": latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))],
+        "recognized": len([text for text in results if text])
+    }
+
+
+def main(argv=None):
+    """命令行入口"""
+    parser = argparse.ArgumentParser(description="比较本地与阿里云OCR后端的吞吐量和延迟")
+    parser.add_argument("paths", nargs="*", default=[DEFAULT_CORPUS], help="简历文件或目录")
+    parser.add_argument("--backends", nargs="+", default=["local", "aliyun"], help="参与测试的OCR后端")
+    parser.add_argument("--concurrency", type=int, default=os.cpu_count() or 4, help="同时识别的文件数")
+    parser.add_argument("--repeat", type=int, default=1, help="每个文件识别的次数")
+    args = parser.parse_args(argv)
+
+    files = [path for path in collect_files(args.paths) if path.lower().endswith(OCR_TYPES)]
+    if not files:
+        print("未找到可测试的文件", file=sys.stderr)
+        return 1
+    contents = []
+    for path in files:
+        with open(path, "rb") as f:
+            contents.append(base64.b64encode(f.read()).decode())
+    contents *= max(1, args.repeat)
+
+    print(f"文件数: {len(contents)}, 并发: {args.concurrency}")
+    print(f"{'后端':<8}{'文件/秒':>10}{'p50 ms':>12}{'p95 ms':>12}{'成功':>8}")
+    for name in args.backends:
+        backend = create_backend(name)
+        if backend is None:
+            continue
+        result = asyncio.run(run_benchmark(backend, contents, args.concurrency))
+        print(
+            f"{name:<8}{result['files_per_second'] or 0:>10.2f}{result['p50_ms']:>12.1f}"
+            f"{result['p95_ms']:>12.1f}{result['recognized']:>8}"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,107 @@
+"""
+存储压缩基准测试
+
+分别以不压缩和zstd压缩写入同一批简历文件，比较占用的存储空间和完整读取文件的延迟。
+
+用法：
+    python -m benchmarks.storage_compression [文件或目录 ...] [--repeat 20]
+
+未指定文件时使用 tests/fixtures 下的示例简历。
+"""
+import os
+import sys
+import time
+import argparse
+import tempfile
+import statistics
+from typing import Dict, List
+
+from app.services.storage import LocalStorageService
+from app.services.storage_codec import CODEC_ZSTD
+
+# 默认使用的示例简历目录
+DEFAULT_CORPUS = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "tests", "fixtures")
+
+# 支持的示例文件类型
+CORPUS_TYPES = (".pdf", ".doc", ".docx", ".txt", ".jpg", ".jpeg", ".png")
+
+
+def collect_files(paths: List[str]) -> List[str]:
+    """收集待测试的文件，目录按类型递归查找"""
+    files = []
+    for path in paths:
+        if os.path.isdir(path):
+            for root, _, names in os.walk(path):
+                files.extend(os.path.join(root, name) for name in sorted(names) if name.lower().endswith(CORPUS_TYPES))
+        elif os.path.isfile(path):
+            files.append(path)
+    return files
+
+
+def stored_bytes(base_path: str) -> int:
+    """统计存储目录中文件内容占用的字节数，不含引用计数文件"""
+    return sum(
+        os.path.getsize(os.path.join(root, name))
+        for root, _, names in os.walk(base_path)
+        for name in names
+        if not name.endswith(".refs")
+    )
+
+
+def run_benchmark(files: List[str], compression: str, repeat: int) -> Dict[str, float]:
+    """写入全部文件后重复完整读取，返回存储字节数和读取延迟（毫秒）"""
+    with tempfile.TemporaryDirectory(prefix="storage-bench-") as base_path:
+        storage_service = LocalStorageService(base_path)
+        storage_service.compression = compression
+
+        file_urls = []
+        started = time.perf_counter()
+        for path in files:
+            with open(path, "rb") as f:
+                file_urls.append(storage_service.upload_stream(f, os.path.basename(path))["file_url"])
+        write_seconds = time.perf_counter() - started
+
+        latencies = []
+        for _ in range(repeat):
+            for file_url in file_urls:
+                started = time.perf_counter()
+                with storage_service.open_file(file_url) as f:
+                    while f.read(256 * 1024):
+                        pass
+                latencies.append((time.perf_counter() - started) * 1000)
+
+        latencies.sort()
+        return {
+            "stored_bytes": stored_bytes(base_path),
+            "write_ms": write_seconds * 1000,
+            "read_p50_ms": statistics.median(latencies),
+            "read_p95_ms": latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))]
+        }
+
+
+def main(argv=None):
+    """命令行入口"""
+    parser = argparse.ArgumentParser(description="比较压缩与不压缩存储的空间占用和读取延迟")
+    parser.add_argument("paths", nargs="*", default=[DEFAULT_CORPUS], help="简历文件或目录")
+    parser.add_argument("--repeat", type=int, default=20, help="每个文件重复读取的次数")
+    args = parser.parse_args(argv)
+
+    files = collect_files(args.paths)
+    if not files:
+        print("未找到可测试的文件", file=sys.stderr)
+        return 1
+    original_bytes = sum(os.path.getsize(path) for path in files)
+    print(f"文件数: {len(files)}, 原始大小: {original_bytes} bytes, 重复读取: {args.repeat}次")
+    print(f"{'模式':<8}{'存储字节':>12}{'压缩率':>10}{'写入ms':>10}{'读取p50 ms':>14}{'读取p95 ms':>14}")
+    for compression in ("none", CODEC_ZSTD):
+        result = run_benchmark(files, compression, args.repeat)
+        ratio = result["stored_bytes"] / original_bytes if original_bytes else 0
+        print(
+            f"{compression:<8}{result['stored_bytes']:>12}{ratio:>10.2%}{result['write_ms']:>10.1f}"
+            f"{result['read_p50_ms']:>14.3f}{result['read_p95_ms']:>14.3f}"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -2,6 +2,7 @@ import os
 import pytest
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
 from fastapi.testclient import TestClient
 from app.database import Base, get_db
 from app.main import app
@@ -16,8 +17,9 @@ config = get_config()
 
 # 创建测试数据库引擎
 SQLALCHEMY_DATABASE_URL = "sqlite:///:memory:"
+# 使用StaticPool让TestClient的工作线程与测试共享同一个内存数据库
 engine = create_engine(
-    SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread": False}
+    SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread": False}, poolclass=StaticPool
 )
 TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
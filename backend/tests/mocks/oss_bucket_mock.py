@@ -0,0 +1,83 @@
+"""内存中的OSS存储桶，实现 AliyunOSSService 使用的 oss2.Bucket 接口子集"""
+import io
+import hashlib
+import threading
+import uuid
+from types import SimpleNamespace
+
+import oss2
+
+
+class MockOSSBucket:
+    def __init__(self):
+        self.objects = {}
+        self.headers = {}
+        self.upload_headers = {}
+        self.uploads = {}
+        self.calls = []
+        self.fail_parts = set()
+        self._lock = threading.Lock()
+
+    def _record(self, name, *args):
+        with self._lock:
+            self.calls.append((name,) + args)
+
+    def put_object(self, key, data, headers=None):
+        self._record("put_object", key)
+        self.objects[key] = bytes(data)
+        self.headers[key] = dict(headers or {})
+        return SimpleNamespace(status=200)
+
+    def init_multipart_upload(self, key, headers=None):
+        upload_id = uuid.uuid4().hex
+        self._record("init_multipart_upload", key)
+        self.uploads[upload_id] = {}
+        self.upload_headers[upload_id] = dict(headers or {})
+        return SimpleNamespace(upload_id=upload_id)
+
+    def upload_part(self, key, upload_id, part_number, data):
+        self._record("upload_part", key, part_number)
+        if upload_id not in self.uploads:
+            raise oss2.exceptions.NoSuchUpload(404, {}, b"", {})
+        if part_number in self.fail_parts:
+            raise Exception("网络错误")
+        etag = hashlib.md5(data).hexdigest().upper()
+        with self._lock:
+            self.uploads[upload_id][part_number] = (etag, bytes(data))
+        return SimpleNamespace(etag=etag)
+
+    def complete_multipart_upload(self, key, upload_id, parts):
+        self._record("complete_multipart_upload", key)
+        uploaded = self.uploads.pop(upload_id)
+        content = b""
+        for part in parts:
+            etag, data = uploaded[part.part_number]
+            assert etag == part.etag
+            content += data
+        self.objects[key] = content
+        self.headers[key] = self.upload_headers.pop(upload_id)
+        return SimpleNamespace(status=200)
+
+    def abort_multipart_upload(self, key, upload_id):
+        self._record("abort_multipart_upload", key)
+        self.uploads.pop(upload_id, None)
+        self.upload_headers.pop(upload_id, None)
+
+    def head_object(self, key):
+        self._record("head_object", key)
+        if key not in self.objects:
+            raise oss2.exceptions.NoSuchKey(404, {}, b"", {})
+        return SimpleNamespace(content_length=len(self.objects[key]), headers=self.headers.get(key, {}))
+
+    def get_object(self, key, byte_range=None):
+        self._record("get_object", key, byte_range)
+        content = self.objects[key]
+        if byte_range is not None:
+            start, end = byte_range
+            content = content[start:end + 1]
+        return io.BytesIO(content)
+
+    def delete_object(self, key):
+        self._record("delete_object", key)
+        self.objects.pop(key, None)
+        self.headers.pop(key, None)
@@ -0,0 +1,110 @@
+"""批量导入服务单元测试"""
+import io
+import json
+import pytest
+from sqlalchemy.orm import Session
+from app.models.resume import Resume
+from app.models.tag import Tag
+from app.models.job_requirement import JobRequirement
+from app.models.onboarding import OnboardingTask
+from app.services import bulk_import
+from app.services.bulk_import import BulkImporter, import_file, iter_json_array, iter_records
+
+class TestBulkImport:
+    """批量导入测试类"""
+
+    def _resume(self, index: int, skills):
+        return {
+            "candidate_name": f"候选人{index}",
+            "file_url": f"url{index}",
+            "file_type": "pdf",
+            "phone": "13800138000",
+            "skills": skills
+        }
+
+    def test_iter_json_array_streams_wrapped_array(self, monkeypatch):
+        """测试跨读取块流式解析包装格式的JSON数组"""
+        monkeypatch.setattr(bulk_import, "READ_CHUNK_SIZE", 16)
+        records = [{"id": i, "name": f"记录{i}", "nested": {"values": [i, i + 1]}} for i in range(20)]
+        stream = io.StringIO(json.dumps({"resumes": records}, ensure_ascii=False, indent=2))
+
+        assert list(iter_json_array(stream)) == records
+
+    def test_iter_records_ndjson(self):
+        """测试按行解析NDJSON，忽略空行"""
+        stream = io.StringIO('{"id": 1}\n\n{"id": 2}\n')
+        assert list(iter_records(stream, ndjson=True)) == [{"id": 1}, {"id": 2}]
+
+    def test_iter_json_array_incomplete(self):
+        """测试JSON数据不完整时报错"""
+        with pytest.raises(ValueError):
+            list(iter_json_array(io.StringIO('[{"id": 1}, {"id": ')))
+
+    def test_import_resumes_with_tags(self, db: Session):
+        """测试分批导入简历，技能批量写入标签关联"""
+        db.add(Tag(name="Python"))
+        db.commit()
+        records = [self._resume(i, ["Python", "Go" if i % 2 else "Java"]) for i in range(5)]
+        records.append({
+            "candidate_name": "候选人5", "file_url": "url5", "file_type": "docx",
+            "parsed_content": {"name": "候选人5", "skills": ["Rust", "Python"]}
+        })
+
+        result = BulkImporter(db.get_bind(), "resumes", batch_size=2).run(iter(records))
+
+        assert result["rows"] == 6
+        assert result["tag_links"] == 12
+        assert result["rows_per_second"] > 0
+        resumes = db.query(Resume).order_by(Resume.id).all()
+        assert [resume.candidate_name for resume in resumes] == [f"候选人{i}" for i in range(6)]
+        assert resumes[0].processing_status == "pending"
+        assert resumes[0].created_at is not None
+        assert {tag.name for tag in resumes[1].tags} == {"Python", "Go"}
+        assert {tag.name for tag in resumes[5].tags} == {"Rust", "Python"}
+        assert json.loads(resumes[5].parsed_content)["name"] == "候选人5"
+        assert db.query(Tag).count() == 4
+
+    def test_import_continues_after_existing_ids(self, db: Session):
+        """测试未指定ID的记录从现有最大ID之后分配"""
+        db.add(Resume(id=10, candidate_name="已有", file_url="url", file_type="pdf"))
+        db.commit()
+
+        BulkImporter(db.get_bind(), "resumes").run(iter([self._resume(1, []), self._resume(2, [])]))
+
+        assert [resume.id for resume in db.query(Resume).order_by(Resume.id)] == [10, 11, 12]
+
+    def test_import_file_with_aliases(self, db: Session, tmp_path):
+        """测试从文件导入时转换旧系统字段名"""
+        jobs_path = tmp_path / "jobs.json"
+        jobs_path.write_text(json.dumps({"jobs": [{
+            "id": 3, "position_name": "后端工程师", "department": "技术部",
+            "job_description": "负责后端开发", "requirements": "熟悉Python", "status": "active"
+        }]}, ensure_ascii=False), encoding="utf-8")
+        tasks_path = tmp_path / "tasks.ndjson"
+        tasks_path.write_text(
+            '{"onboarding_id": 1, "title": "签署合同", "deadline": "2024-03-01T00:00:00"}\n',
+            encoding="utf-8"
+        )
+
+        assert import_file(db.get_bind(), "jobs", str(jobs_path))["rows"] == 1
+        assert import_file(db.get_bind(), "onboarding_tasks", str(tasks_path))["rows"] == 1
+
+        job = db.query(JobRequirement).one()
+        assert job.id == 3
+        assert job.responsibilities == "负责后端开发"
+        task = db.query(OnboardingTask).one()
+        assert task.name == "签署合同"
+        assert task.deadline.year == 2024
+
+    def test_failed_batch_rolls_back(self, db: Session):
+        """测试某一批写入失败时只回滚该批"""
+        records = [self._resume(0, ["Python"]), self._resume(1, []), {"candidate_name": "缺少文件"}]
+        with pytest.raises(Exception):
+            BulkImporter(db.get_bind(), "resumes", batch_size=2).run(iter(records))
+
+        assert db.query(Resume).count() == 2
+
+    def test_unknown_entity(self, db: Session):
+        """测试不支持的数据类型"""
+        with pytest.raises(ValueError):
+            BulkImporter(db.get_bind(), "users")
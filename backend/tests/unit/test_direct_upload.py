@@ -0,0 +1,194 @@
+"""简历直传上传单元测试"""
+import os
+import uuid
+import pytest
+from unittest.mock import MagicMock
+from sqlalchemy.orm import Session, sessionmaker
+from app.models.resume import Resume
+from app.services.storage import AliyunOSSService, LocalStorageService
+from app.utils import signing
+from app.utils.signing import sign_payload, verify_payload
+from tests.mocks.oss_bucket_mock import MockOSSBucket
+
+class TestDirectUpload:
+    """直传上传测试类"""
+
+    @pytest.fixture
+    def storage_service(self, tmp_path, monkeypatch, db: Session):
+        """使用临时目录的本地存储，模拟解析流水线"""
+        storage_service = LocalStorageService(str(tmp_path))
+        monkeypatch.setattr("app.routers.resumes.get_storage_service", lambda: storage_service)
+        monkeypatch.setattr(
+            "app.routers.resumes.SessionLocal", sessionmaker(autocommit=False, autoflush=False, bind=db.get_bind())
+        )
+        self.processed = []
+
+        def fake_process_resume(resume_id, *args, **kwargs):
+            self.processed.append(resume_id)
+            return True
+
+        monkeypatch.setattr("app.routers.resumes.process_resume", fake_process_resume)
+        return storage_service
+
+    def _upload(self, client, content: bytes, candidate_name: str = "张三"):
+        response = client.post(
+            "/api/v1/resumes/direct-uploads",
+            json={"filename": "resume.pdf", "candidate_name": candidate_name}
+        )
+        assert response.status_code == 201
+        data = response.json()
+        assert data["upload"]["method"] == "PUT"
+        assert data["upload"]["headers"]["Content-Type"] == "application/pdf"
+
+        response = client.put(data["upload"]["url"], content=content, headers=data["upload"]["headers"])
+        assert response.status_code == 200
+        assert response.json()["file_size"] == len(content)
+        return data["upload_token"]
+
+    def test_direct_upload_flow(self, client, db: Session, storage_service):
+        """测试申请上传、直传文件、完成上传后开始解析"""
+        upload_token = self._upload(client, b"resume content")
+
+        response = client.post("/api/v1/resumes/direct-uploads/complete", json={"upload_token": upload_token})
+
+        assert response.status_code == 202
+        data = response.json()
+        resume = db.query(Resume).filter(Resume.id == data["resume_id"]).one()
+        assert resume.candidate_name == "张三"
+        assert resume.file_type == "pdf"
+        assert resume.file_size == len(b"resume content")
+        assert resume.content_hash is not None
+        assert self.processed == [resume.id]
+        with storage_service.open_file(resume.file_url) as f:
+            assert f.read() == b"resume content"
+
+        # 暂存文件已移动，重复提交凭证失败
+        response = client.post("/api/v1/resumes/direct-uploads/complete", json={"upload_token": upload_token})
+        assert response.status_code == 400
+
+    def test_direct_upload_duplicate_content(self, client, db: Session, storage_service):
+        """测试直传内容与已有简历相同时关联原始简历，不重复解析"""
+        first = client.post(
+            "/api/v1/resumes/direct-uploads/complete", json={"upload_token": self._upload(client, b"same")}
+        ).json()
+        second = client.post(
+            "/api/v1/resumes/direct-uploads/complete", json={"upload_token": self._upload(client, b"same", "李四")}
+        ).json()
+
+        duplicate = db.query(Resume).filter(Resume.id == second["resume_id"]).one()
+        assert duplicate.duplicate_of_id == first["resume_id"]
+        assert duplicate.content_hash is None
+        assert self.processed == [first["resume_id"]]
+
+        # 重复上传已释放引用，原始简历删除文件后文件不再存在
+        file_path = storage_service.get_file_path(duplicate.file_url)
+        storage_service.delete_file(duplicate.file_url)
+        assert not os.path.exists(file_path)
+
+    def test_direct_upload_rejects_invalid_requests(self, client, storage_service):
+        """测试签名无效、凭证过期、文件未上传和不支持的文件类型"""
+        response = client.post(
+            "/api/v1/resumes/direct-uploads", json={"filename": "resume.exe", "candidate_name": "张三"}
+        )
+        assert response.status_code == 400
+
+        data = client.post(
+            "/api/v1/resumes/direct-uploads", json={"filename": "resume.pdf", "candidate_name": "张三"}
+        ).json()
+        response = client.put(data["upload"]["url"].replace("signature=", "signature=0"), content=b"data")
+        assert response.status_code == 403
+
+        response = client.post("/api/v1/resumes/direct-uploads/complete", json={"upload_token": data["upload_token"]})
+        assert response.status_code == 400
+
+        response = client.post(
+            "/api/v1/resumes/direct-uploads/complete", json={"upload_token": data["upload_token"] + "0"}
+        )
+        assert response.status_code == 400
+
+        expired = sign_payload({"object_key": "0" * 32 + ".pdf", "candidate_name": "张三", "file_type": "pdf"}, -1)
+        response = client.post("/api/v1/resumes/direct-uploads/complete", json={"upload_token": expired})
+        assert response.status_code == 400
+        assert "过期" in response.json()["message"]
+
+    def test_signing_secret_required(self, monkeypatch):
+        """测试非测试环境必须配置签名密钥，配置后各进程签发的凭证可以互相校验"""
+        monkeypatch.delenv("STORAGE_SIGNING_SECRET", raising=False)
+        monkeypatch.setenv("TESTING", "False")
+        with pytest.raises(RuntimeError):
+            sign_payload({"object_key": "a.pdf"}, 60)
+
+        monkeypatch.setenv("STORAGE_SIGNING_SECRET", "shared-secret")
+        token = sign_payload({"object_key": "a.pdf"}, 60)
+        monkeypatch.setattr(signing, "_fallback_secret", "other-process")
+        assert verify_payload(token)["object_key"] == "a.pdf"
+
+    def test_oss_presigned_upload(self, monkeypatch):
+        """测试OSS生成预签名PUT URL并在完成时确认对象存在"""
+        monkeypatch.setenv("ENV", "test")
+        storage_service = AliyunOSSService()
+        storage_service.mock = False
+        storage_service.bucket = MagicMock()
+        storage_service.bucket.sign_url.return_value = "https://bucket.example.com/key?Signature=abc"
+        storage_service.bucket.head_object.return_value.content_length = 128
+
+        upload = storage_service.create_upload_url("key.pdf", "application/pdf", 600)
+        stored = storage_service.complete_upload("key.pdf")
+
+        assert upload["url"] == "https://bucket.example.com/key?Signature=abc"
+        storage_service.bucket.sign_url.assert_called_once_with(
+            "PUT", "key.pdf", 600, headers={"Content-Type": "application/pdf"}
+        )
+        assert stored["file_size"] == 128
+        assert stored["content_hash"] is None
+        assert stored["file_url"].endswith("/key.pdf")
+
+    @pytest.fixture
+    def oss_storage(self, storage_service, monkeypatch):
+        """使用模拟OSS存储桶的存储服务"""
+        monkeypatch.setenv("ENV", "test")
+        oss_storage = AliyunOSSService()
+        oss_storage.mock = False
+        oss_storage.bucket = MockOSSBucket()
+        monkeypatch.setattr("app.routers.resumes.get_storage_service", lambda: oss_storage)
+        return oss_storage
+
+    def _oss_token(self, oss_storage, content: bytes, candidate_name: str = "张三") -> str:
+        """模拟客户端通过预签名URL上传对象，返回上传凭证"""
+        object_key = f"{uuid.uuid4().hex}.pdf"
+        oss_storage.bucket.objects[object_key] = content
+        return sign_payload({"object_key": object_key, "candidate_name": candidate_name, "file_type": "pdf"}, 600)
+
+    def test_oss_complete_single_use(self, client, db: Session, oss_storage):
+        """测试OSS重复提交凭证被拒绝，去重时不删除原始简历引用的对象"""
+        first_token = self._oss_token(oss_storage, b"same")
+        first = client.post("/api/v1/resumes/direct-uploads/complete", json={"upload_token": first_token})
+        assert first.status_code == 202
+        second = client.post(
+            "/api/v1/resumes/direct-uploads/complete", json={"upload_token": self._oss_token(oss_storage, b"same")}
+        )
+        assert second.status_code == 202
+
+        # 内容相同的第二个对象已删除，原始对象保留
+        original = db.query(Resume).filter(Resume.id == first.json()["resume_id"]).one()
+        duplicate = db.query(Resume).filter(Resume.id == second.json()["resume_id"]).one()
+        assert duplicate.duplicate_of_id == original.id
+        assert list(oss_storage.bucket.objects) == [oss_storage.get_object_key(original.file_url)]
+
+        replay = client.post("/api/v1/resumes/direct-uploads/complete", json={"upload_token": first_token})
+        assert replay.status_code == 409
+        assert db.query(Resume).count() == 2
+        assert list(oss_storage.bucket.objects) == [oss_storage.get_object_key(original.file_url)]
+
+    def test_oss_complete_rejects_oversized(self, client, db: Session, oss_storage, monkeypatch):
+        """测试直传对象超过大小上限时返回413并删除对象"""
+        monkeypatch.setattr("app.services.storage.MAX_FILE_SIZE", 4)
+
+        response = client.post(
+            "/api/v1/resumes/direct-uploads/complete",
+            json={"upload_token": self._oss_token(oss_storage, b"too large")}
+        )
+
+        assert response.status_code == 413
+        assert oss_storage.bucket.objects == {}
+        assert db.query(Resume).count() == 0
@@ -0,0 +1,75 @@
+"""事件循环阻塞单元测试"""
+import time
+import asyncio
+import httpx
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from app.database import Base, get_db
+from app.main import app
+from app.services.service_factory import get_gpt_service
+
+class SlowGPTService:
+    """每次调用都耗时较长的GPT服务"""
+
+    delay = 0.5
+
+    def __init__(self):
+        self.model = "slow"
+
+    def extract_job_tags(self, text):
+        time.sleep(self.delay)
+        return ["Python"]
+
+class TestEventLoopBlocking:
+    """慢速上游调用不阻塞其他请求"""
+
+    @pytest.fixture
+    def slow_gpt(self, client, monkeypatch, tmp_path):
+        """模拟慢速GPT服务，每个请求使用独立的数据库连接"""
+        app.dependency_overrides[get_gpt_service] = SlowGPTService
+        engine = create_engine(f"sqlite:///{tmp_path / 'test.db'}", connect_args={"check_same_thread": False})
+        Base.metadata.create_all(bind=engine)
+        session_factory = sessionmaker(bind=engine)
+
+        def override_get_db():
+            session = session_factory()
+            try:
+                yield session
+            finally:
+                session.close()
+
+        app.dependency_overrides[get_db] = override_get_db
+
+    def _job_data(self, index):
+        return {
+            "position_name": f"后端工程师{index}",
+            "department": "技术部",
+            "responsibilities": "开发后端服务",
+            "requirements": "熟悉Python"
+        }
+
+    @pytest.mark.asyncio
+    async def test_slow_upstream_does_not_serialize_requests(self, slow_gpt):
+        """测试多个慢速GPT请求并发执行，健康检查不被阻塞"""
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as async_client:
+            async def timed(coro):
+                start = time.monotonic()
+                response = await coro
+                return response, time.monotonic() - start
+
+            start = time.monotonic()
+            results = await asyncio.gather(
+                timed(async_client.post("/api/v1/jobs", json=self._job_data(1))),
+                timed(async_client.post("/api/v1/jobs", json=self._job_data(2))),
+                timed(async_client.post("/api/v1/jobs", json=self._job_data(3))),
+                timed(async_client.get("/health"))
+            )
+            elapsed = time.monotonic() - start
+
+        assert [response.status_code for response, _ in results] == [201, 201, 201, 200]
+        # 串行执行至少需要 3 * 0.5 秒
+        assert elapsed < 2 * SlowGPTService.delay
+        health_elapsed = results[-1][1]
+        assert health_elapsed < SlowGPTService.delay
@@ -0,0 +1,115 @@
+"""幂等请求中间件单元测试"""
+import json
+import threading
+import pytest
+from unittest.mock import MagicMock
+from sqlalchemy.orm import sessionmaker
+from starlette.requests import Request
+from app.middleware import idempotency as idempotency_middleware
+from app.models.resume import Resume
+from app.services import idempotency
+from app.services.idempotency import claim_request, complete_request
+
+class TestIdempotency:
+    """幂等请求测试类"""
+
+    @pytest.fixture
+    def mock_upload(self, db, monkeypatch):
+        """模拟存储服务和解析流水线，幂等记录写入测试数据库"""
+        monkeypatch.setattr(idempotency, "SessionLocal", sessionmaker(bind=db.get_bind()))
+        monkeypatch.setattr(idempotency_middleware, "IDEMPOTENCY_POLL_INTERVAL", 0.05)
+        monkeypatch.setattr("app.routers.resumes.PREFETCH_OCR", False)
+
+        mock_storage = MagicMock()
+        mock_storage.upload_stream.side_effect = lambda file_obj, name, content_hash=None: {"file_url": f"https://example.com/{name}"}
+        monkeypatch.setattr("app.routers.resumes.get_storage_service", lambda: mock_storage)
+
+        processed = []
+        monkeypatch.setattr("app.routers.resumes.process_resume", lambda resume_id, *args, **kwargs: processed.append(resume_id))
+        return {"storage": mock_storage, "processed": processed}
+
+    def _upload(self, client, key, content=b"%PDF-1.4"):
+        return client.post(
+            "/api/v1/resumes/upload",
+            files={"file": ("resume.pdf", content, "application/pdf")},
+            data={"candidate_name": "张三"},
+            headers={"Idempotency-Key": key}
+        )
+
+    def test_retry_returns_original_response(self, client, db, mock_upload):
+        """测试相同幂等键的重试返回首次响应，不重复创建简历"""
+        first = self._upload(client, "key-1")
+        second = self._upload(client, "key-1")
+
+        assert first.status_code == second.status_code == 202
+        assert second.json() == first.json()
+        assert second.headers["Idempotent-Replayed"] == "true"
+        assert db.query(Resume).count() == 1
+        assert mock_upload["storage"].upload_stream.call_count == 1
+        assert mock_upload["processed"] == [first.json()["resume_id"]]
+
+        third = self._upload(client, "key-2", b"%PDF-1.4 other")
+        assert third.json()["resume_id"] != first.json()["resume_id"]
+
+    def test_server_error_releases_key(self, client, db, mock_upload):
+        """测试服务端错误不保存响应，可使用相同的键重试"""
+        mock_upload["storage"].upload_stream.side_effect = [
+            Exception("存储服务不可用"), {"file_url": "https://example.com/resume.pdf"}
+        ]
+
+        assert self._upload(client, "key-1").status_code == 500
+        assert self._upload(client, "key-1").status_code == 202
+
+    def test_concurrent_duplicate_waits(self, client, db, mock_upload):
+        """测试首次请求处理中时，重复请求等待其完成后返回相同响应"""
+        path = "/api/v1/resumes/upload"
+        assert claim_request("key-1", "POST", path) is None
+        assert claim_request("key-1", "POST", path)["status"] == "processing"
+
+        body = json.dumps({"resume_id": 42}).encode()
+        timer = threading.Timer(0.2, complete_request, ("key-1", "POST", path, 202, body, "application/json"))
+        timer.start()
+        response = self._upload(client, "key-1")
+        timer.join()
+
+        assert response.status_code == 202
+        assert response.json() == {"resume_id": 42}
+        mock_upload["storage"].upload_stream.assert_not_called()
+
+    def test_wait_timeout(self, client, db, mock_upload, monkeypatch):
+        """测试等待超时返回409"""
+        monkeypatch.setattr(idempotency_middleware, "IDEMPOTENCY_WAIT_TIMEOUT", 0.1)
+        claim_request("key-1", "POST", "/api/v1/resumes/upload")
+
+        assert self._upload(client, "key-1").status_code == 409
+
+    def test_key_reused_for_different_request(self, client, db, mock_upload):
+        """测试相同幂等键用于不同请求体时返回422，不返回首次响应"""
+        first = self._upload(client, "key-1")
+        other = self._upload(client, "key-1", b"%PDF-1.4 other")
+
+        assert first.status_code == 202
+        assert other.status_code == 422
+        assert "Idempotent-Replayed" not in other.headers
+        assert db.query(Resume).count() == 1
+        assert mock_upload["storage"].upload_stream.call_count == 1
+
+    def test_upload_body_not_buffered(self, client, db, mock_upload, monkeypatch):
+        """测试文件上传带幂等键时中间件不读取整个请求体"""
+        def body(request):
+            raise AssertionError("上传请求体不应被整体读取")
+
+        monkeypatch.setattr(Request, "body", body)
+        first = self._upload(client, "key-1")
+        second = self._upload(client, "key-1")
+
+        assert first.status_code == 202
+        assert second.json() == first.json()
+        assert mock_upload["storage"].upload_stream.call_count == 1
+
+    def test_key_reused_while_processing_different_request(self, client, db, mock_upload):
+        """测试首次请求处理中时，内容不同的重复请求直接返回422"""
+        claim_request("key-1", "POST", "/api/v1/resumes/upload", "0" * 64)
+
+        assert self._upload(client, "key-1").status_code == 422
+        mock_upload["storage"].upload_stream.assert_not_called()
@@ -0,0 +1,185 @@
+"""GPT回复缓存单元测试"""
+import json
+import pytest
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+from app.routers.jobs import calculate_match_score
+from app.services.gpt import GPTService
+from app.services.llm_cache import LLMResponseCache, make_cache_key
+
+class FakeClock:
+    """可手动推进的时钟，每次读取后前进一毫秒，保证访问顺序可区分"""
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        self.now += 0.001
+        return self.now
+
+def completion(content):
+    """构造OpenAI对话补全的返回值"""
+    return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=content))])
+
+class TestLLMResponseCache:
+    """GPT回复缓存测试类"""
+
+    @pytest.fixture
+    def cache_path(self, tmp_path):
+        return str(tmp_path / "llm.sqlite3")
+
+    def test_memory_and_disk_hits(self, cache_path):
+        """测试内存命中，以及重启进程后从磁盘读取，按方法统计命中率"""
+        cache = LLMResponseCache(cache_path)
+        cache.set("tags:abc", ["Python", "微服务"], "extract_job_tags")
+
+        assert cache.get("tags:abc", "extract_job_tags") == ["Python", "微服务"]
+        assert cache.get("tags:missing", "extract_job_tags") is None
+
+        reopened = LLMResponseCache(cache_path)
+        assert reopened.get("tags:abc", "extract_job_tags") == ["Python", "微服务"]
+        assert reopened.get("tags:abc", "extract_job_tags") == ["Python", "微服务"]
+
+        stats = reopened.stats()
+        assert stats["disk_hits"] == 1
+        assert stats["memory_hits"] == 1
+        assert stats["hit_rate"] == 1.0
+        assert stats["methods"]["extract_job_tags"]["hit_rate"] == 1.0
+        assert stats["disk_entries"] == 1
+
+    def test_ttl(self, cache_path):
+        """测试超过有效期的条目视为未命中并删除"""
+        clock = FakeClock()
+        cache = LLMResponseCache(cache_path, ttl=60, clock=clock)
+        cache.set("name:abc", "张三")
+        assert cache.get("name:abc") == "张三"
+
+        clock.now += 61
+        assert cache.get("name:abc") is None
+        stats = cache.stats()
+        assert stats["expired"] == 1
+        assert stats["disk_entries"] == 0
+
+    def test_evict_least_recently_used(self, cache_path):
+        """测试超过容量上限时淘汰最久未访问的条目"""
+        cache = LLMResponseCache(cache_path, max_bytes=350, clock=FakeClock())
+        for key in ["a", "b", "c"]:
+            cache.set(key, key * 100)
+        cache.get("a")
+        cache.set("d", "d" * 100)
+
+        stats = cache.stats()
+        assert stats["evictions"] == 1
+        assert stats["disk_bytes"] == 306
+        assert cache.get("a") == "a" * 100
+        assert cache.get("b") is None
+
+    def test_hits_do_not_write_disk(self, cache_path):
+        """测试命中时不逐次写磁盘，统计前批量写入访问时间"""
+        cache = LLMResponseCache(cache_path, clock=FakeClock())
+        cache.set("name:abc", "张三", "extract_name")
+
+        changes = cache._conn.total_changes
+        for _ in range(10):
+            assert cache.get("name:abc", "extract_name") == "张三"
+        assert cache._conn.total_changes == changes
+
+        assert cache.stats()["methods"]["extract_name"]["hits"] == 10
+        assert cache._conn.total_changes == changes + 1
+
+    def test_cache_key(self):
+        """测试空白差异不影响缓存键，方法、模型、模板版本和温度不同时互不影响"""
+        key = make_cache_key("extract_job_tags", "gpt-4", "1", "Python 开发\n  熟悉FastAPI ", 0.5)
+        assert key == make_cache_key("extract_job_tags", "gpt-4", "1", " Python 开发 熟悉FastAPI", 0.5)
+        assert len({
+            key,
+            make_cache_key("generate_resume_tags", "gpt-4", "1", "Python 开发 熟悉FastAPI", 0.5),
+            make_cache_key("extract_job_tags", "gpt-4o", "1", "Python 开发 熟悉FastAPI", 0.5),
+            make_cache_key("extract_job_tags", "gpt-4", "2", "Python 开发 熟悉FastAPI", 0.5),
+            make_cache_key("extract_job_tags", "gpt-4", "1", "Python 开发 熟悉FastAPI", 0.7)
+        }) == 5
+
+class TestCachedGPTService:
+    """GPT服务缓存测试类"""
+
+    @pytest.fixture
+    def gpt_service(self, tmp_path, monkeypatch):
+        """使用模拟OpenAI客户端和独立缓存的GPT服务"""
+        monkeypatch.setenv("ENV", "production")
+        monkeypatch.setenv("MOCK_SERVICES", "False")
+        client = MagicMock()
+        client.chat.completions.create.return_value = completion(json.dumps({"tags": ["Python", "FastAPI"]}))
+        return GPTService(client=client, cache=LLMResponseCache(str(tmp_path / "llm.sqlite3")))
+
+    def test_repeated_input_hits_cache(self, gpt_service):
+        """测试相同输入只调用一次API，跳过缓存时重新调用"""
+        create = gpt_service.openai.chat.completions.create
+
+        assert gpt_service.extract_job_tags("Python后端开发") == ["Python", "FastAPI"]
+        assert gpt_service.extract_job_tags("  Python后端开发\n") == ["Python", "FastAPI"]
+        assert create.call_count == 1
+
+        gpt_service.extract_job_tags("Python后端开发", use_cache=False)
+        assert create.call_count == 2
+        # 其他方法的相同输入不共用缓存
+        gpt_service.generate_resume_tags("Python后端开发")
+        assert create.call_count == 3
+
+        methods = gpt_service.cache.stats()["methods"]
+        assert methods["extract_job_tags"] == {"hits": 1, "misses": 1, "bypassed": 1, "hit_rate": 0.5}
+
+    def test_failed_parse_not_cached(self, gpt_service):
+        """测试无法解析的回复不写入缓存，下次重新调用"""
+        create = gpt_service.openai.chat.completions.create
+        create.return_value = completion("not json")
+
+        assert gpt_service.extract_job_tags("Python后端开发") == ["Python", "微服务", "分布式系统", "8年经验"]
+        assert gpt_service.cache.stats()["disk_entries"] == 0
+
+        create.return_value = completion(json.dumps({"tags": ["Python"]}))
+        assert gpt_service.extract_job_tags("Python后端开发") == ["Python"]
+        assert create.call_count == 2
+
+    def test_match_score_cached(self, gpt_service):
+        """测试重复匹配同一份简历和职位时从缓存读取"""
+        create = gpt_service.openai.chat.completions.create
+        create.return_value = completion(json.dumps({"score": 88, "explanation": "技术栈匹配"}))
+        job, resume = SimpleNamespace(id=1), SimpleNamespace(id=2)
+
+        for _ in range(2):
+            result = calculate_match_score(gpt_service, "职位: Python\n简历: 5年Python", job, resume)
+            assert result == {"score": 88, "explanation": "技术栈匹配"}
+        assert create.call_count == 1
+
+    def test_parsed_content_input(self, gpt_service):
+        """测试流水线传入解析后的简历字典时正常调用并缓存，键顺序不影响命中"""
+        create = gpt_service.openai.chat.completions.create
+        create.return_value = completion("熟悉分布式系统的Python工程师")
+
+        parsed = {"name": "李四", "skills": ["Python", "Kafka"], "experience": "5年"}
+        assert gpt_service.generate_talent_portrait(parsed) == "熟悉分布式系统的Python工程师"
+        reordered = {"experience": "5年", "skills": ["Python", "Kafka"], "name": "李四"}
+        assert gpt_service.generate_talent_portrait(reordered) == "熟悉分布式系统的Python工程师"
+        assert create.call_count == 1
+
+    def test_parse_resume(self, gpt_service):
+        """测试真实GPT服务解析简历并缓存，无法解析的回复抛出异常且不写入缓存"""
+        create = gpt_service.openai.chat.completions.create
+        create.return_value = completion(json.dumps({"name": "李四", "skills": ["Python", " Kafka "]}))
+
+        for _ in range(2):
+            assert gpt_service.parse_resume("姓名：李四\n技能：Python, Kafka") == {
+                "name": "李四", "skills": ["Python", "Kafka"]
+            }
+        assert create.call_count == 1
+        assert gpt_service.cache.stats()["methods"]["parse_resume"]["hits"] == 1
+
+        create.return_value = completion("[]")
+        with pytest.raises(ValueError):
+            gpt_service.parse_resume("另一份简历")
+        assert gpt_service.cache.stats()["disk_entries"] == 1
+
+    def test_mock_mode_without_cache(self, monkeypatch):
+        """测试模拟模式下不使用缓存"""
+        monkeypatch.setenv("ENV", "test")
+        assert GPTService().cache is None
@@ -0,0 +1,86 @@
+"""共享OpenAI客户端单元测试"""
+import httpx
+import pytest
+from types import SimpleNamespace
+from app.services import llm_client
+from app.services.gpt import GPTService
+from app.services.llm_client import close_openai_client, create_http_client, get_openai_client
+
+class FakeOpenAI:
+    """模拟openai.OpenAI，记录创建参数"""
+
+    created = 0
+
+    def __init__(self, **kwargs):
+        FakeOpenAI.created += 1
+        self.kwargs = kwargs
+        self.http_client = kwargs["http_client"]
+        self.closed = False
+
+    def close(self):
+        self.closed = True
+        self.http_client.close()
+
+class TestLLMClient:
+    """共享OpenAI客户端测试类"""
+
+    @pytest.fixture
+    def fake_openai(self, monkeypatch):
+        """使用模拟的openai模块，测试前后清理共享客户端"""
+        monkeypatch.setattr(llm_client, "openai", SimpleNamespace(OpenAI=FakeOpenAI))
+        monkeypatch.setenv("OPENAI_API_KEY", "sk-test")
+        FakeOpenAI.created = 0
+        close_openai_client()
+        yield
+        close_openai_client()
+
+    def test_http_client_pool(self, monkeypatch):
+        """测试连接池和超时配置，未安装h2时使用HTTP/1.1"""
+        monkeypatch.setattr(llm_client, "h2", None)
+        with create_http_client(http2=True) as http_client:
+            assert isinstance(http_client, httpx.Client)
+            assert http_client.timeout.connect == llm_client.LLM_CONNECT_TIMEOUT
+            assert http_client.timeout.read == llm_client.LLM_READ_TIMEOUT
+            assert http_client.timeout.pool == llm_client.LLM_POOL_TIMEOUT
+
+    def test_shared_client(self, fake_openai):
+        """测试进程内只创建一个客户端，关闭后重新创建"""
+        client = get_openai_client()
+        assert get_openai_client() is client
+        assert FakeOpenAI.created == 1
+        assert client.kwargs["api_key"] == "sk-test"
+        assert client.kwargs["max_retries"] == llm_client.LLM_MAX_RETRIES
+
+        close_openai_client()
+        assert client.closed
+        assert get_openai_client() is not client
+        assert FakeOpenAI.created == 2
+
+    def test_missing_api_key(self, fake_openai, monkeypatch):
+        """测试未设置OPENAI_API_KEY时不创建客户端"""
+        monkeypatch.delenv("OPENAI_API_KEY")
+        assert get_openai_client() is None
+        assert FakeOpenAI.created == 0
+
+    def test_gpt_services_share_client(self, fake_openai, monkeypatch):
+        """测试GPT服务复用共享客户端，也可以注入指定的客户端"""
+        monkeypatch.setenv("ENV", "production")
+        monkeypatch.setenv("MOCK_SERVICES", "False")
+
+        first, second = GPTService(), GPTService()
+        assert not first.mock
+        assert first.openai is second.openai is get_openai_client()
+        assert FakeOpenAI.created == 1
+
+        injected = SimpleNamespace()
+        assert GPTService(client=injected).openai is injected
+
+    def test_gpt_service_mock_without_client(self, monkeypatch):
+        """测试无法创建客户端时GPT服务使用模拟模式"""
+        monkeypatch.setenv("ENV", "production")
+        monkeypatch.setenv("MOCK_SERVICES", "False")
+        monkeypatch.setattr("app.services.gpt.get_openai_client", lambda: None)
+
+        gpt_service = GPTService()
+        assert gpt_service.mock
+        assert gpt_service.extract_job_tags("Python开发") == ["Python", "微服务", "分布式系统", "8年经验"]
@@ -0,0 +1,75 @@
+"""事件循环阻塞检测单元测试"""
+import time
+import asyncio
+import httpx
+import pytest
+from fastapi import FastAPI
+from app.utils.loop_monitor import LoopBlockMonitor, LoopMonitorMiddleware, UNKNOWN_ENDPOINT
+
+def blocking_work(seconds):
+    time.sleep(seconds)
+
+class TestLoopMonitor:
+    """事件循环阻塞检测测试类"""
+
+    @pytest.mark.asyncio
+    async def test_detect_blocking_call(self):
+        """测试检测到阻塞并记录调用栈"""
+        monitor = LoopBlockMonitor(threshold_ms=50)
+        await monitor.start()
+        try:
+            await asyncio.sleep(0.05)
+            blocking_work(0.2)
+            await asyncio.sleep(0.05)
+        finally:
+            await monitor.stop()
+
+        report = monitor.snapshot()
+        assert report["counts"] == {UNKNOWN_ENDPOINT: 1}
+        incident = report["incidents"][0]
+        assert incident["duration_ms"] >= 150
+        assert "blocking_work" in incident["stack"]
+
+    @pytest.mark.asyncio
+    async def test_short_pauses_are_ignored(self):
+        """测试低于阈值的阻塞不记录"""
+        monitor = LoopBlockMonitor(threshold_ms=200)
+        await monitor.start()
+        try:
+            for _ in range(3):
+                blocking_work(0.02)
+                await asyncio.sleep(0.02)
+        finally:
+            await monitor.stop()
+
+        assert monitor.snapshot()["counts"] == {}
+
+    @pytest.mark.asyncio
+    async def test_count_by_endpoint(self):
+        """测试按接口路径模板统计阻塞次数"""
+        monitor = LoopBlockMonitor(threshold_ms=50)
+        app = FastAPI()
+
+        @app.get("/items/{item_id}")
+        async def blocking_endpoint(item_id: int):
+            blocking_work(0.15)
+            return {"item_id": item_id}
+
+        @app.get("/ok")
+        async def fast_endpoint():
+            return {}
+
+        app.add_middleware(LoopMonitorMiddleware, monitor=monitor)
+        await monitor.start()
+        try:
+            transport = httpx.ASGITransport(app=app)
+            async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+                for item_id in (1, 2):
+                    assert (await client.get(f"/items/{item_id}")).status_code == 200
+                    await asyncio.sleep(0.05)
+                assert (await client.get("/ok")).status_code == 200
+        finally:
+            await monitor.stop()
+
+        assert monitor.snapshot()["counts"] == {"GET /items/{item_id}": 2}
+        assert "blocking_endpoint" in monitor.snapshot()["incidents"][0]["stack"]
@@ -0,0 +1,75 @@
+"""耗时统计单元测试"""
+import pytest
+from unittest.mock import MagicMock
+from app.utils.metrics import StageHistograms, StageTimer, format_server_timing, ingestion_histograms, size_bucket
+
+class TestMetrics:
+    """耗时统计测试类"""
+
+    def test_size_bucket(self):
+        """测试文件大小区间"""
+        assert size_bucket(10 * 1024) == "<100KB"
+        assert size_bucket(500 * 1024) == "100KB-1MB"
+        assert size_bucket(2 * 1024 * 1024) == "1MB-5MB"
+        assert size_bucket(10 * 1024 * 1024) == ">5MB"
+        assert size_bucket(None) == "unknown"
+
+    def test_histogram_buckets(self):
+        """测试直方图按阶段、文件类型和大小区间分别统计"""
+        histograms = StageHistograms(buckets=[10, 100])
+        histograms.observe("ocr", "pdf", "<100KB", 5)
+        histograms.observe("ocr", "pdf", "<100KB", 50)
+        histograms.observe("ocr", "pdf", "<100KB", 500)
+        histograms.observe("ocr", "docx", "<100KB", 5)
+
+        series = histograms.snapshot()
+        assert len(series) == 2
+        pdf = next(item for item in series if item["file_type"] == "pdf")
+        assert pdf["count"] == 3
+        assert pdf["sum_ms"] == 555
+        assert pdf["buckets_ms"] == {"10": 1, "100": 2, "+Inf": 3}
+
+    def test_stage_timer(self):
+        """测试同名阶段累加并生成Server-Timing响应头"""
+        timer = StageTimer()
+        with timer.stage("storage"):
+            pass
+        with timer.stage("db_commit"):
+            pass
+        with timer.stage("db_commit"):
+            pass
+
+        assert list(timer.timings) == ["storage", "db_commit"]
+        assert timer.server_timing().startswith("storage;dur=")
+        assert format_server_timing({"ocr": 12.5}) == "ocr;dur=12.5"
+
+        histograms = StageHistograms()
+        timer.record("pdf", 1024, histograms)
+        assert {item["stage"] for item in histograms.snapshot()} == {"storage", "db_commit"}
+
+    def test_upload_returns_timings(self, client, monkeypatch):
+        """测试上传接口返回各阶段耗时和Server-Timing响应头"""
+        ingestion_histograms.reset()
+        mock_storage = MagicMock()
+        mock_storage.upload_stream.side_effect = lambda file_obj, name, content_hash=None: {
+            "file_url": f"https://example.com/{name}", "file_size": len(file_obj.read())
+        }
+        monkeypatch.setattr("app.routers.resumes.get_storage_service", lambda: mock_storage)
+        monkeypatch.setattr("app.routers.resumes.process_resume", lambda resume_id, **kwargs: True)
+        monkeypatch.setattr("app.routers.resumes.PREFETCH_OCR", False)
+
+        response = client.post(
+            "/api/v1/resumes/upload",
+            files={"file": ("resume.pdf", b"%PDF-1.4", "application/pdf")},
+            data={"candidate_name": "张三"}
+        )
+
+        assert response.status_code == 202
+        assert set(response.json()["timings"]) == {"hash", "dedup_lookup", "storage", "db_commit"}
+        assert "storage;dur=" in response.headers["Server-Timing"]
+
+        metrics = client.get("/api/v1/metrics/ingestion").json()["histograms"]
+        assert {(item["stage"], item["file_type"], item["size_bucket"]) for item in metrics} == {
+            ("hash", "pdf", "<100KB"), ("dedup_lookup", "pdf", "<100KB"),
+            ("storage", "pdf", "<100KB"), ("db_commit", "pdf", "<100KB")
+        }
@@ -0,0 +1,100 @@
+"""OCR结果缓存单元测试"""
+import base64
+import sqlite3
+import pytest
+from unittest.mock import MagicMock
+from app.services.ocr_cache import CachedOCRService, OCRResultCache, make_cache_key
+
+class TestOCRResultCache:
+    """OCR结果缓存测试类"""
+
+    @pytest.fixture
+    def cache_path(self, tmp_path):
+        return str(tmp_path / "ocr.sqlite3")
+
+    def test_memory_and_disk_hits(self, cache_path):
+        """测试内存命中，以及重启进程后从磁盘读取"""
+        cache = OCRResultCache(cache_path)
+        cache.set("mock:abc", "简历文本")
+
+        assert cache.get("mock:abc") == "简历文本"
+        assert cache.get("mock:missing") is None
+
+        reopened = OCRResultCache(cache_path)
+        assert reopened.get("mock:abc") == "简历文本"
+        assert reopened.get("mock:abc") == "简历文本"
+
+        stats = reopened.stats()
+        assert stats["disk_hits"] == 1
+        assert stats["memory_hits"] == 1
+        assert stats["hit_rate"] == 1.0
+        assert stats["disk_entries"] == 1
+
+    def test_evict_least_recently_used(self, cache_path):
+        """测试超过容量上限时淘汰最久未访问的条目"""
+        cache = OCRResultCache(cache_path, max_bytes=350)
+        for key in ["a", "b", "c"]:
+            cache.set(key, key * 100)
+        cache.get("a")
+        cache.set("d", "d" * 100)
+
+        stats = cache.stats()
+        assert stats["evictions"] == 1
+        assert stats["disk_bytes"] == 300
+        assert cache.get("a") == "a" * 100
+        assert cache.get("b") is None
+
+    def test_hits_batch_access_time_writes(self, cache_path):
+        """测试命中时不逐次写磁盘，访问时间攒够一批后批量写入"""
+        cache = OCRResultCache(cache_path)
+        cache.touch_batch_size = 3
+        for key in ["a", "b", "c", "a"]:
+            cache.set(key, key * 100)
+        assert cache._total_bytes == 300
+
+        changes = cache._conn.total_changes
+        cache.get("a")
+        cache.get("b")
+        cache.get("a")
+        assert cache._conn.total_changes == changes
+        cache.get("c")
+        assert cache._conn.total_changes == changes + 3
+        assert not cache._pending_touches
+
+    def test_legacy_cache_file(self, cache_path):
+        """测试沿用缺少 created_at 列的旧版缓存文件"""
+        conn = sqlite3.connect(cache_path)
+        conn.execute(
+            "CREATE TABLE ocr_cache (key TEXT PRIMARY KEY, content TEXT NOT NULL, size INTEGER NOT NULL, "
+            "accessed_at REAL NOT NULL)"
+        )
+        conn.execute("INSERT INTO ocr_cache VALUES ('mock:abc', '简历文本', 12, 0)")
+        conn.commit()
+        conn.close()
+
+        cache = OCRResultCache(cache_path)
+        assert cache.get("mock:abc") == "简历文本"
+        cache.set("mock:def", "新文本")
+        assert cache.stats()["disk_entries"] == 2
+
+    def test_engine_version_in_key(self):
+        """测试不同引擎版本的结果互不影响"""
+        assert make_cache_key("abc", "mock") != make_cache_key("abc", "aliyun-ocr-20191230")
+
+    def test_cached_service(self, cache_path):
+        """测试包装后的OCR服务按内容哈希复用结果"""
+        ocr_service = MagicMock()
+        ocr_service.engine_version = "mock"
+        ocr_service.extract_text_from_base64.return_value = "扫描页文本"
+        ocr_service.extract_text_from_file.return_value = "整份简历文本"
+        cached_service = CachedOCRService(ocr_service, OCRResultCache(cache_path))
+
+        content = base64.b64encode(b"page").decode()
+        assert cached_service.extract_text_from_base64(content) == "扫描页文本"
+        assert cached_service.extract_text_from_base64(content) == "扫描页文本"
+        assert ocr_service.extract_text_from_base64.call_count == 1
+
+        assert cached_service.extract_text_from_file("url", content_hash="c" * 64) == "整份简历文本"
+        assert cached_service.extract_text_from_file("url", content_hash="c" * 64) == "整份简历文本"
+        assert cached_service.extract_text_from_file("url") == "整份简历文本"
+        assert ocr_service.extract_text_from_file.call_count == 2
@@ -0,0 +1,112 @@
+"""异步OCR客户端单元测试"""
+import time
+import asyncio
+import threading
+import pytest
+from unittest.mock import MagicMock
+from concurrent.futures import ThreadPoolExecutor
+from app.services import ocr
+from app.services.ocr import OCRService, close_ocr_client, get_ocr_client
+from app.services.ocr_client import AsyncOCRClient
+from app.services.ocr_mock import Client
+
+class PeakTrackingClient(Client):
+    """记录同时进行的最大请求数的模拟SDK客户端"""
+
+    def __init__(self, latency: float):
+        super().__init__(latency=latency)
+        self.active = 0
+        self.peak = 0
+        self._lock = threading.Lock()
+
+    def do_action_with_exception(self, request) -> bytes:
+        with self._lock:
+            self.active += 1
+            self.peak = max(self.peak, self.active)
+        try:
+            return super().do_action_with_exception(request)
+        finally:
+            with self._lock:
+                self.active -= 1
+
+class TestOCRClient:
+    """异步OCR客户端测试类"""
+
+    @pytest.mark.asyncio
+    async def test_in_flight_limit(self):
+        """测试超过并发上限的请求排队，不阻塞事件循环"""
+        sdk_client = PeakTrackingClient(latency=0.05)
+        client = AsyncOCRClient(sdk_client, max_in_flight=2)
+        ocr_service = OCRService(client)
+
+        started = time.perf_counter()
+        results = await asyncio.gather(*[ocr_service.extract_text_from_base64("ZGF0YQ==") for _ in range(6)])
+        elapsed = time.perf_counter() - started
+
+        assert all("张三" in result for result in results)
+        assert sdk_client.peak == 2
+        assert elapsed >= 0.15
+        metrics = client.metrics()
+        assert metrics["requests"] == metrics["completed"] == 6
+        assert metrics["queued"] == metrics["in_flight"] == 0
+        assert metrics["max_queued"] >= 4
+        assert metrics["latency_ms"]["p50"] >= 50
+        assert metrics["queue_wait_ms"]["p95"] >= 50
+        client.close()
+
+    def test_limit_shared_across_threads(self):
+        """测试不同线程各自运行事件循环时共用并发上限"""
+        sdk_client = PeakTrackingClient(latency=0.02)
+        ocr_service = OCRService(AsyncOCRClient(sdk_client, max_in_flight=3))
+
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            results = list(executor.map(
+                lambda _: asyncio.run(ocr_service.extract_text_from_url("https://example.com/a.pdf")), range(12)
+            ))
+
+        assert len([result for result in results if result]) == 12
+        assert sdk_client.peak == 3
+
+    @pytest.mark.asyncio
+    async def test_failed_request(self):
+        """测试SDK调用失败时计入失败数，OCR服务返回None"""
+        sdk_client = MagicMock()
+        sdk_client.do_action_with_exception.side_effect = Exception("InvalidImage.Content")
+        client = AsyncOCRClient(sdk_client, max_in_flight=1)
+
+        assert await OCRService(client).extract_text_from_base64("ZGF0YQ==") is None
+        assert client.metrics()["failed"] == 1
+
+    def test_shared_client_metrics(self, client, monkeypatch):
+        """测试进程内共享同一个客户端，使用阿里云OCR时通过接口返回统计"""
+        monkeypatch.setattr("app.main.uses_aliyun_ocr", lambda: True)
+        assert OCRService().client is get_ocr_client()
+
+        response = client.get("/api/v1/metrics/ocr")
+        assert response.status_code == 200
+        assert {"queued", "in_flight", "latency_ms"} <= set(response.json())
+
+    def test_metrics_without_aliyun(self, client, monkeypatch):
+        """测试未使用阿里云OCR时返回空统计，不创建OCR客户端"""
+        close_ocr_client()
+        monkeypatch.setenv("OCR_BACKEND", "local")
+
+        response = client.get("/api/v1/metrics/ocr")
+
+        assert response.json() == {"enabled": False}
+        assert ocr._client_instance is None
+
+    def test_close_client(self):
+        """测试关闭共享客户端时停止调度线程，未创建时不做任何事"""
+        close_ocr_client()
+        close_ocr_client()
+
+        shared = get_ocr_client()
+        assert shared.scheduler.submit(lambda: "done").result(timeout=5) == "done"
+        threads = list(shared.scheduler._threads)
+        assert threads
+        close_ocr_client()
+
+        assert not any(thread.is_alive() for thread in threads)
+        assert get_ocr_client() is not shared
+        close_ocr_client()
@@ -0,0 +1,85 @@
+"""本地OCR引擎单元测试"""
+import io
+import base64
+import pytest
+from contextlib import nullcontext
+from types import SimpleNamespace
+from concurrent.futures import ThreadPoolExecutor
+from app.services import ocr_local
+from app.services.ocr_local import LocalOCRService, iter_page_images
+from app.services.storage import LocalStorageService
+
+class FakeTesseract:
+    """模拟pytesseract，返回图片内容作为识别结果"""
+
+    @staticmethod
+    def image_to_string(image, lang=None, config=None):
+        return f"{image.decode()} ({lang})\n"
+
+    @staticmethod
+    def get_tesseract_version():
+        return "5.3.0"
+
+class TestLocalOCR:
+    """本地OCR引擎测试类"""
+
+    @pytest.fixture
+    def ocr_service(self, monkeypatch):
+        """在线程池中运行、使用模拟Tesseract的本地OCR服务"""
+        monkeypatch.setattr(ocr_local, "pytesseract", FakeTesseract)
+        monkeypatch.setattr(ocr_local, "Image", SimpleNamespace(open=lambda f: nullcontext(f.read())))
+        ocr_local.get_tesseract_version.cache_clear()
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            yield LocalOCRService(lang="chi_sim", executor=executor)
+        ocr_local.get_tesseract_version.cache_clear()
+
+    @pytest.mark.asyncio
+    async def test_extract_text_from_base64(self, ocr_service):
+        """测试识别Base64图片内容"""
+        text = await ocr_service.extract_text_from_base64(base64.b64encode(b"resume image").decode())
+
+        assert text == "resume image (chi_sim)"
+        assert ocr_service.engine_version == "tesseract-5.3.0-chi_sim"
+
+    @pytest.mark.asyncio
+    async def test_extract_text_from_file(self, ocr_service, tmp_path):
+        """测试从存储中读取文件识别，文件不存在时返回None"""
+        storage_service = LocalStorageService(str(tmp_path))
+        ocr_service.storage_service = storage_service
+        stored = storage_service.upload_stream(io.BytesIO(b"scanned"), "resume.png")
+
+        assert await ocr_service.extract_text_from_file(stored["file_url"]) == "scanned (chi_sim)"
+        assert await ocr_service.extract_text_from_file("/uploads/missing.png") is None
+
+    def test_pdf_pages_rendered(self, monkeypatch):
+        """测试PDF按页渲染为图片"""
+        pages = [
+            SimpleNamespace(get_pixmap=lambda dpi, i=i: SimpleNamespace(tobytes=lambda fmt: f"page-{i}-{dpi}".encode()))
+            for i in range(2)
+        ]
+        fake_fitz = SimpleNamespace(open=lambda stream, filetype: nullcontext(pages))
+        monkeypatch.setattr(ocr_local, "fitz", fake_fitz)
+
+        assert list(iter_page_images(b"%PDF-1.4 ...", dpi=150)) == [b"page-0-150", b"page-1-150"]
+        assert list(iter_page_images(b"\x89PNG")) == [b"\x89PNG"]
+
+    def test_missing_dependencies(self, monkeypatch):
+        """测试未安装Tesseract依赖时无法创建本地OCR服务"""
+        monkeypatch.setattr(ocr_local, "pytesseract", None)
+        with pytest.raises(RuntimeError):
+            LocalOCRService()
+
+    def test_service_factory_selects_backend(self, ocr_service, monkeypatch):
+        """测试按 OCR_BACKEND 选择OCR后端"""
+        from app.services.service_factory import get_ocr_service
+        monkeypatch.setenv("ENV", "production")
+        monkeypatch.setenv("MOCK_SERVICES", "False")
+        monkeypatch.setattr(ocr_local, "get_ocr_process_pool", lambda: ocr_service.executor)
+
+        monkeypatch.setenv("OCR_BACKEND", "local")
+        service = get_ocr_service()
+        assert isinstance(getattr(service, "ocr_service", service), LocalOCRService)
+
+        monkeypatch.setenv("OCR_BACKEND", "unknown")
+        with pytest.raises(ValueError):
+            get_ocr_service()
@@ -0,0 +1,122 @@
+"""OCR请求调度单元测试"""
+import time
+import threading
+import pytest
+from unittest.mock import MagicMock
+from app.services.ocr import OCRService
+from app.services.ocr_client import AsyncOCRClient
+from app.services.ocr_scheduler import (
+    PRIORITY_BULK, PRIORITY_INTERACTIVE, OCRDeadlineExceeded, OCRScheduler, TokenBucket
+)
+
+class FakeClock:
+    """可手动推进的时钟，sleep 直接推进时间"""
+
+    def __init__(self):
+        self.now = 0.0
+        self.sleeps = []
+
+    def __call__(self) -> float:
+        return self.now
+
+    def sleep(self, seconds: float):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+class ThrottlingError(Exception):
+    """模拟阿里云SDK的限流错误"""
+
+    def get_error_code(self):
+        return "Throttling.User"
+
+class TestOCRScheduler:
+    """OCR请求调度测试类"""
+
+    def test_token_bucket_rate(self):
+        """测试令牌桶按速率发放令牌，超过截止时间时放弃等待"""
+        clock = FakeClock()
+        bucket = TokenBucket(rate=2, capacity=2, clock=clock)
+
+        for _ in range(6):
+            assert bucket.acquire(sleep=clock.sleep)
+        # 初始两个令牌立即可用，之后每秒两个
+        assert clock.now == pytest.approx(2.0)
+
+        assert bucket.acquire(deadline=clock.now + 0.1, sleep=clock.sleep) is False
+        assert clock.now == pytest.approx(2.0)
+
+    def test_interactive_requests_first(self):
+        """测试工作线程空闲后先处理交互式请求"""
+        scheduler = OCRScheduler(workers=1, rate=0)
+        started, release = threading.Event(), threading.Event()
+        order = []
+
+        blocker = scheduler.submit(lambda: started.set() or release.wait())
+        assert started.wait(timeout=5)
+        bulk = [scheduler.submit(lambda i=i: order.append(f"bulk-{i}"), PRIORITY_BULK) for i in range(3)]
+        interactive = scheduler.submit(lambda: order.append("interactive"), PRIORITY_INTERACTIVE)
+        assert scheduler.metrics()["lanes"] == {PRIORITY_INTERACTIVE: 1, PRIORITY_BULK: 3}
+
+        release.set()
+        for future in [blocker, interactive, *bulk]:
+            future.result(timeout=5)
+        scheduler.shutdown()
+
+        assert order == ["interactive", "bulk-0", "bulk-1", "bulk-2"]
+
+    def test_throttling_backoff(self):
+        """测试限流错误退避重试后成功"""
+        clock = FakeClock()
+        scheduler = OCRScheduler(workers=1, rate=0, retry_base_delay=1, retry_max_delay=4,
+                                 clock=clock, sleep=clock.sleep)
+        fn = MagicMock(side_effect=[ThrottlingError(), ThrottlingError(), "text"])
+
+        assert scheduler.submit(fn).result(timeout=5) == "text"
+        assert fn.call_count == 3
+        assert len(clock.sleeps) == 2
+        assert all(0 <= seconds <= 4 for seconds in clock.sleeps)
+        assert scheduler.metrics()["throttled"] == 2
+
+        # 非限流错误不重试
+        fn = MagicMock(side_effect=ValueError("图片格式错误"))
+        with pytest.raises(ValueError):
+            scheduler.submit(fn).result(timeout=5)
+        assert fn.call_count == 1
+        scheduler.shutdown()
+
+    def test_deadline(self):
+        """测试退避等待不超过截止时间，到期后抛出 OCRDeadlineExceeded"""
+        clock = FakeClock()
+        scheduler = OCRScheduler(workers=1, rate=0, retry_attempts=10, retry_base_delay=5, retry_max_delay=60,
+                                 clock=clock, sleep=clock.sleep)
+        fn = MagicMock(side_effect=ThrottlingError())
+
+        with pytest.raises(OCRDeadlineExceeded):
+            scheduler.submit(fn, PRIORITY_BULK, deadline=3).result(timeout=5)
+        assert clock.now <= 3
+        assert scheduler.metrics()["deadline_exceeded"] == 1
+        scheduler.shutdown()
+
+    @pytest.mark.asyncio
+    async def test_ocr_service_raises_when_throttled(self):
+        """测试限流重试失败时OCR服务抛出异常，不当作无法识别的内容"""
+        sdk_client = MagicMock()
+        sdk_client.do_action_with_exception.side_effect = ThrottlingError()
+        scheduler = OCRScheduler(workers=1, rate=0, retry_attempts=2, retry_base_delay=0.001, retry_max_delay=0.001)
+        ocr_service = OCRService(AsyncOCRClient(sdk_client, max_in_flight=1, scheduler=scheduler), PRIORITY_BULK)
+
+        with pytest.raises(ThrottlingError):
+            await ocr_service.extract_text_from_base64("ZGF0YQ==")
+        assert sdk_client.do_action_with_exception.call_count == 2
+
+    def test_throughput_stays_at_quota(self):
+        """测试请求数超过配额时按配额速率发送"""
+        scheduler = OCRScheduler(workers=4, rate=50, burst=5)
+        started = time.perf_counter()
+        futures = [scheduler.submit(lambda: "text", PRIORITY_BULK) for _ in range(30)]
+        assert [future.result(timeout=5) for future in futures] == ["text"] * 30
+        elapsed = time.perf_counter() - started
+        scheduler.shutdown()
+
+        # 突发5个后，其余25个按每秒50个发送
+        assert elapsed >= 0.45
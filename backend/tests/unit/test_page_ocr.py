@@ -0,0 +1,85 @@
+"""分页OCR服务单元测试"""
+import io
+import time
+import base64
+import threading
+import pytest
+from app.services import page_ocr
+from app.services.page_ocr import ocr_pdf_pages
+from app.services.ocr_cache import CachedOCRService, OCRResultCache
+from tests.unit.test_text_extractor import RESUME_TEXT, build_pdf
+
+pypdf = pytest.importorskip("pypdf")
+
+class FakePageOCRService:
+    """按页面内容返回识别结果的OCR服务"""
+
+    def __init__(self, delay=0.0, failures=0):
+        self.delay = delay
+        self.failures = failures
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def extract_text_from_base64(self, base64_content):
+        with self._lock:
+            self.calls += 1
+            if self.failures > 0:
+                self.failures -= 1
+                raise Exception("OCR服务限流")
+        time.sleep(self.delay)
+        reader = pypdf.PdfReader(io.BytesIO(base64.b64decode(base64_content)))
+        return f"OCR第{reader.pages[0].extract_text().strip()}页"
+
+class TestPageOCR:
+    """分页OCR测试类"""
+
+    @pytest.fixture(autouse=True)
+    def no_retry_delay(self, monkeypatch):
+        monkeypatch.setattr(page_ocr, "OCR_PAGE_RETRY_DELAY", 0)
+
+    def test_pages_reassembled_in_order(self):
+        """测试只识别扫描页，并按页码顺序拼接"""
+        ocr_service = FakePageOCRService()
+        text = ocr_pdf_pages(build_pdf([RESUME_TEXT, "2", "3"]), ocr_service).text
+
+        assert text == f"{RESUME_TEXT}\nOCR第2页\nOCR第3页"
+        assert ocr_service.calls == 2
+
+    def test_pages_processed_concurrently(self, monkeypatch):
+        """测试多页并发识别，总耗时取决于最慢的一页"""
+        monkeypatch.setattr(page_ocr, "OCR_PAGE_CONCURRENCY", 6)
+        ocr_service = FakePageOCRService(delay=0.2)
+
+        start = time.monotonic()
+        text = ocr_pdf_pages(build_pdf([str(i) for i in range(1, 7)]), ocr_service).text
+
+        assert time.monotonic() - start < 0.8
+        assert text.splitlines() == [f"OCR第{i}页" for i in range(1, 7)]
+
+    def test_page_retry_and_cache(self, tmp_path):
+        """测试单页失败重试，重复页面命中缓存"""
+        fake_service = FakePageOCRService(failures=1)
+        ocr_service = CachedOCRService(fake_service, OCRResultCache(str(tmp_path / "ocr.sqlite3")))
+        assert ocr_pdf_pages(build_pdf(["1"]), ocr_service).text == "OCR第1页"
+        assert fake_service.calls == 2
+
+        assert ocr_pdf_pages(build_pdf(["1"]), ocr_service).text == "OCR第1页"
+        assert fake_service.calls == 2
+
+    def test_all_pages_failed(self, monkeypatch):
+        """测试所有页面识别失败时返回None"""
+        monkeypatch.setattr(page_ocr, "OCR_PAGE_RETRIES", 0)
+        ocr_service = FakePageOCRService(failures=10)
+        assert ocr_pdf_pages(build_pdf(["1", "2"]), ocr_service).text is None
+
+    def test_partial_failure_reported(self, monkeypatch):
+        """测试部分页面识别失败时返回其余页面的文本，并标记结果不完整"""
+        monkeypatch.setattr(page_ocr, "OCR_PAGE_RETRIES", 0)
+        monkeypatch.setattr(page_ocr, "OCR_PAGE_CONCURRENCY", 1)
+        ocr_service = FakePageOCRService(failures=1)
+
+        result = ocr_pdf_pages(build_pdf(["1", "2"]), ocr_service)
+
+        assert result.text == "OCR第2页"
+        assert result.failed_pages == [1]
+        assert not result.complete
@@ -0,0 +1,165 @@
+"""简历原始文件下载接口单元测试"""
+import io
+import pytest
+import zstandard
+from unittest.mock import MagicMock
+from sqlalchemy.orm import Session
+from app.models.resume import Resume
+from app.services.storage import AliyunOSSService, LocalStorageService
+from app.utils import file_response
+from app.utils.file_response import FileRangeResponse, parse_range
+
+CONTENT = bytes(range(256)) * 4
+
+class TestResumeDownload:
+    """简历文件下载测试类"""
+
+    @pytest.fixture
+    def resume(self, tmp_path, monkeypatch, db: Session):
+        """保存在本地存储中的简历"""
+        storage_service = LocalStorageService(str(tmp_path))
+        monkeypatch.setattr("app.routers.resumes.get_storage_service", lambda: storage_service)
+        stored = storage_service.upload_stream(io.BytesIO(CONTENT), "resume.pdf")
+        resume = Resume(candidate_name="张三", file_url=stored["file_url"], file_type="pdf")
+        db.add(resume)
+        db.commit()
+        return resume
+
+    def test_download_full_file(self, client, resume):
+        """测试下载完整文件并返回缓存相关响应头"""
+        response = client.get(f"/api/v1/resumes/{resume.id}/file")
+
+        assert response.status_code == 200
+        assert response.content == CONTENT
+        assert response.headers["content-type"] == "application/pdf"
+        assert response.headers["content-length"] == str(len(CONTENT))
+        assert response.headers["accept-ranges"] == "bytes"
+        assert "max-age=" in response.headers["cache-control"]
+        assert response.headers["etag"]
+        assert "%E5%BC%A0%E4%B8%89.pdf" in response.headers["content-disposition"]
+
+    def test_conditional_get(self, client, resume):
+        """测试ETag和修改时间匹配时返回304"""
+        etag = client.get(f"/api/v1/resumes/{resume.id}/file").headers["etag"]
+
+        response = client.get(f"/api/v1/resumes/{resume.id}/file", headers={"If-None-Match": etag})
+        assert response.status_code == 304
+        assert response.content == b""
+        assert response.headers["etag"] == etag
+
+        response = client.get(f"/api/v1/resumes/{resume.id}/file", headers={"If-None-Match": '"other"'})
+        assert response.status_code == 200
+
+    def test_range_requests(self, client, resume):
+        """测试分段请求"""
+        url = f"/api/v1/resumes/{resume.id}/file"
+
+        response = client.get(url, headers={"Range": "bytes=10-19"})
+        assert response.status_code == 206
+        assert response.content == CONTENT[10:20]
+        assert response.headers["content-range"] == f"bytes 10-19/{len(CONTENT)}"
+
+        response = client.get(url, headers={"Range": "bytes=-5"})
+        assert response.status_code == 206
+        assert response.content == CONTENT[-5:]
+
+        response = client.get(url, headers={"Range": f"bytes={len(CONTENT)}-"})
+        assert response.status_code == 416
+        assert response.headers["content-range"] == f"bytes */{len(CONTENT)}"
+
+        # If-Range 与当前版本不一致时返回完整文件
+        response = client.get(url, headers={"Range": "bytes=0-9", "If-Range": '"stale"'})
+        assert response.status_code == 200
+        assert response.content == CONTENT
+
+    def test_download_missing_file(self, client, db: Session, resume, tmp_path):
+        """测试简历或文件不存在"""
+        assert client.get("/api/v1/resumes/9999/file").status_code == 404
+
+        imported = Resume(candidate_name="李四", file_url="", file_type="csv")
+        db.add(imported)
+        db.commit()
+        assert client.get(f"/api/v1/resumes/{imported.id}/file").status_code == 404
+
+        for path in tmp_path.rglob("*"):
+            if path.is_file():
+                path.unlink()
+        assert client.get(f"/api/v1/resumes/{resume.id}/file").status_code == 404
+
+    def test_oss_redirects_to_signed_url(self, client, db: Session, monkeypatch):
+        """测试对象存储中的文件重定向到签名URL"""
+        monkeypatch.setenv("ENV", "test")
+        storage_service = AliyunOSSService()
+        storage_service.mock = False
+        storage_service.bucket = MagicMock()
+        storage_service.bucket.sign_url.return_value = "https://bucket.example.com/resume.pdf?Signature=abc"
+        storage_service.bucket.head_object.return_value.headers = {}
+        monkeypatch.setattr("app.routers.resumes.get_storage_service", lambda: storage_service)
+        resume = Resume(candidate_name="张三", file_url=storage_service.get_file_url("resume.pdf"), file_type="pdf")
+        db.add(resume)
+        db.commit()
+
+        response = client.get(f"/api/v1/resumes/{resume.id}/file", follow_redirects=False)
+
+        assert response.status_code == 307
+        assert response.headers["location"] == "https://bucket.example.com/resume.pdf?Signature=abc"
+        storage_service.bucket.sign_url.assert_called_once_with("GET", "resume.pdf", 3600)
+
+    def test_download_compressed_file(self, client, db: Session, tmp_path, monkeypatch):
+        """测试压缩存储的文件按客户端支持的编码发送"""
+        storage_service = LocalStorageService(str(tmp_path))
+        storage_service.compression = "zstd"
+        monkeypatch.setattr("app.routers.resumes.get_storage_service", lambda: storage_service)
+        stored = storage_service.upload_stream(io.BytesIO(CONTENT), "resume.pdf")
+        resume = Resume(candidate_name="张三", file_url=stored["file_url"], file_type="pdf")
+        db.add(resume)
+        db.commit()
+        url = f"/api/v1/resumes/{resume.id}/file"
+
+        response = client.get(url, headers={"Accept-Encoding": "identity"})
+        assert response.status_code == 200
+        assert response.content == CONTENT
+        assert "content-encoding" not in response.headers
+        assert response.headers["accept-ranges"] == "none"
+        assert response.headers["vary"] == "Accept-Encoding"
+
+        # 压缩内容不支持分段请求，返回完整文件
+        response = client.get(url, headers={"Accept-Encoding": "gzip, zstd", "Range": "bytes=0-9"})
+        assert response.status_code == 200
+        assert response.headers["content-encoding"] == "zstd"
+        assert zstandard.ZstdDecompressor().decompressobj().decompress(response.content) == CONTENT
+
+        encoded_etag = response.headers["etag"]
+        response = client.get(url, headers={"Accept-Encoding": "zstd", "If-None-Match": encoded_etag})
+        assert response.status_code == 304
+        response = client.get(url, headers={"Accept-Encoding": "identity", "If-None-Match": encoded_etag})
+        assert response.status_code == 200
+
+    def test_parse_range(self):
+        """测试Range请求头解析"""
+        assert parse_range("bytes=0-99", 50) == (0, 49)
+        assert parse_range("bytes=10-", 50) == (10, 49)
+        assert parse_range("bytes=-100", 50) == (0, 49)
+        assert parse_range("bytes=0-1,5-6", 50) is None
+        assert parse_range("items=0-1", 50) is None
+        with pytest.raises(ValueError):
+            parse_range("bytes=20-10", 50)
+
+    @pytest.mark.asyncio
+    async def test_zero_copy_send(self, tmp_path, monkeypatch):
+        """测试服务器提供零拷贝扩展时发送文件描述符和范围"""
+        monkeypatch.setattr(file_response, "FILE_ZERO_COPY_ENABLED", True)
+        path = tmp_path / "resume.pdf"
+        path.write_bytes(CONTENT)
+        messages = []
+
+        async def send(message):
+            messages.append(message)
+
+        scope = {"type": "http", "method": "GET", "extensions": {"http.response.zerocopysend": {}}}
+        await FileRangeResponse(str(path), 5, 14, 206)(scope, None, send)
+
+        assert messages[0]["status"] == 206
+        assert messages[1]["type"] == "http.response.zerocopysend"
+        assert (messages[1]["offset"], messages[1]["count"]) == (5, 10)
+        assert messages[1]["file"].name == str(path)
@@ -0,0 +1,197 @@
+"""简历解析流水线单元测试"""
+import json
+import pytest
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+from sqlalchemy.orm import Session
+from app.models.resume import Resume
+from app.services.gpt import GPTService
+from app.services.llm_cache import LLMResponseCache
+from app.services.ocr_cache import OCRResultCache
+from app.services.page_ocr import PageOCRResult
+from app.services.resume_pipeline import process_resume, extract_staged_text
+from tests.unit.test_text_extractor import RESUME_TEXT, build_pdf
+
+class TestResumePipeline:
+    """简历解析流水线测试类"""
+
+    @pytest.fixture
+    def mock_services(self, monkeypatch, tmp_path):
+        """模拟OCR和GPT服务"""
+        mock_ocr = MagicMock()
+        mock_ocr.extract_text_from_file.return_value = "姓名：张三\n技能：Python, FastAPI"
+
+        mock_gpt = MagicMock()
+        mock_gpt.parse_resume.return_value = {"name": "张三", "skills": ["Python", "FastAPI"]}
+        mock_gpt.generate_talent_portrait.return_value = "人才画像内容"
+
+        mock_storage = MagicMock()
+        mock_storage.open_file.side_effect = FileNotFoundError("文件不存在")
+
+        monkeypatch.setattr("app.services.resume_pipeline.get_ocr_service", lambda *args: mock_ocr)
+        monkeypatch.setattr("app.services.resume_pipeline.get_gpt_service", lambda: mock_gpt)
+        monkeypatch.setattr("app.services.resume_pipeline.get_storage_service", lambda: mock_storage)
+
+        ocr_cache = OCRResultCache(str(tmp_path / "ocr.sqlite3"))
+        monkeypatch.setattr("app.services.resume_pipeline.get_ocr_cache", lambda: ocr_cache)
+
+        return {"ocr": mock_ocr, "gpt": mock_gpt, "storage": mock_storage, "ocr_cache": ocr_cache}
+
+    def _create_resume(self, db: Session) -> int:
+        resume = Resume(candidate_name="张三", file_url="https://example.com/resume.pdf", file_type="pdf")
+        db.add(resume)
+        db.commit()
+        return resume.id
+
+    def test_process_resume_success(self, db: Session, mock_services):
+        """测试流水线全部阶段成功"""
+        resume_id = self._create_resume(db)
+
+        assert process_resume(resume_id, session_factory=lambda: db) is True
+
+        resume = db.query(Resume).filter(Resume.id == resume_id).first()
+        assert resume.processing_status == "completed"
+        assert resume.to_status_dict()["stages"] == {
+            "ocr": "completed", "parse": "completed", "portrait": "completed", "tag": "completed"
+        }
+        assert json.loads(resume.parsed_content)["name"] == "张三"
+        assert resume.talent_portrait == "人才画像内容"
+        assert sorted(tag.name for tag in resume.tags) == ["FastAPI", "Python"]
+        assert set(resume.get_stage_timings()) == {"ocr", "parse", "portrait", "tag", "db_commit"}
+
+    def test_process_resume_stage_failure(self, db: Session, mock_services):
+        """测试阶段失败时停止后续阶段"""
+        mock_services["gpt"].generate_talent_portrait.side_effect = Exception("GPT超时")
+        resume_id = self._create_resume(db)
+
+        assert process_resume(resume_id, session_factory=lambda: db) is False
+
+        resume = db.query(Resume).filter(Resume.id == resume_id).first()
+        assert resume.processing_status == "failed"
+        assert resume.parse_status == "completed"
+        assert resume.portrait_status == "failed"
+        assert resume.tag_status == "pending"
+        assert "GPT超时" in resume.processing_error
+
+    def test_process_resume_uses_local_text_layer(self, db: Session, mock_services):
+        """测试数字版简历跳过OCR服务"""
+        pytest.importorskip("pypdf")
+        mock_services["storage"].open_file.side_effect = lambda url: build_pdf([RESUME_TEXT, RESUME_TEXT])
+        resume_id = self._create_resume(db)
+
+        assert process_resume(resume_id, session_factory=lambda: db) is True
+
+        resume = db.query(Resume).filter(Resume.id == resume_id).first()
+        assert resume.ocr_content == f"{RESUME_TEXT}\n{RESUME_TEXT}"
+        mock_services["ocr"].extract_text_from_file.assert_not_called()
+        mock_services["ocr"].extract_text_from_base64.assert_not_called()
+        mock_services["gpt"].parse_resume.assert_called_once_with(resume.ocr_content)
+
+    def test_process_resume_ocr_only_unreadable_pages(self, db: Session, mock_services):
+        """测试PDF部分页面没有文本层时保留可读页面，只对其余页面OCR"""
+        pytest.importorskip("pypdf")
+        mock_services["storage"].open_file.side_effect = lambda url: build_pdf([RESUME_TEXT, "1"])
+        mock_services["ocr"].extract_text_from_base64.return_value = "第2页扫描文本"
+        resume_id = self._create_resume(db)
+
+        assert process_resume(resume_id, session_factory=lambda: db) is True
+
+        resume = db.query(Resume).filter(Resume.id == resume_id).first()
+        assert resume.ocr_content == f"{RESUME_TEXT}\n第2页扫描文本"
+        mock_services["ocr"].extract_text_from_base64.assert_called_once()
+        mock_services["ocr"].extract_text_from_file.assert_not_called()
+
+    def test_process_resume_async_ocr_without_cache(self, db: Session, mock_services, monkeypatch):
+        """测试关闭OCR缓存时异步OCR服务的结果被等待后写入"""
+        async def extract_text_from_file(file_url):
+            return "姓名：张三\n技能：Python"
+
+        mock_services["ocr"].extract_text_from_file.side_effect = extract_text_from_file
+        monkeypatch.setattr("app.services.resume_pipeline.OCR_CACHE_ENABLED", False)
+        resume_id = self._create_resume(db)
+
+        assert process_resume(resume_id, session_factory=lambda: db) is True
+
+        resume = db.query(Resume).filter(Resume.id == resume_id).first()
+        assert resume.ocr_content == "姓名：张三\n技能：Python"
+        mock_services["gpt"].parse_resume.assert_called_once_with("姓名：张三\n技能：Python")
+
+    def test_process_resume_with_real_gpt_service(self, db: Session, mock_services, monkeypatch, tmp_path):
+        """测试非模拟模式下真实GPT服务能完成解析、人才画像和标签阶段"""
+        monkeypatch.setenv("ENV", "production")
+        monkeypatch.setenv("MOCK_SERVICES", "False")
+        client = MagicMock()
+        client.chat.completions.create.side_effect = [
+            SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=content))])
+            for content in [json.dumps({"name": "张三", "skills": ["Python", "FastAPI"]}), "Python工程师"]
+        ]
+        gpt_service = GPTService(client=client, cache=LLMResponseCache(str(tmp_path / "llm.sqlite3")))
+        monkeypatch.setattr("app.services.resume_pipeline.get_gpt_service", lambda: gpt_service)
+        resume_id = self._create_resume(db)
+
+        assert process_resume(resume_id, session_factory=lambda: db, ocr_content="姓名：张三\n技能：Python") is True
+
+        resume = db.query(Resume).filter(Resume.id == resume_id).first()
+        assert json.loads(resume.parsed_content)["skills"] == ["Python", "FastAPI"]
+        assert resume.talent_portrait == "Python工程师"
+        assert {tag.name for tag in resume.tags} == {"Python", "FastAPI"}
+
+    def test_process_missing_resume(self, db: Session, mock_services):
+        """测试简历不存在"""
+        assert process_resume(9999, session_factory=lambda: db) is False
+        mock_services["ocr"].extract_text_from_file.assert_not_called()
+
+    def test_reprocess_resume_uses_ocr_cache(self, db: Session, mock_services):
+        """测试重新解析时命中OCR缓存，不再调用OCR服务"""
+        resume = Resume(
+            candidate_name="张三", file_url="https://example.com/resume.pdf",
+            file_type="pdf", content_hash="b" * 64
+        )
+        db.add(resume)
+        db.commit()
+        resume_id = resume.id
+
+        assert process_resume(resume_id, session_factory=lambda: db) is True
+        assert process_resume(resume_id, session_factory=lambda: db) is True
+
+        assert mock_services["ocr"].extract_text_from_file.call_count == 1
+        assert mock_services["ocr_cache"].stats()["memory_hits"] == 1
+
+    def test_process_resume_with_prefetched_text(self, db: Session, mock_services):
+        """测试上传时已提取文本，OCR阶段不再读取文件"""
+        resume_id = self._create_resume(db)
+
+        assert process_resume(resume_id, session_factory=lambda: db, ocr_content="上传时提取的文本") is True
+
+        resume = db.query(Resume).filter(Resume.id == resume_id).first()
+        assert resume.ocr_content == "上传时提取的文本"
+        mock_services["storage"].open_file.assert_not_called()
+        mock_services["ocr"].extract_text_from_file.assert_not_called()
+
+    def test_extract_staged_text(self, mock_services, tmp_path):
+        """测试从本地暂存文件提取文本，并写入OCR缓存"""
+        staged = tmp_path / "resume.upload"
+        staged.write_bytes(b"\x89PNG scan")
+        mock_services["ocr"].extract_text_from_base64.return_value = "扫描件文本"
+        mock_services["ocr"].engine_version = "mock"
+
+        services = {**mock_services}
+        assert extract_staged_text(str(staged), "png", "d" * 64, services) == "扫描件文本"
+        assert extract_staged_text(str(staged), "png", "d" * 64, services) == "扫描件文本"
+        mock_services["ocr"].extract_text_from_base64.assert_called_once()
+
+    def test_partial_page_ocr_not_cached(self, mock_services, tmp_path, monkeypatch):
+        """测试分页OCR部分页面失败时结果不写入缓存，再次上传时重新识别"""
+        staged = tmp_path / "resume.upload"
+        staged.write_bytes(b"%PDF-1.4 scan")
+        mock_services["ocr"].engine_version = "mock"
+        results = iter([PageOCRResult("第2页文本", [1]), PageOCRResult("第1页文本\n第2页文本", [])])
+        monkeypatch.setattr("app.services.resume_pipeline.ocr_pdf_pages", lambda file_obj, ocr: next(results))
+
+        services = {**mock_services}
+        assert extract_staged_text(str(staged), "pdf", "e" * 64, services) == "第2页文本"
+        assert mock_services["ocr_cache"].stats()["disk_entries"] == 0
+
+        assert extract_staged_text(str(staged), "pdf", "e" * 64, services) == "第1页文本\n第2页文本"
+        assert extract_staged_text(str(staged), "pdf", "e" * 64, services) == "第1页文本\n第2页文本"
+        assert mock_services["ocr_cache"].stats()["disk_entries"] == 1
@@ -0,0 +1,144 @@
+"""简历批量重新解析任务单元测试"""
+import threading
+import pytest
+from unittest.mock import MagicMock
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session, sessionmaker
+from app.models import Base
+from app.models.resume import Resume
+from app.models.reenrichment import ReenrichmentCheckpoint
+from app.services import resume_pipeline
+from app.services.resume_reenrich import reenrich_resumes
+
+class TestResumeReenrich:
+    """批量重新解析测试类"""
+
+    @pytest.fixture
+    def services(self):
+        """模拟流水线使用的外部服务"""
+        mock_gpt = MagicMock()
+        mock_gpt.parse_resume.return_value = {"name": "张三", "skills": ["Python"]}
+        mock_gpt.generate_talent_portrait.return_value = "新的人才画像"
+        mock_ocr = MagicMock()
+        mock_ocr.extract_text_from_file.return_value = "OCR文本"
+        mock_storage = MagicMock()
+        mock_storage.open_file.side_effect = FileNotFoundError("文件不存在")
+        return {"ocr": mock_ocr, "gpt": mock_gpt, "storage": mock_storage, "ocr_cache": None}
+
+    @pytest.fixture
+    def session_factory(self, tmp_path):
+        """
+        基于文件的测试数据库，每个会话使用独立的连接
+
+        共享测试数据库的所有会话共用同一个连接，并发处理时一个会话的提交或回滚
+        会作用到其他会话尚未完成的事务上，因此并发测试使用独立的数据库文件。
+        """
+        engine = create_engine(f"sqlite:///{tmp_path / 'reenrich.db'}", connect_args={"check_same_thread": False})
+        Base.metadata.create_all(bind=engine)
+        yield sessionmaker(autocommit=False, autoflush=False, bind=engine)
+        engine.dispose()
+
+    @pytest.fixture
+    def db(self, session_factory):
+        db = session_factory()
+        yield db
+        db.close()
+
+    def _create_resumes(self, db: Session, count: int):
+        resumes = [
+            Resume(candidate_name=f"候选人{i}", file_url=f"url{i}", file_type="pdf", ocr_content=f"简历文本{i}")
+            for i in range(count)
+        ]
+        db.add_all(resumes)
+        db.commit()
+        return [resume.id for resume in resumes]
+
+    def test_reenrich_all_and_skip_unchanged(self, db: Session, services, session_factory):
+        """测试分批重新解析全部简历，再次运行时跳过未变化的简历"""
+        resume_ids = self._create_resumes(db, 5)
+
+        result = reenrich_resumes("prompts-v2", batch_size=2, concurrency=4,
+                                  session_factory=session_factory, services=services)
+
+        assert result["processed"] == 5
+        assert result["last_resume_id"] == resume_ids[-1]
+        assert result["completed_at"] is not None
+        assert services["gpt"].parse_resume.call_count == 5
+        services["ocr"].extract_text_from_file.assert_not_called()
+        db.expire_all()
+        assert all(resume.talent_portrait == "新的人才画像" for resume in db.query(Resume).all())
+
+        result = reenrich_resumes("prompts-v2", batch_size=2, concurrency=4,
+                                  session_factory=session_factory, services=services)
+        assert result["processed"] == 0
+        assert result["skipped"] == 5
+        assert services["gpt"].parse_resume.call_count == 5
+
+    def test_version_change_triggers_reprocess(self, db: Session, services, session_factory, monkeypatch):
+        """测试解析版本变化后重新处理"""
+        self._create_resumes(db, 2)
+        reenrich_resumes("job", concurrency=4, session_factory=session_factory, services=services)
+
+        monkeypatch.setattr(resume_pipeline, "ENRICHMENT_VERSION", "2")
+        result = reenrich_resumes("job", concurrency=4, session_factory=session_factory, services=services)
+
+        assert result["processed"] == 2
+        assert services["gpt"].parse_resume.call_count == 4
+
+    def test_skip_resumes_without_file(self, db: Session, services, session_factory):
+        """测试表格导入的没有简历文件的记录不重新解析"""
+        self._create_resumes(db, 2)
+        db.add(Resume(candidate_name="王五", file_url="", file_type="csv", processing_status="completed"))
+        db.commit()
+
+        result = reenrich_resumes("job", concurrency=4, session_factory=session_factory, services=services)
+
+        assert result["processed"] == 2
+        assert result["failed"] == 0
+        services["ocr"].extract_text_from_file.assert_not_called()
+
+    def test_resume_from_checkpoint(self, db: Session, services, session_factory):
+        """测试中断后从检查点继续"""
+        resume_ids = self._create_resumes(db, 4)
+        db.add(ReenrichmentCheckpoint(job_name="job", last_resume_id=resume_ids[1], processed_count=2))
+        db.commit()
+
+        result = reenrich_resumes("job", batch_size=10, concurrency=4,
+                                  session_factory=session_factory, services=services)
+
+        assert result["processed"] == 4
+        assert services["gpt"].parse_resume.call_count == 2
+
+    def test_failures_are_counted(self, db: Session, services, session_factory):
+        """测试单份简历失败不影响其他简历"""
+        self._create_resumes(db, 3)
+        services["gpt"].generate_talent_portrait.side_effect = [Exception("GPT超时"), "画像", "画像"]
+
+        result = reenrich_resumes("job", concurrency=4, session_factory=session_factory, services=services)
+
+        assert result["processed"] == 2
+        assert result["failed"] == 1
+
+    def test_concurrent_workers(self, db: Session, services, session_factory):
+        """测试多份简历同时处理：4个工作线程同时进入标签阶段创建同名标签，结果和检查点正确"""
+        resume_ids = self._create_resumes(db, 8)
+        services["gpt"].parse_resume.return_value = {"name": "张三", "skills": ["Python", "Go"]}
+        barrier = threading.Barrier(4, timeout=5)
+
+        def generate_talent_portrait(parsed_content):
+            # 每个工作线程持有各自的数据库会话，任一线程未到达时超时失败
+            barrier.wait()
+            return "新的人才画像"
+
+        services["gpt"].generate_talent_portrait.side_effect = generate_talent_portrait
+
+        result = reenrich_resumes("job", batch_size=8, concurrency=4,
+                                  session_factory=session_factory, services=services)
+
+        assert result["processed"] == 8
+        assert result["failed"] == 0
+        assert result["last_resume_id"] == resume_ids[-1]
+        db.expire_all()
+        for resume in db.query(Resume).all():
+            assert resume.processing_status == "completed"
+            assert {tag.name for tag in resume.tags} == {"Python", "Go"}
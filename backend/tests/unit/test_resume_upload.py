@@ -0,0 +1,268 @@
+"""简历上传接口单元测试"""
+import os
+import json
+import asyncio
+import time
+import hashlib
+import pytest
+from unittest.mock import MagicMock
+from app.models.resume import Resume
+from app.routers import resumes as resumes_router
+from app.services.storage import FileTooLargeError
+
+class TestResumeUpload:
+    """简历上传接口测试类"""
+
+    @pytest.fixture
+    def mock_storage(self, monkeypatch):
+        """模拟存储服务和解析流水线"""
+        mock_storage = MagicMock()
+        mock_storage.upload_stream.side_effect = lambda file_obj, name, content_hash=None: {
+            "file_url": f"https://example.com/{name}",
+            "file_size": len(file_obj.read()),
+            "content_hash": "0" * 64
+        }
+        monkeypatch.setattr("app.routers.resumes.get_storage_service", lambda: mock_storage)
+
+        processed = []
+        ocr_contents = {}
+
+        def fake_process_resume(resume_id, *args, **kwargs):
+            processed.append(resume_id)
+            ocr_contents[resume_id] = kwargs.get("ocr_content")
+            return True
+
+        staged_paths = []
+
+        def fake_extract_staged_text(path, file_type, content_hash):
+            staged_paths.append(path)
+            with open(path, "rb") as staged:
+                return f"上传内容: {staged.read().decode()}"
+
+        monkeypatch.setattr("app.routers.resumes.process_resume", fake_process_resume)
+        monkeypatch.setattr("app.routers.resumes.extract_staged_text", fake_extract_staged_text)
+        return {
+            "storage": mock_storage, "processed": processed,
+            "ocr_contents": ocr_contents, "staged_paths": staged_paths
+        }
+
+    def test_upload_resume_accepted(self, client, db, mock_storage):
+        """测试单个简历上传立即返回202"""
+        response = client.post(
+            "/api/v1/resumes/upload",
+            files={"file": ("resume.pdf", b"%PDF-1.4", "application/pdf")},
+            data={"candidate_name": "张三"}
+        )
+
+        assert response.status_code == 202
+        result = response.json()
+        assert result["processing_status"] == "pending"
+        assert result["status_url"] == f"/api/v1/resumes/{result['resume_id']}/status"
+        assert mock_storage["processed"] == [result["resume_id"]]
+
+    def test_batch_upload_resumes(self, client, db, mock_storage):
+        """测试批量上传简历"""
+        response = client.post(
+            "/api/v1/resumes/batch",
+            files=[
+                ("files", ("zhangsan.pdf", b"%PDF-1.4", "application/pdf")),
+                ("files", ("lisi.docx", b"PK", "application/octet-stream")),
+                ("files", ("notes.txt", b"text", "text/plain")),
+            ],
+            data={"candidate_names": json.dumps({"zhangsan.pdf": "张三"})}
+        )
+
+        assert response.status_code == 202
+        results = {item["filename"]: item for item in map(json.loads, response.text.splitlines())}
+        assert results["notes.txt"]["processing_status"] == "rejected"
+        assert results["zhangsan.pdf"]["candidate_name"] == "张三"
+        assert results["zhangsan.pdf"]["processing_status"] == "completed"
+        assert results["lisi.docx"]["candidate_name"] == "lisi"
+        assert sorted(mock_storage["processed"]) == sorted(
+            [results["zhangsan.pdf"]["resume_id"], results["lisi.docx"]["resume_id"]]
+        )
+        assert db.query(Resume).count() == 2
+
+    @pytest.mark.asyncio
+    async def test_batch_pipelines_survive_disconnect(self, monkeypatch):
+        """测试客户端断开连接、结果流被关闭后，批量解析任务仍然执行完"""
+        release = asyncio.Event()
+        processed = []
+
+        async def fake_run_pipeline(resume_id, ocr_task=None):
+            await release.wait()
+            processed.append(resume_id)
+            return True
+
+        monkeypatch.setattr("app.routers.resumes._run_pipeline", fake_run_pipeline)
+        monkeypatch.setattr("app.routers.resumes.BATCH_CONCURRENCY", 1)
+        accepted = [{"resume_id": resume_id, "duplicate_of_id": None} for resume_id in (1, 2, 3)]
+
+        tasks = resumes_router._start_batch_pipelines(accepted, {})
+        stream = resumes_router._stream_batch_results([{"filename": "notes.txt"}], tasks)
+        await stream.__anext__()
+        await stream.aclose()
+        del stream
+
+        assert resumes_router._pipeline_tasks.issuperset(tasks)
+        release.set()
+        await asyncio.gather(*tasks)
+
+        assert sorted(processed) == [1, 2, 3]
+        assert not resumes_router._pipeline_tasks
+
+    def test_batch_upload_invalid_mapping(self, client, mock_storage):
+        """测试无效的候选人姓名映射"""
+        response = client.post(
+            "/api/v1/resumes/batch",
+            files=[("files", ("zhangsan.pdf", b"%PDF-1.4", "application/pdf"))],
+            data={"candidate_names": "[1, 2]"}
+        )
+
+        assert response.status_code == 400
+
+    def test_upload_duplicate_resume(self, client, db, mock_storage):
+        """测试重复上传相同内容时复用已有简历"""
+        original = Resume(
+            candidate_name="张三",
+            file_url="https://example.com/resume.pdf",
+            file_type="pdf",
+            content_hash=hashlib.sha256(b"%PDF-1.4 same").hexdigest(),
+            ocr_content="简历文本",
+            talent_portrait="人才画像",
+            processing_status="completed"
+        )
+        db.add(original)
+        db.commit()
+
+        response = client.post(
+            "/api/v1/resumes/upload",
+            files={"file": ("copy.pdf", b"%PDF-1.4 same", "application/pdf")},
+            data={"candidate_name": "张三"}
+        )
+
+        assert response.status_code == 202
+        result = response.json()
+        assert result["duplicate_of_id"] == original.id
+        assert result["processing_status"] == "completed"
+        assert result["file_url"] == original.file_url
+        mock_storage["storage"].upload_stream.assert_not_called()
+        assert mock_storage["processed"] == []
+
+        duplicate = db.query(Resume).filter(Resume.id == result["resume_id"]).first()
+        assert duplicate.talent_portrait == "人才画像"
+        assert duplicate.content_hash is None
+
+    def test_delete_original_keeps_shared_file(self, client, db, mock_storage):
+        """测试删除原始简历时保留仍被引用的文件"""
+        original = Resume(candidate_name="张三", file_url="url", file_type="pdf", content_hash="a" * 64)
+        db.add(original)
+        db.commit()
+        duplicate = Resume(candidate_name="张三", file_url="url", file_type="pdf", duplicate_of_id=original.id)
+        db.add(duplicate)
+        db.commit()
+
+        response = client.delete(f"/api/v1/resumes/{original.id}")
+
+        assert response.status_code == 200
+        mock_storage["storage"].delete_file.assert_not_called()
+        db.refresh(duplicate)
+        assert duplicate.content_hash == "a" * 64
+        assert duplicate.duplicate_of_id is None
+
+    def test_upload_extracts_text_while_storing(self, client, mock_storage, monkeypatch):
+        """测试写入存储与文本提取并发执行，提取的文本直接交给解析流水线"""
+        def slow_upload(file_obj, name, content_hash=None):
+            time.sleep(0.3)
+            return {"file_url": f"https://example.com/{name}", "file_size": len(file_obj.read())}
+
+        from app.routers import resumes
+        fast_extract = resumes.extract_staged_text
+
+        def slow_extract(path, file_type, content_hash):
+            time.sleep(0.3)
+            return fast_extract(path, file_type, content_hash)
+
+        mock_storage["storage"].upload_stream.side_effect = slow_upload
+        monkeypatch.setattr(resumes, "extract_staged_text", slow_extract)
+        start = time.monotonic()
+        response = client.post(
+            "/api/v1/resumes/upload",
+            files={"file": ("resume.pdf", b"%PDF-1.4", "application/pdf")},
+            data={"candidate_name": "张三"}
+        )
+
+        assert response.status_code == 202
+        assert time.monotonic() - start < 0.55
+        resume_id = response.json()["resume_id"]
+        assert mock_storage["ocr_contents"][resume_id] == "上传内容: %PDF-1.4"
+        assert not os.path.exists(mock_storage["staged_paths"][0])
+
+    def test_storage_failure_cleans_staged_file(self, client, db, mock_storage):
+        """测试存储写入失败时不创建简历，并删除本地暂存文件"""
+        mock_storage["storage"].upload_stream.side_effect = Exception("存储服务不可用")
+
+        response = client.post(
+            "/api/v1/resumes/upload",
+            files={"file": ("resume.pdf", b"%PDF-1.4", "application/pdf")},
+            data={"candidate_name": "张三"}
+        )
+
+        assert response.status_code == 500
+        assert db.query(Resume).count() == 0
+        assert mock_storage["processed"] == []
+        for _ in range(50):
+            if not os.path.exists(mock_storage["staged_paths"][0]):
+                break
+            time.sleep(0.01)
+        assert not os.path.exists(mock_storage["staged_paths"][0])
+
+    def test_only_size_errors_map_to_413(self, client, db, mock_storage):
+        """测试只有文件过大返回413，其他存储错误返回500"""
+        upload = {
+            "files": {"file": ("resume.pdf", b"%PDF-1.4", "application/pdf")},
+            "data": {"candidate_name": "张三"}
+        }
+
+        mock_storage["storage"].upload_stream.side_effect = FileTooLargeError("文件大小超过限制（最大100MB）")
+        response = client.post("/api/v1/resumes/upload", **upload)
+        assert response.status_code == 413
+
+        mock_storage["storage"].upload_stream.side_effect = ValueError("不支持的编码方式: brotli")
+        response = client.post("/api/v1/resumes/upload", **upload)
+        assert response.status_code == 500
+        assert db.query(Resume).count() == 0
+
+    def test_lost_race_releases_uploaded_file(self, client, db, mock_storage):
+        """测试并发上传相同内容时，提交失败的一方关联先提交的简历并释放已写入的文件"""
+        content = b"%PDF-1.4 race"
+        content_hash = hashlib.sha256(content).hexdigest()
+
+        def upload_while_other_commits(file_obj, name, content_hash=None):
+            # 本次上传写入存储期间，另一个请求先提交了相同内容的简历
+            db.add(Resume(
+                candidate_name="李四", file_url="https://example.com/first.pdf", file_type="pdf",
+                content_hash=content_hash, processing_status="pending"
+            ))
+            db.commit()
+            return {"file_url": f"https://example.com/{name}", "file_size": len(file_obj.read()), "content_hash": content_hash}
+
+        mock_storage["storage"].upload_stream.side_effect = upload_while_other_commits
+
+        response = client.post(
+            "/api/v1/resumes/upload",
+            files={"file": ("second.pdf", content, "application/pdf")},
+            data={"candidate_name": "张三"}
+        )
+
+        assert response.status_code == 202
+        result = response.json()
+        assert result["file_url"] == "https://example.com/first.pdf"
+        assert result["duplicate_of_id"] is not None
+        mock_storage["storage"].delete_file.assert_called_once_with("https://example.com/second.pdf")
+        assert mock_storage["processed"] == []
+        for _ in range(50):
+            if not os.path.exists(mock_storage["staged_paths"][0]):
+                break
+            time.sleep(0.01)
+        assert not os.path.exists(mock_storage["staged_paths"][0])
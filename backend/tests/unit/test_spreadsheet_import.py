@@ -0,0 +1,158 @@
+"""候选人表格导入单元测试"""
+import io
+import json
+import tempfile
+import pytest
+from sqlalchemy.orm import Session
+from app.models.resume import Resume
+from app.services.bulk_import import BulkImporter
+from app.services.ocr_scheduler import PRIORITY_BULK
+from app.services.spreadsheet_import import SpreadsheetImporter, import_spreadsheet, process_imported_resumes
+
+CSV_CONTENT = (
+    "姓名,手机号,邮箱,技能,简历链接,备注\n"
+    "张三,13800138000,zhangsan@example.com,\"Python、Docker\",https://example.com/zhangsan.pdf,内推\n"
+    ",13800138001,,,,\n"
+    "李四,13800138002,lisi-example.com,,,\n"
+    ",,,,,\n"
+    "王五,13800138003,wangwu@example.com,Java/Go,,\n"
+    "赵六,,,,https://example.com/zhaoliu.exe,\n"
+)
+
+class LegacySpooledFile(tempfile.SpooledTemporaryFile):
+    """模拟 Python 3.8 的 SpooledTemporaryFile，没有 readable()、seekable() 和 writable()"""
+
+    def __getattribute__(self, name):
+        if name in ("readable", "seekable", "writable"):
+            raise AttributeError(name)
+        return super().__getattribute__(name)
+
+class TestSpreadsheetImport:
+    """表格导入测试类"""
+
+    def _csv(self, content: str = CSV_CONTENT) -> io.BytesIO:
+        return io.BytesIO(content.encode("utf-8-sig"))
+
+    def test_import_csv_with_row_errors(self, db: Session):
+        """测试CSV导入，校验失败的行单独记录"""
+        result = import_spreadsheet(db.get_bind(), self._csv(), "csv", batch_size=1)
+
+        assert result["total_rows"] == 5
+        assert result["imported"] == 2
+        assert result["failed"] == 3
+        assert [error["row"] for error in result["errors"]] == [3, 4, 7]
+        assert "姓名" in result["errors"][0]["error"]
+        assert result["ignored_columns"] == ["备注"]
+
+        zhangsan = db.query(Resume).filter(Resume.candidate_name == "张三").one()
+        assert result["pending_ids"] == [zhangsan.id]
+        assert zhangsan.file_type == "pdf"
+        assert zhangsan.processing_status == "pending"
+        assert {tag.name for tag in zhangsan.tags} == {"Python", "Docker"}
+        assert json.loads(zhangsan.parsed_content)["phone"] == "13800138000"
+
+        wangwu = db.query(Resume).filter(Resume.candidate_name == "王五").one()
+        assert wangwu.file_url == ""
+        assert wangwu.file_type == "csv"
+        assert wangwu.processing_status == "completed"
+        assert {tag.name for tag in wangwu.tags} == {"Java", "Go"}
+
+    def test_import_xlsx(self, db: Session):
+        """测试以只读模式导入XLSX"""
+        openpyxl = pytest.importorskip("openpyxl")
+        workbook = openpyxl.Workbook()
+        sheet = workbook.active
+        sheet.append(["name", "phone", "skills"])
+        for index in range(25):
+            sheet.append([f"候选人{index}", 13800000000 + index, "Python"])
+        buffer = io.BytesIO()
+        workbook.save(buffer)
+        buffer.seek(0)
+
+        result = import_spreadsheet(db.get_bind(), buffer, "xlsx", batch_size=10)
+
+        assert result["imported"] == 25
+        assert result["failed"] == 0
+        resume = db.query(Resume).filter(Resume.candidate_name == "候选人3").one()
+        assert json.loads(resume.parsed_content)["phone"] == "13800000003"
+
+    def test_failed_batch_retried_per_row(self, db: Session, monkeypatch):
+        """测试整批写入失败时逐行重试，只有出错的行失败"""
+        original = BulkImporter.write_batch
+
+        def write_batch(self, conn, records):
+            if any(record["candidate_name"] == "李四" for record in records):
+                raise RuntimeError("写入异常")
+            return original(self, conn, records)
+
+        monkeypatch.setattr(BulkImporter, "write_batch", write_batch)
+        content = "姓名,技能\n张三,Python\n李四,Python\n王五,Go\n"
+
+        result = SpreadsheetImporter(db.get_bind(), batch_size=10).run(self._csv(content), "csv")
+
+        assert result["imported"] == 2
+        assert result["pending_ids"] == []
+        assert result["errors"] == [{"row": 3, "error": "写入失败: 写入异常"}]
+        assert {resume.candidate_name for resume in db.query(Resume)} == {"张三", "王五"}
+        assert {tag.name for tag in db.query(Resume).filter(Resume.candidate_name == "张三").one().tags} == {"Python"}
+
+    def test_missing_name_column(self, db: Session):
+        """测试缺少姓名列"""
+        with pytest.raises(ValueError):
+            import_spreadsheet(db.get_bind(), self._csv("电话,邮箱\n13800138000,a@example.com\n"), "csv")
+
+    def test_import_endpoint(self, client, db: Session, monkeypatch):
+        """测试表格导入接口，有简历链接的行在后台执行解析流水线"""
+        processed = []
+        monkeypatch.setattr("app.routers.resumes.process_imported_resumes", processed.extend)
+
+        response = client.post(
+            "/api/v1/resumes/import",
+            files={"file": ("candidates.csv", CSV_CONTENT.encode("utf-8"), "text/csv")}
+        )
+
+        assert response.status_code == 200
+        data = response.json()
+        assert data["imported"] == 2
+        assert len(data["errors"]) == 3
+        zhangsan = db.query(Resume).filter(Resume.candidate_name == "张三").one()
+        assert data["pending_ids"] == [zhangsan.id]
+        assert processed == [zhangsan.id]
+
+    def test_process_imported_resumes(self, monkeypatch):
+        """测试导入的简历共用批量优先级的服务依次解析"""
+        calls = []
+        monkeypatch.setattr("app.services.spreadsheet_import.create_services", lambda priority: {"priority": priority})
+        monkeypatch.setattr(
+            "app.services.spreadsheet_import.process_resume",
+            lambda resume_id, services: calls.append((resume_id, services["priority"])) or resume_id != 2
+        )
+
+        assert process_imported_resumes([1, 2, 3]) == 2
+        assert calls == [(1, PRIORITY_BULK), (2, PRIORITY_BULK), (3, PRIORITY_BULK)]
+
+    def test_import_endpoint_spooled_upload(self, client, db: Session, monkeypatch):
+        """测试上传文件为 Python 3.8 的 SpooledTemporaryFile 时CSV导入接口仍可用"""
+        monkeypatch.setattr("starlette.formparsers.SpooledTemporaryFile", LegacySpooledFile)
+        monkeypatch.setattr("app.routers.resumes.process_imported_resumes", lambda resume_ids: None)
+
+        response = client.post(
+            "/api/v1/resumes/import",
+            files={"file": ("candidates.csv", CSV_CONTENT.encode("utf-8-sig"), "text/csv")}
+        )
+
+        assert response.status_code == 200
+        assert response.json()["imported"] == 2
+        assert db.query(Resume).filter(Resume.candidate_name == "王五").count() == 1
+
+    def test_import_endpoint_rejects_invalid_files(self, client):
+        """测试不支持的表格类型和损坏的XLSX"""
+        response = client.post("/api/v1/resumes/import", files={"file": ("candidates.txt", b"data", "text/plain")})
+        assert response.status_code == 400
+
+        pytest.importorskip("openpyxl")
+        response = client.post(
+            "/api/v1/resumes/import",
+            files={"file": ("candidates.xlsx", b"not a workbook", "application/octet-stream")}
+        )
+        assert response.status_code == 400
@@ -0,0 +1,266 @@
+"""存储服务流式上传单元测试"""
+import io
+import os
+import hashlib
+import pytest
+from unittest.mock import MagicMock
+from concurrent.futures import ThreadPoolExecutor
+from app.services.storage import FileTooLargeError, HashingReader, LocalStorageService, AliyunOSSService
+from tests.mocks.oss_bucket_mock import MockOSSBucket
+
+class TestStorageStreaming:
+    """存储服务流式上传测试类"""
+
+    def test_hashing_reader_size_limit(self):
+        """测试超过大小上限时抛出异常"""
+        reader = HashingReader(io.BytesIO(b"x" * 11), max_size=10)
+        with pytest.raises(FileTooLargeError) as excinfo:
+            list(reader.chunks(4))
+        assert "文件大小超过限制" in str(excinfo.value)
+
+    def test_local_storage_upload_stream(self, tmp_path, monkeypatch):
+        """测试本地存储分块写入，按内容哈希分片存放"""
+        monkeypatch.setattr("app.services.storage.CHUNK_SIZE", 4)
+        content = b"resume content " * 10
+        content_hash = hashlib.sha256(content).hexdigest()
+        storage_service = LocalStorageService(str(tmp_path))
+
+        result = storage_service.upload_stream(io.BytesIO(content), "../resume.pdf")
+
+        assert result["file_url"] == f"/uploads/{content_hash[:2]}/{content_hash[2:4]}/{content_hash}"
+        assert result["file_size"] == len(content)
+        assert result["content_hash"] == content_hash
+        file_path = tmp_path / content_hash[:2] / content_hash[2:4] / content_hash
+        assert file_path.read_bytes() == content
+        assert not list(tmp_path.glob(".*.part"))
+
+        assert storage_service.delete_file(result["file_url"]) is True
+        assert not file_path.exists()
+        assert not list(file_path.parent.iterdir())
+
+    def test_local_storage_deduplicates_with_refcount(self, tmp_path):
+        """测试相同内容只保存一份，引用全部删除后才删除文件"""
+        storage_service = LocalStorageService(str(tmp_path))
+
+        first = storage_service.upload_stream(io.BytesIO(b"same content"), "a.pdf")
+        second = storage_service.upload_stream(io.BytesIO(b"same content"), "b.pdf")
+        other = storage_service.upload_stream(io.BytesIO(b"other content"), "a.pdf")
+
+        assert first["file_url"] == second["file_url"]
+        assert other["file_url"] != first["file_url"]
+        file_path = storage_service.get_file_path(first["file_url"])
+
+        assert storage_service.delete_file(first["file_url"]) is True
+        with storage_service.open_file(second["file_url"]) as f:
+            assert f.read() == b"same content"
+        assert storage_service.delete_file(second["file_url"]) is True
+        assert not os.path.exists(file_path)
+        assert storage_service.delete_file(second["file_url"]) is False
+        with storage_service.open_file(other["file_url"]) as f:
+            assert f.read() == b"other content"
+
+    def test_local_storage_concurrent_uploads(self, tmp_path):
+        """测试并发上传相同内容时引用计数准确"""
+        storage_service = LocalStorageService(str(tmp_path))
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            results = list(executor.map(
+                lambda i: storage_service.upload_stream(io.BytesIO(b"shared"), f"{i}.pdf"), range(16)
+            ))
+
+        file_url = results[0]["file_url"]
+        assert {result["file_url"] for result in results} == {file_url}
+        for _ in range(15):
+            storage_service.delete_file(file_url)
+        assert os.path.exists(storage_service.get_file_path(file_url))
+        storage_service.delete_file(file_url)
+        assert not os.path.exists(storage_service.get_file_path(file_url))
+
+    def test_local_storage_legacy_flat_files(self, tmp_path):
+        """测试兼容旧版平铺目录下的文件，并拒绝越界路径"""
+        storage_service = LocalStorageService(str(tmp_path))
+        (tmp_path / "resume.pdf").write_bytes(b"legacy")
+
+        with storage_service.open_file("/uploads/resume.pdf") as f:
+            assert f.read() == b"legacy"
+        assert storage_service.delete_file("/uploads/resume.pdf") is True
+        assert not list(tmp_path.iterdir())
+
+        with pytest.raises(ValueError):
+            storage_service.get_file_path("/uploads/../secret")
+
+    @pytest.fixture
+    def oss_service(self, tmp_path, monkeypatch):
+        """使用内存存储桶的OSS服务"""
+        monkeypatch.setenv("ENV", "test")
+        storage_service = AliyunOSSService()
+        storage_service.mock = False
+        storage_service.part_size = 4
+        storage_service.concurrency = 3
+        storage_service.checkpoint_dir = str(tmp_path / "checkpoints")
+        storage_service.bucket = MockOSSBucket()
+        return storage_service
+
+    def test_oss_multipart_upload(self, oss_service):
+        """测试OSS并发分片上传"""
+        content = b"0123456789" * 5
+
+        result = oss_service.upload_stream(io.BytesIO(content), "resume.pdf", hashlib.sha256(content).hexdigest())
+
+        object_key = oss_service.get_object_key(result["file_url"])
+        assert object_key.endswith(".pdf") and object_key != "resume.pdf"
+        assert result["file_size"] == len(content)
+        assert oss_service.bucket.objects[object_key] == content
+        part_numbers = sorted(call[2] for call in oss_service.bucket.calls if call[0] == "upload_part")
+        assert part_numbers == list(range(1, 14))
+        assert not [call for call in oss_service.bucket.calls if call[0] == "put_object"]
+        assert not os.listdir(oss_service.checkpoint_dir)
+
+    def test_oss_small_file_uses_put_object(self, oss_service):
+        """测试不超过分片阈值的文件直接上传"""
+        oss_service.multipart_threshold = 16
+
+        result = oss_service.upload_stream(io.BytesIO(b"0123456789"), "resume.pdf")
+
+        assert oss_service.bucket.objects[oss_service.get_object_key(result["file_url"])] == b"0123456789"
+        assert [call[0] for call in oss_service.bucket.calls] == ["put_object"]
+
+    def test_oss_multipart_upload_resumes_from_checkpoint(self, oss_service):
+        """测试分片上传失败后保留检查点，再次上传时跳过已完成的分片"""
+        content = b"0123456789" * 2
+        content_hash = hashlib.sha256(content).hexdigest()
+        oss_service.concurrency = 1
+        oss_service.bucket.fail_parts = {4}
+
+        with pytest.raises(Exception) as excinfo:
+            oss_service.upload_stream(io.BytesIO(content), "resume.pdf", content_hash)
+        assert "OSS服务错误" in str(excinfo.value)
+        assert len(os.listdir(oss_service.checkpoint_dir)) == 1
+
+        oss_service.bucket.fail_parts = set()
+        oss_service.bucket.calls.clear()
+        result = oss_service.upload_stream(io.BytesIO(content), "other.pdf", content_hash)
+
+        assert oss_service.bucket.objects[oss_service.get_object_key(result["file_url"])] == content
+        uploaded = [call[2] for call in oss_service.bucket.calls if call[0] == "upload_part"]
+        assert uploaded == [4, 5]
+        assert not [call for call in oss_service.bucket.calls if call[0] == "init_multipart_upload"]
+        assert not os.listdir(oss_service.checkpoint_dir)
+
+    def test_oss_same_file_name_uploads_isolated(self, oss_service):
+        """测试同名文件并发上传时各自写入独立的对象和分片上传"""
+        contents = [b"first cv " * 6, b"second cv " * 6]
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            results = list(executor.map(
+                lambda content: oss_service.upload_stream(
+                    io.BytesIO(content), "cv.pdf", hashlib.sha256(content).hexdigest()
+                ),
+                contents
+            ))
+
+        object_keys = [oss_service.get_object_key(result["file_url"]) for result in results]
+        assert object_keys[0] != object_keys[1]
+        assert [oss_service.bucket.objects[key] for key in object_keys] == contents
+        inits = [call for call in oss_service.bucket.calls if call[0] == "init_multipart_upload"]
+        assert len(inits) == 2
+
+    def test_oss_checkpoint_not_shared_while_in_flight(self, oss_service):
+        """测试相同内容的上传进行中时，其他上传不使用该检查点"""
+        content = b"0123456789" * 2
+        content_hash = hashlib.sha256(content).hexdigest()
+
+        with oss_service._claim_checkpoint(content_hash) as claimed:
+            assert claimed
+            with oss_service._claim_checkpoint(content_hash) as nested:
+                assert not nested
+            result = oss_service.upload_stream(io.BytesIO(content), "resume.pdf", content_hash)
+            assert oss_service.bucket.objects[oss_service.get_object_key(result["file_url"])] == content
+            assert not [name for name in os.listdir(oss_service.checkpoint_dir) if name.endswith(".json")]
+        assert not os.listdir(oss_service.checkpoint_dir)
+
+    def test_oss_multipart_upload_abort(self, oss_service):
+        """测试未启用检查点时分片上传失败即取消上传"""
+        oss_service.checkpoint_dir = ""
+        oss_service.bucket.fail_parts = {2}
+
+        with pytest.raises(Exception) as excinfo:
+            oss_service.upload_stream(io.BytesIO(b"0123456789"), "resume.pdf", "hash")
+
+        assert "OSS服务错误" in str(excinfo.value)
+        assert [call for call in oss_service.bucket.calls if call[0] == "abort_multipart_upload"]
+        assert not oss_service.bucket.uploads
+
+    def test_oss_multipart_upload_size_limit_aborts(self, oss_service, monkeypatch):
+        """测试文件超过大小上限时取消上传并删除检查点"""
+        monkeypatch.setattr(HashingReader.__init__, "__defaults__", (10,))
+
+        with pytest.raises(ValueError):
+            oss_service.upload_stream(io.BytesIO(b"0" * 20), "resume.pdf", "hash")
+
+        assert not oss_service.bucket.uploads
+        assert not os.listdir(oss_service.checkpoint_dir)
+
+    def test_oss_parallel_ranged_download(self, oss_service):
+        """测试大文件按范围并发下载到临时文件，小文件直接读取"""
+        content = bytes(range(256)) * 2
+        oss_service.bucket.objects["large.pdf"] = content
+        oss_service.bucket.objects["small.pdf"] = b"small"
+        oss_service.download_threshold = 64
+
+        with oss_service.open_file(oss_service.get_file_url("large.pdf")) as f:
+            assert f.read() == content
+        ranges = [call[2] for call in oss_service.bucket.calls if call[0] == "get_object"]
+        assert len(ranges) == 128
+        assert ranges[0] == (0, 3)
+
+        assert oss_service.open_file(oss_service.get_file_url("small.pdf")).read() == b"small"
+
+    def test_local_storage_compression(self, tmp_path):
+        """测试本地存储按类型压缩写入、透明解压读取，相同内容不重复保存"""
+        content = b"resume content " * 1000
+        content_hash = hashlib.sha256(content).hexdigest()
+        storage_service = LocalStorageService(str(tmp_path))
+        storage_service.compression = "zstd"
+
+        result = storage_service.upload_stream(io.BytesIO(content), "resume.pdf")
+        duplicate = storage_service.upload_stream(io.BytesIO(content), "copy.pdf")
+        image = storage_service.upload_stream(io.BytesIO(content + b"image"), "photo.png")
+
+        file_path = tmp_path / content_hash[:2] / content_hash[2:4] / f"{content_hash}.zst"
+        assert result["file_size"] == len(content)
+        assert result["content_hash"] == content_hash
+        assert duplicate["file_url"] == result["file_url"]
+        assert file_path.stat().st_size < len(content)
+        assert storage_service.resolve_file(result["file_url"]) == (str(file_path), "zstd")
+        assert storage_service.get_codec(image["file_url"]) is None
+        with storage_service.open_file(result["file_url"]) as f:
+            assert f.read(10) == content[:10]
+            assert f.read() == content[10:]
+
+        # 关闭压缩后仍能读取已压缩的文件
+        storage_service.compression = "none"
+        with storage_service.open_file(result["file_url"]) as f:
+            assert f.read() == content
+        storage_service.delete_file(result["file_url"])
+        assert file_path.exists()
+        storage_service.delete_file(duplicate["file_url"])
+        assert not file_path.exists()
+
+    def test_oss_compression_records_codec(self, oss_service):
+        """测试OSS压缩上传时在对象元数据中记录编码方式，读取时解压"""
+        content = b"0123456789" * 50
+        oss_service.compression = "zstd"
+        oss_service.part_size = 16
+
+        result = oss_service.upload_stream(io.BytesIO(content), "resume.pdf")
+
+        object_key = oss_service.get_object_key(result["file_url"])
+        assert result["file_size"] == len(content)
+        assert len(oss_service.bucket.objects[object_key]) < len(content)
+        assert oss_service.bucket.headers[object_key] == {"x-oss-meta-codec": "zstd"}
+        assert oss_service.get_codec(result["file_url"]) == "zstd"
+        with oss_service.open_file(result["file_url"]) as f:
+            assert f.read() == content
+
+        docx = oss_service.upload_stream(io.BytesIO(b"docx"), "resume.docx")
+        assert oss_service.bucket.objects[oss_service.get_object_key(docx["file_url"])] == b"docx"
+        assert oss_service.get_codec(docx["file_url"]) is None
@@ -0,0 +1,78 @@
+"""本地文本提取服务单元测试"""
+import io
+import zipfile
+import pytest
+from app.services.text_extractor import extract_text, is_readable_text
+
+RESUME_TEXT = "Zhang San Python Engineer 8 years FastAPI microservices distributed systems"
+
+def build_docx(paragraphs):
+    """构造只包含正文段落的DOCX文件"""
+    body = "".join(f"<w:p><w:r><w:t>{text}</w:t></w:r></w:p>" for text in paragraphs)
+    document = (
+        '<w:document xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main">'
+        f"<w:body>{body}</w:body></w:document>"
+    )
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w") as archive:
+        archive.writestr("word/document.xml", document)
+    buffer.seek(0)
+    return buffer
+
+def build_pdf(page_texts):
+    """构造每页包含一行文本的PDF文件"""
+    objects = ["<< /Type /Catalog /Pages 2 0 R >>", None, "<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>"]
+    kids = []
+    for text in page_texts:
+        stream = f"BT /F1 12 Tf 72 720 Td ({text}) Tj ET".encode()
+        objects.append(f"<< /Length {len(stream)} >>\nstream\n{stream.decode()}\nendstream")
+        content_id = len(objects)
+        objects.append(
+            f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] "
+            f"/Resources << /Font << /F1 3 0 R >> >> /Contents {content_id} 0 R >>"
+        )
+        kids.append(f"{len(objects)} 0 R")
+    objects[1] = f"<< /Type /Pages /Kids [{' '.join(kids)}] /Count {len(kids)} >>"
+
+    output = b"%PDF-1.4\n"
+    offsets = []
+    for number, body in enumerate(objects, 1):
+        offsets.append(len(output))
+        output += f"{number} 0 obj\n{body}\nendobj\n".encode()
+    xref_offset = len(output)
+    output += f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode()
+    output += "".join(f"{offset:010d} 00000 n \n" for offset in offsets).encode()
+    output += f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref_offset}\n%%EOF".encode()
+    return io.BytesIO(output)
+
+class TestTextExtractor:
+    """本地文本提取测试类"""
+
+    def test_extract_docx_text(self):
+        """测试读取DOCX正文"""
+        text = extract_text(build_docx(["姓名：张三", RESUME_TEXT]), "docx")
+        assert text == f"姓名：张三\n{RESUME_TEXT}"
+
+    def test_extract_digital_pdf(self):
+        """测试读取数字版PDF的文本层"""
+        pytest.importorskip("pypdf")
+        text = extract_text(build_pdf([RESUME_TEXT, RESUME_TEXT]), "pdf")
+        assert text is not None
+        assert text.count("FastAPI") == 2
+
+    def test_pdf_with_sparse_page_falls_back(self):
+        """测试某一页文本过少时回退到OCR"""
+        pytest.importorskip("pypdf")
+        assert extract_text(build_pdf([RESUME_TEXT, "1"]), "pdf") is None
+
+    def test_garbled_pdf_falls_back(self):
+        """测试缺字形导致乱码的PDF回退到OCR"""
+        pytest.importorskip("pypdf")
+        with open("tests/fixtures/resumes/ai_engineer.pdf", "rb") as f:
+            assert extract_text(f, "pdf") is None
+
+    def test_unsupported_or_invalid_files(self):
+        """测试图片和损坏文件返回None"""
+        assert extract_text(io.BytesIO(b"\x89PNG"), "png") is None
+        assert extract_text(io.BytesIO(b"not a zip"), "docx") is None
+        assert is_readable_text("■■■■ ■■■■ 135xxxx2345") is False